@@ -1,15 +1,20 @@
 import streamlit as st
-import pandas as pd
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4, letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.pdfgen import canvas
-from io import BytesIO
-import json
+import os
+import uuid
 from datetime import datetime
 
+from cvapp.translations import DEFAULT_LOCALE, locale_names, translate, translate_level
+from cvapp import fonts, metrics
+from cvapp.artifacts import ArtifactStore
+from cvapp.exporters import EXPORTERS
+from cvapp.model import CV, PersonalInfo, ValidationError
+from cvapp.jobs import CANCELLED, DONE, FAILED, QueueFull, RenderQueue
+from cvapp.preview import DocumentMemo, PreviewMemo
+from cvapp.schema import LANGUAGE_LEVELS, LIST_SECTIONS, SKILL_LEVELS, empty_cv_data
+from cvapp.search import SearchIndex
+from cvapp.service import RenderClient
+from cvapp.store import DEFAULT_PATH, AutoSaver, CVStore, is_owner_token, new_cv_id, new_owner_token
+
 # Configuration de la page
 st.set_page_config(
     page_title="Générateur de CV Intelligent",
@@ -18,278 +23,267 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Dictionnaire de traductions
-TRANSLATIONS = {
-    'fr': {
-        'title': 'Générateur de CV Intelligent',
-        'subtitle': 'Créez un CV professionnel optimisé ATS',
-        'choose_template': 'Choisir un modèle',
-        'choose_language': 'Langue du CV',
-        'personal_info': 'Informations personnelles',
-        'name': 'Nom complet',
-        'email': 'Email',
-        'phone': 'Téléphone',
-        'address': 'Adresse',
-        'linkedin': 'LinkedIn',
-        'github': 'GitHub',
-        'professional_summary': 'Résumé professionnel',
-        'experience': 'Expérience professionnelle',
-        'education': 'Formation',
-        'skills': 'Compétences',
-        'languages': 'Langues',
-        'interests': 'Centres d\'intérêt',
-        'job_title': 'Poste',
-        'company': 'Entreprise',
-        'start_date': 'Date de début',
-        'end_date': 'Date de fin',
-        'description': 'Description',
-        'degree': 'Diplôme',
-        'institution': 'Institution',
-        'year': 'Année',
-        'skill_name': 'Compétence',
-        'skill_level': 'Niveau',
-        'language_name': 'Langue',
-        'language_level': 'Niveau',
-        'add_experience': 'Ajouter une expérience',
-        'add_education': 'Ajouter une formation',
-        'add_skill': 'Ajouter une compétence',
-        'add_language': 'Ajouter une langue',
-        'preview': 'Aperçu du CV',
-        'generate_pdf': 'Générer le PDF',
-        'template_classic': 'Classique',
-        'template_modern': 'Moderne',
-        'template_creative': 'Créatif'
-    },
-    'en': {
-        'title': 'Intelligent CV Generator',
-        'subtitle': 'Create a professional ATS-optimized resume',
-        'choose_template': 'Choose Template',
-        'choose_language': 'CV Language',
-        'personal_info': 'Personal Information',
-        'name': 'Full Name',
-        'email': 'Email',
-        'phone': 'Phone',
-        'address': 'Address',
-        'linkedin': 'LinkedIn',
-        'github': 'GitHub',
-        'professional_summary': 'Professional Summary',
-        'experience': 'Professional Experience',
-        'education': 'Education',
-        'skills': 'Skills',
-        'languages': 'Languages',
-        'interests': 'Interests',
-        'job_title': 'Job Title',
-        'company': 'Company',
-        'start_date': 'Start Date',
-        'end_date': 'End Date',
-        'description': 'Description',
-        'degree': 'Degree',
-        'institution': 'Institution',
-        'year': 'Year',
-        'skill_name': 'Skill',
-        'skill_level': 'Level',
-        'language_name': 'Language',
-        'language_level': 'Level',
-        'add_experience': 'Add Experience',
-        'add_education': 'Add Education',
-        'add_skill': 'Add Skill',
-        'add_language': 'Add Language',
-        'preview': 'CV Preview',
-        'generate_pdf': 'Generate PDF',
-        'template_classic': 'Classic',
-        'template_modern': 'Modern',
-        'template_creative': 'Creative'
-    },
-    'nl': {
-        'title': 'Intelligente CV Generator',
-        'subtitle': 'Maak een professionele ATS-geoptimaliseerde CV',
-        'choose_template': 'Kies Template',
-        'choose_language': 'CV Taal',
-        'personal_info': 'Persoonlijke Informatie',
-        'name': 'Volledige Naam',
-        'email': 'Email',
-        'phone': 'Telefoon',
-        'address': 'Adres',
-        'linkedin': 'LinkedIn',
-        'github': 'GitHub',
-        'professional_summary': 'Professionele Samenvatting',
-        'experience': 'Werkervaring',
-        'education': 'Opleiding',
-        'skills': 'Vaardigheden',
-        'languages': 'Talen',
-        'interests': 'Interesses',
-        'job_title': 'Functie',
-        'company': 'Bedrijf',
-        'start_date': 'Startdatum',
-        'end_date': 'Einddatum',
-        'description': 'Beschrijving',
-        'degree': 'Diploma',
-        'institution': 'Instelling',
-        'year': 'Jaar',
-        'skill_name': 'Vaardigheid',
-        'skill_level': 'Niveau',
-        'language_name': 'Taal',
-        'language_level': 'Niveau',
-        'add_experience': 'Ervaring Toevoegen',
-        'add_education': 'Opleiding Toevoegen',
-        'add_skill': 'Vaardigheid Toevoegen',
-        'add_language': 'Taal Toevoegen',
-        'preview': 'CV Voorvertoning',
-        'generate_pdf': 'PDF Genereren',
-        'template_classic': 'Klassiek',
-        'template_modern': 'Modern',
-        'template_creative': 'Creatief'
-    }
-}
-
 # Initialisation des variables de session
 if 'cv_data' not in st.session_state:
-    st.session_state.cv_data = {
-        'personal_info': {},
-        'professional_summary': '',
-        'experiences': [],
-        'education': [],
-        'skills': [],
-        'languages': [],
-        'interests': ''
-    }
+    st.session_state.cv_data = empty_cv_data()
 
 if 'selected_language' not in st.session_state:
-    st.session_state.selected_language = 'fr'
+    st.session_state.selected_language = DEFAULT_LOCALE
 
 if 'selected_template' not in st.session_state:
     st.session_state.selected_template = 'classic'
 
-def get_text(key):
+if 'preview_memo' not in st.session_state:
+    st.session_state.preview_memo = PreviewMemo()
+
+if 'document_memo' not in st.session_state:
+    st.session_state.document_memo = DocumentMemo(st.session_state.cv_data)
+
+if 'edit_mode' not in st.session_state:
+    st.session_state.edit_mode = 'forms'
+
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+
+def get_text(key, **values):
     """Récupère le texte traduit selon la langue sélectionnée"""
-    return TRANSLATIONS[st.session_state.selected_language].get(key, key)
+    return translate(key, st.session_state.selected_language, **values)
 
-def create_pdf(cv_data, template, language):
-    """Génère un PDF du CV avec le style choisi"""
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=1*inch, leftMargin=0.75*inch, rightMargin=0.75*inch)
-    
-    # Styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=20,
-        spaceAfter=12,
-        textColor=colors.HexColor('#2C3E50'),
-        alignment=1  # Center
+def level_label(level):
+    """Libellé traduit d'un niveau, pour les listes déroulantes"""
+    return translate_level(level, st.session_state.selected_language)
+
+# Préfixes des clés de widgets liés au contenu du CV, à réinitialiser au chargement d'un autre CV
+CV_WIDGET_PREFIXES = (
+    'pi_', 'summary_text', 'interests_text', 'job_title_', 'company_', 'start_date_', 'end_date_', 'desc_',
+    'degree_', 'institution_', 'year_', 'skill_', 'lang_', 'table_'
+)
+
+def reset_cv_widgets():
+    """Réinitialise les champs de saisie à partir de st.session_state.cv_data
+
+    Nécessaire quand le CV est remplacé, mais aussi avant une relance
+    (voir rerun_keeping_inputs) : au changement de langue, les libellés
+    changent et Streamlit recrée alors les widgets à vide.
+    """
+    for key in list(st.session_state.keys()):
+        if key.startswith(CV_WIDGET_PREFIXES):
+            del st.session_state[key]
+    cv_data = st.session_state.cv_data
+    for field in PersonalInfo.FIELDS:
+        st.session_state[f"pi_{field}"] = cv_data['personal_info'].get(field, '')
+    st.session_state.summary_text = cv_data.get('professional_summary', '')
+    st.session_state.interests_text = cv_data.get('interests', '')
+
+def rerun_keeping_inputs():
+    """Relance la page sans perdre les saisies
+
+    À la relance, Streamlit oublie l'état des widgets à clé qui n'ont pas
+    encore été affichés pendant l'exécution en cours : champs du CV, offre
+    de l'analyse ATS et recherche sont donc réaffectés avant st.rerun().
+    """
+    reset_cv_widgets()
+    for key in ('job_description', 'cv_search'):
+        if key in st.session_state:
+            st.session_state[key] = st.session_state[key]
+    st.rerun()
+
+def load_into_session(cv):
+    """Remplace le CV en cours par cv et réinitialise les champs de saisie"""
+    st.session_state.cv_data = cv.to_dict()
+    st.session_state.document_memo.update(st.session_state.cv_data)
+    reset_cv_widgets()
+
+@st.cache_resource
+def get_cv_store():
+    """Base des CV enregistrés, partagée par toutes les sessions du serveur"""
+    return CVStore(os.environ.get('CVAPP_STORE_PATH', DEFAULT_PATH))
+
+@st.cache_resource
+def get_autosaver():
+    """Sauvegarde automatique différée, un thread d'écriture par processus"""
+    return AutoSaver(
+        get_cv_store(),
+        delay=float(os.environ.get('CVAPP_AUTOSAVE_DELAY', 2.0)),
+        max_delay=float(os.environ.get('CVAPP_AUTOSAVE_MAX_DELAY', 10.0))
     )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=14,
-        spaceAfter=6,
-        spaceBefore=12,
-        textColor=colors.HexColor('#34495E'),
-        borderWidth=1,
-        borderColor=colors.HexColor('#BDC3C7'),
-        borderPadding=5
+
+@st.cache_resource
+def get_search_index():
+    """Index de recherche des CV enregistrés, construit à la première recherche puis tenu à jour"""
+    return SearchIndex.from_store(get_cv_store())
+
+def open_cv(cv_id, version=None):
+    """Charge un CV enregistré du propriétaire de la session et le rattache à l'URL"""
+    cv = get_cv_store().load(cv_id, version, owner=st.session_state.owner)
+    load_into_session(cv)
+    st.session_state.cv_id = cv_id
+    # Une version restaurée devient la prochaine version ; la dernière est déjà enregistrée
+    if version is None:
+        get_autosaver().remember(cv_id, st.session_state.cv_data)
+    st.query_params['cv'] = cv_id
+
+def start_session():
+    """Reprend le CV indiqué dans l'URL (?cv=<id>&key=<jeton>) ou en commence un nouveau
+
+    Le jeton identifie le propriétaire des CV : seuls ses CV sont listés et
+    ouverts. Il reste dans l'URL, qu'il suffit de garder en favori.
+    """
+    owner = st.query_params.get('key')
+    if not is_owner_token(owner):
+        owner = new_owner_token()
+        st.query_params['key'] = owner
+    st.session_state.owner = owner
+    cv_id = st.query_params.get('cv')
+    if cv_id and get_cv_store().exists(cv_id, owner=owner):
+        open_cv(cv_id)
+        return
+    st.session_state.cv_id = new_cv_id()
+    # Un CV vide n'est enregistré qu'à la première modification
+    get_autosaver().remember(st.session_state.cv_id, CV().to_dict())
+
+def format_timestamp(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M')
+
+@st.cache_resource
+def get_artifact_store():
+    """PDF générés, gardés pour le téléchargement sous un budget mémoire commun à toutes les sessions"""
+    store = ArtifactStore(
+        max_memory_bytes=int(os.environ.get('CVAPP_ARTIFACTS_MEMORY_MB', 64)) * 1024 * 1024,
+        spill_threshold=int(os.environ.get('CVAPP_ARTIFACTS_SPILL_KB', 1024)) * 1024,
+        max_disk_bytes=int(os.environ.get('CVAPP_ARTIFACTS_DISK_MB', 1024)) * 1024 * 1024,
+        ttl=int(os.environ.get('CVAPP_ARTIFACTS_TTL', 600)),
+        spill_dir=os.environ.get('CVAPP_ARTIFACTS_DIR')
     )
-    
-    normal_style = ParagraphStyle(
-        'CustomNormal',
-        parent=styles['Normal'],
-        fontSize=10,
-        spaceAfter=6
+    metrics.add_gauge('cvapp_artifacts', "Nombre d'artefacts gardés pour le téléchargement", lambda: store.stats()['artifacts'])
+    metrics.add_gauge('cvapp_artifacts_memory_bytes', "Octets d'artefacts en mémoire", lambda: store.stats()['memory_bytes'])
+    metrics.add_gauge('cvapp_artifacts_disk_bytes', "Octets d'artefacts déversés sur disque", lambda: store.stats()['disk_bytes'])
+    return store
+
+@st.cache_resource
+def get_render_client():
+    """Client du service de rendu partagé si CVAPP_RENDER_SERVICE_URL est défini, sinon None"""
+    url = os.environ.get('CVAPP_RENDER_SERVICE_URL')
+    if not url:
+        return None
+    return RenderClient(
+        url,
+        pool_size=int(os.environ.get('CVAPP_RENDER_SERVICE_CONNECTIONS', 4)),
+        timeout=float(os.environ.get('CVAPP_RENDER_SERVICE_TIMEOUT', 30.0))
     )
+
+@st.cache_resource
+def get_render_queue():
+    """File de rendus PDF partagée par toutes les sessions du serveur"""
+    return RenderQueue(
+        max_workers=int(os.environ.get('CVAPP_RENDER_WORKERS', 2)),
+        max_pending=int(os.environ.get('CVAPP_RENDER_MAX_PENDING', 16)),
+        use_processes=os.environ.get('CVAPP_RENDER_PROCESSES') == '1',
+        artifacts=get_artifact_store(),
+        client=get_render_client()
+    )
+
+@st.cache_resource
+def start_metrics_exporter():
+    """Expose /metrics en local si CVAPP_METRICS_PORT est défini (une fois par processus)"""
+    port = os.environ.get('CVAPP_METRICS_PORT')
+    if port:
+        return metrics.start_http_server(int(port))
+    return None
+
+@st.fragment(run_every=0.5)
+def render_job_progress():
+    """Interroge la file sans relancer toute la page, jusqu'à la fin du rendu"""
+    job = get_render_queue().get(st.session_state.render_job_id)
+    if job is None or job.finished:
+        st.rerun()
+    st.info("⏳ " + get_text('pdf_in_progress'))
+
+def render_job_status():
+    """Affiche l'état du dernier rendu et propose le téléchargement une fois terminé"""
+    job = get_render_queue().get(st.session_state.render_job_id)
+    if job is None or job.status == CANCELLED:
+        st.session_state.render_job_id = None
+        return
     
-    story = []
-    
-    # En-tête avec nom
-    if cv_data['personal_info'].get('name'):
-        story.append(Paragraph(cv_data['personal_info']['name'], title_style))
-    
-    # Informations de contact
-    contact_info = []
-    if cv_data['personal_info'].get('email'):
-        contact_info.append(f"Email: {cv_data['personal_info']['email']}")
-    if cv_data['personal_info'].get('phone'):
-        contact_info.append(f"Téléphone: {cv_data['personal_info']['phone']}")
-    if cv_data['personal_info'].get('address'):
-        contact_info.append(f"Adresse: {cv_data['personal_info']['address']}")
-    if cv_data['personal_info'].get('linkedin'):
-        contact_info.append(f"LinkedIn: {cv_data['personal_info']['linkedin']}")
-    
-    if contact_info:
-        story.append(Paragraph(" | ".join(contact_info), normal_style))
-    
-    story.append(Spacer(1, 12))
-    
-    # Résumé professionnel
-    if cv_data.get('professional_summary'):
-        story.append(Paragraph(get_text('professional_summary'), heading_style))
-        story.append(Paragraph(cv_data['professional_summary'], normal_style))
-    
-    # Expérience professionnelle
-    if cv_data.get('experiences'):
-        story.append(Paragraph(get_text('experience'), heading_style))
-        for exp in cv_data['experiences']:
-            exp_title = f"<b>{exp.get('job_title', '')} - {exp.get('company', '')}</b>"
-            if exp.get('start_date') and exp.get('end_date'):
-                exp_title += f" ({exp['start_date']} - {exp['end_date']})"
-            story.append(Paragraph(exp_title, normal_style))
-            if exp.get('description'):
-                story.append(Paragraph(exp['description'], normal_style))
-            story.append(Spacer(1, 6))
-    
-    # Formation
-    if cv_data.get('education'):
-        story.append(Paragraph(get_text('education'), heading_style))
-        for edu in cv_data['education']:
-            edu_title = f"<b>{edu.get('degree', '')} - {edu.get('institution', '')}</b>"
-            if edu.get('year'):
-                edu_title += f" ({edu['year']})"
-            story.append(Paragraph(edu_title, normal_style))
-            story.append(Spacer(1, 6))
-    
-    # Compétences
-    if cv_data.get('skills'):
-        story.append(Paragraph(get_text('skills'), heading_style))
-        skills_text = " • ".join([f"{skill['name']} ({skill['level']})" for skill in cv_data['skills']])
-        story.append(Paragraph(skills_text, normal_style))
-    
-    # Langues
-    if cv_data.get('languages'):
-        story.append(Paragraph(get_text('languages'), heading_style))
-        languages_text = " • ".join([f"{lang['name']} ({lang['level']})" for lang in cv_data['languages']])
-        story.append(Paragraph(languages_text, normal_style))
+    if job.status == DONE:
+        # Le PDF est relu depuis le magasin d'artefacts : la session n'en garde pas de copie
+        artifact = get_render_queue().artifact(job)
+        try:
+            pdf_file = artifact.open() if artifact is not None else None
+        except OSError:
+            pdf_file = None
+        if pdf_file is None:
+            st.session_state.render_job_id = None
+            st.caption(get_text('pdf_expired'))
+            return
+        with pdf_file:
+            st.download_button(
+                label="📄 " + get_text('download_pdf'),
+                data=pdf_file,
+                file_name=f"CV_{st.session_state.cv_data['personal_info'].get('name', 'CV')}_{datetime.now().strftime('%Y%m%d')}.pdf",
+                mime="application/pdf"
+            )
+        st.success("✅ " + get_text('pdf_success'))
+        current_key = st.session_state.document_memo.render_key(
+            st.session_state.selected_template,
+            st.session_state.selected_language
+        )
+        if current_key != job.key:
+            st.caption(get_text('pdf_stale'))
+    elif job.status == FAILED:
+        st.error("❌ " + get_text('pdf_error', error=job.error))
+    else:
+        render_job_progress()
+
+def table_editor(section, column_config):
+    """Éditeur en tableau d'une section : un seul widget, quel que soit le nombre d'entrées"""
+    # pandas n'est chargé que si le mode tableau est utilisé
+    from cvapp.tables import POSITION_COLUMN, frame_to_records, records_to_frame
     
-    # Centres d'intérêt
-    if cv_data.get('interests'):
-        story.append(Paragraph(get_text('interests'), heading_style))
-        story.append(Paragraph(cv_data['interests'], normal_style))
+    # Le DataFrame source reste fixe tant que le mode tableau est actif :
+    # st.data_editor conserve lui-même les ajouts, suppressions et modifications.
+    source_key = f"table_source_{section}"
+    if source_key not in st.session_state:
+        st.session_state[source_key] = records_to_frame(section, st.session_state.cv_data[section])
     
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
+    column_config = {
+        POSITION_COLUMN: st.column_config.NumberColumn('#', min_value=1, step=1, width='small'),
+        **column_config
+    }
+    edited = st.data_editor(
+        st.session_state[source_key],
+        key=f"table_{section}",
+        num_rows="dynamic",
+        hide_index=True,
+        use_container_width=True,
+        column_config=column_config
+    )
+    st.session_state.cv_data[section] = frame_to_records(section, edited)
 
 def main():
+    if 'cv_id' not in st.session_state:
+        start_session()
+    
     # Titre principal
     st.title("📄 " + get_text('title'))
     st.subheader(get_text('subtitle'))
     
     # Sidebar pour les paramètres
     with st.sidebar:
-        st.header("⚙️ Configuration")
+        st.header("⚙️ " + get_text('configuration'))
         
         # Sélection de la langue
-        language_options = {
-            'Français': 'fr',
-            'English': 'en',
-            'Nederlands': 'nl'
-        }
+        language_options = {name: code for code, name in locale_names().items()}
         selected_lang = st.selectbox(
             get_text('choose_language'),
             options=list(language_options.keys()),
-            index=0
+            index=list(language_options.values()).index(st.session_state.selected_language)
         )
-        st.session_state.selected_language = language_options[selected_lang]
+        if language_options[selected_lang] != st.session_state.selected_language:
+            st.session_state.selected_language = language_options[selected_lang]
+            # Réaffiche toute la page (titre compris) dans la nouvelle langue
+            rerun_keeping_inputs()
         
         # Sélection du modèle
         template_options = {
@@ -299,223 +293,379 @@ def main():
         }
         selected_template = st.selectbox(
             get_text('choose_template'),
-            options=list(template_options.keys())
+            options=list(template_options.keys()),
+            index=list(template_options.values()).index(st.session_state.selected_template)
+        )
+        if template_options[selected_template] != st.session_state.selected_template:
+            st.session_state.selected_template = template_options[selected_template]
+            rerun_keeping_inputs()
+        
+        # Mode d'édition des listes (expériences, formations, compétences, langues)
+        edit_mode_options = {
+            get_text('edit_mode_forms'): 'forms',
+            get_text('edit_mode_table'): 'table'
+        }
+        selected_edit_mode = st.radio(
+            get_text('edit_mode'),
+            options=list(edit_mode_options.keys()),
+            index=list(edit_mode_options.values()).index(st.session_state.edit_mode),
+            help=get_text('edit_mode_help')
+        )
+        if edit_mode_options[selected_edit_mode] != st.session_state.edit_mode:
+            st.session_state.edit_mode = edit_mode_options[selected_edit_mode]
+            # L'index par défaut suit le mode courant : le widget est recréé à la relance
+            rerun_keeping_inputs()
+        if st.session_state.edit_mode != 'table':
+            for section in LIST_SECTIONS:
+                st.session_state.pop(f"table_source_{section}", None)
+        
+        # Import / export du CV au format JSON versionné
+        st.subheader("💾 " + get_text('cv_data_section'))
+        uploaded = st.file_uploader(get_text('import_json'), type=['json'])
+        if uploaded is not None and st.session_state.get('imported_file_id') != uploaded.file_id:
+            st.session_state.imported_file_id = uploaded.file_id
+            try:
+                load_into_session(CV.from_json(uploaded.getvalue()))
+                st.rerun()
+            except ValidationError as e:
+                st.error("❌ " + get_text('invalid_file') + "\n\n" + "\n".join(f"- {error}" for error in e.errors))
+        # Rempli après la saisie (voir plus bas) : l'export reprend les dernières modifications
+        export_json_slot = st.empty()
+        
+        # CV enregistrés et historique des versions
+        st.subheader("🗂️ " + get_text('my_cvs'))
+        store = get_cv_store()
+        search = st.text_input(
+            get_text('search_cvs'),
+            placeholder=get_text('search_placeholder'),
+            help=get_text('search_help'),
+            key='cv_search'
         )
-        st.session_state.selected_template = template_options[selected_template]
+        if search.strip():
+            try:
+                hits = get_search_index().search(search, top=50, among=store.cv_ids(st.session_state.owner))
+            except ValueError as e:
+                st.error("❌ " + get_text('invalid_search', error=e))
+                hits = []
+            saved_cvs = {
+                f"{hit.name or get_text('untitled_cv')} · {hit.cv_id[:6]}": hit.cv_id
+                for hit in hits
+            }
+            if not hits:
+                st.caption(get_text('no_search_result'))
+        else:
+            saved_cvs = {
+                f"{cv['name'] or get_text('untitled_cv')} ({format_timestamp(cv['updated_at'])})": cv['id']
+                for cv in store.list_cvs(owner=st.session_state.owner)
+            }
+        if saved_cvs:
+            selected_cv = st.selectbox(get_text('saved_cvs'), options=list(saved_cvs.keys()))
+            col_open, col_new = st.columns(2)
+            with col_open:
+                if st.button(get_text('open_cv')):
+                    open_cv(saved_cvs[selected_cv])
+                    st.rerun()
+        else:
+            if not search.strip():
+                st.caption(get_text('no_saved_cv'))
+            col_new = st.container()
+        with col_new:
+            if st.button(get_text('new_cv')):
+                load_into_session(CV())
+                st.session_state.cv_id = new_cv_id()
+                get_autosaver().remember(st.session_state.cv_id, st.session_state.cv_data)
+                st.query_params.clear()
+                st.query_params['key'] = st.session_state.owner
+                st.rerun()
+        st.caption(get_text('bookmark_hint'))
+        
+        history = store.history(st.session_state.cv_id, owner=st.session_state.owner)
+        if len(history) > 1:
+            versions = {
+                get_text('version_label', version=entry['version'], date=format_timestamp(entry['saved_at'])): entry['version']
+                for entry in history
+            }
+            selected_version = st.selectbox(get_text('cv_history'), options=list(versions.keys()))
+            if st.button(get_text('restore_version')):
+                open_cv(st.session_state.cv_id, versions[selected_version])
+                st.rerun()
+        
+        # Panneau de débogage des mesures de rendu (CVAPP_METRICS_PANEL=1)
+        if os.environ.get('CVAPP_METRICS_PANEL') == '1':
+            with st.expander("🔧 " + get_text('render_metrics')):
+                st.table(metrics.summary())
+                st.json(get_artifact_store().stats())
+                if get_render_client() is not None:
+                    st.json(get_render_client().stats())
+                st.download_button(
+                    get_text('export_prometheus'),
+                    data=metrics.render_prometheus(),
+                    file_name="cvapp_metrics.prom",
+                    mime="text/plain"
+                )
     
     # Interface principale avec colonnes
     col1, col2 = st.columns([1, 1])
     
     with col1:
-        st.header("✏️ Saisie des informations")
+        st.header("✏️ " + get_text('input_section'))
         
         # Informations personnelles
         with st.expander(get_text('personal_info'), expanded=True):
-            st.session_state.cv_data['personal_info']['name'] = st.text_input(get_text('name'))
-            st.session_state.cv_data['personal_info']['email'] = st.text_input(get_text('email'))
-            st.session_state.cv_data['personal_info']['phone'] = st.text_input(get_text('phone'))
-            st.session_state.cv_data['personal_info']['address'] = st.text_area(get_text('address'), height=80)
-            st.session_state.cv_data['personal_info']['linkedin'] = st.text_input(get_text('linkedin'))
-            st.session_state.cv_data['personal_info']['github'] = st.text_input(get_text('github'))
+            st.session_state.cv_data['personal_info']['name'] = st.text_input(get_text('name'), key='pi_name')
+            st.session_state.cv_data['personal_info']['email'] = st.text_input(get_text('email'), key='pi_email')
+            st.session_state.cv_data['personal_info']['phone'] = st.text_input(get_text('phone'), key='pi_phone')
+            st.session_state.cv_data['personal_info']['address'] = st.text_area(get_text('address'), height=80, key='pi_address')
+            st.session_state.cv_data['personal_info']['linkedin'] = st.text_input(get_text('linkedin'), key='pi_linkedin')
+            st.session_state.cv_data['personal_info']['github'] = st.text_input(get_text('github'), key='pi_github')
         
         # Résumé professionnel
         with st.expander(get_text('professional_summary')):
             st.session_state.cv_data['professional_summary'] = st.text_area(
                 get_text('professional_summary'),
                 height=100,
-                placeholder="Décrivez brièvement votre profil professionnel..."
+                placeholder=get_text('summary_placeholder'),
+                help=get_text('rich_text_help'),
+                key='summary_text'
             )
         
         # Expérience professionnelle
         with st.expander(get_text('experience')):
-            if st.button(get_text('add_experience')):
-                st.session_state.cv_data['experiences'].append({
-                    'job_title': '',
-                    'company': '',
-                    'start_date': '',
-                    'end_date': '',
-                    'description': ''
+            if st.session_state.edit_mode == 'table':
+                table_editor('experiences', {
+                    'job_title': st.column_config.TextColumn(get_text('job_title')),
+                    'company': st.column_config.TextColumn(get_text('company')),
+                    'start_date': st.column_config.TextColumn(get_text('start_date')),
+                    'end_date': st.column_config.TextColumn(get_text('end_date')),
+                    'description': st.column_config.TextColumn(get_text('description'), width='large')
                 })
+            else:
+                if st.button(get_text('add_experience')):
+                    st.session_state.cv_data['experiences'].append({
+                        'job_title': '',
+                        'company': '',
+                        'start_date': '',
+                        'end_date': '',
+                        'description': ''
+                    })
             
-            for i, exp in enumerate(st.session_state.cv_data['experiences']):
-                st.write(f"**Expérience {i+1}**")
-                col_a, col_b = st.columns(2)
-                with col_a:
-                    exp['job_title'] = st.text_input(get_text('job_title'), key=f"job_title_{i}", value=exp.get('job_title', ''))
-                    exp['start_date'] = st.text_input(get_text('start_date'), key=f"start_date_{i}", value=exp.get('start_date', ''))
-                with col_b:
-                    exp['company'] = st.text_input(get_text('company'), key=f"company_{i}", value=exp.get('company', ''))
-                    exp['end_date'] = st.text_input(get_text('end_date'), key=f"end_date_{i}", value=exp.get('end_date', ''))
-                exp['description'] = st.text_area(get_text('description'), key=f"desc_{i}", value=exp.get('description', ''))
-                if st.button(f"Supprimer", key=f"del_exp_{i}"):
-                    st.session_state.cv_data['experiences'].pop(i)
-                    st.rerun()
-                st.divider()
+                for i, exp in enumerate(st.session_state.cv_data['experiences']):
+                    st.write(f"**{get_text('experience_n', n=i + 1)}**")
+                    col_a, col_b = st.columns(2)
+                    with col_a:
+                        exp['job_title'] = st.text_input(get_text('job_title'), key=f"job_title_{i}", value=exp.get('job_title', ''))
+                        exp['start_date'] = st.text_input(get_text('start_date'), key=f"start_date_{i}", value=exp.get('start_date', ''))
+                    with col_b:
+                        exp['company'] = st.text_input(get_text('company'), key=f"company_{i}", value=exp.get('company', ''))
+                        exp['end_date'] = st.text_input(get_text('end_date'), key=f"end_date_{i}", value=exp.get('end_date', ''))
+                    exp['description'] = st.text_area(get_text('description'), key=f"desc_{i}", value=exp.get('description', ''), help=get_text('rich_text_help'))
+                    if st.button(get_text('delete'), key=f"del_exp_{i}"):
+                        st.session_state.cv_data['experiences'].pop(i)
+                        st.rerun()
+                    st.divider()
         
         # Formation
         with st.expander(get_text('education')):
-            if st.button(get_text('add_education')):
-                st.session_state.cv_data['education'].append({
-                    'degree': '',
-                    'institution': '',
-                    'year': ''
+            if st.session_state.edit_mode == 'table':
+                table_editor('education', {
+                    'degree': st.column_config.TextColumn(get_text('degree')),
+                    'institution': st.column_config.TextColumn(get_text('institution')),
+                    'year': st.column_config.TextColumn(get_text('year'))
                 })
+            else:
+                if st.button(get_text('add_education')):
+                    st.session_state.cv_data['education'].append({
+                        'degree': '',
+                        'institution': '',
+                        'year': ''
+                    })
             
-            for i, edu in enumerate(st.session_state.cv_data['education']):
-                st.write(f"**Formation {i+1}**")
-                col_a, col_b = st.columns(2)
-                with col_a:
-                    edu['degree'] = st.text_input(get_text('degree'), key=f"degree_{i}", value=edu.get('degree', ''))
-                with col_b:
-                    edu['institution'] = st.text_input(get_text('institution'), key=f"institution_{i}", value=edu.get('institution', ''))
-                edu['year'] = st.text_input(get_text('year'), key=f"year_{i}", value=edu.get('year', ''))
-                if st.button(f"Supprimer", key=f"del_edu_{i}"):
-                    st.session_state.cv_data['education'].pop(i)
-                    st.rerun()
-                st.divider()
+                for i, edu in enumerate(st.session_state.cv_data['education']):
+                    st.write(f"**{get_text('education_n', n=i + 1)}**")
+                    col_a, col_b = st.columns(2)
+                    with col_a:
+                        edu['degree'] = st.text_input(get_text('degree'), key=f"degree_{i}", value=edu.get('degree', ''))
+                    with col_b:
+                        edu['institution'] = st.text_input(get_text('institution'), key=f"institution_{i}", value=edu.get('institution', ''))
+                    edu['year'] = st.text_input(get_text('year'), key=f"year_{i}", value=edu.get('year', ''))
+                    if st.button(get_text('delete'), key=f"del_edu_{i}"):
+                        st.session_state.cv_data['education'].pop(i)
+                        st.rerun()
+                    st.divider()
         
         # Compétences
         with st.expander(get_text('skills')):
-            if st.button(get_text('add_skill')):
-                st.session_state.cv_data['skills'].append({
-                    'name': '',
-                    'level': 'Débutant'
+            if st.session_state.edit_mode == 'table':
+                table_editor('skills', {
+                    'name': st.column_config.TextColumn(get_text('skill_name')),
+                    'level': st.column_config.SelectboxColumn(get_text('skill_level'), options=SKILL_LEVELS, default=SKILL_LEVELS[0])
                 })
+            else:
+                if st.button(get_text('add_skill')):
+                    st.session_state.cv_data['skills'].append({
+                        'name': '',
+                        'level': 'Débutant'
+                    })
             
-            for i, skill in enumerate(st.session_state.cv_data['skills']):
-                col_a, col_b = st.columns(2)
-                with col_a:
-                    skill['name'] = st.text_input(get_text('skill_name'), key=f"skill_{i}", value=skill.get('name', ''))
-                with col_b:
-                    skill['level'] = st.selectbox(
-                        get_text('skill_level'),
-                        ['Débutant', 'Intermédiaire', 'Avancé', 'Expert'],
-                        key=f"skill_level_{i}",
-                        index=['Débutant', 'Intermédiaire', 'Avancé', 'Expert'].index(skill.get('level', 'Débutant'))
-                    )
-                if st.button(f"Supprimer", key=f"del_skill_{i}"):
-                    st.session_state.cv_data['skills'].pop(i)
-                    st.rerun()
+                for i, skill in enumerate(st.session_state.cv_data['skills']):
+                    col_a, col_b = st.columns(2)
+                    with col_a:
+                        skill['name'] = st.text_input(get_text('skill_name'), key=f"skill_{i}", value=skill.get('name', ''))
+                    with col_b:
+                        skill['level'] = st.selectbox(
+                            get_text('skill_level'),
+                            SKILL_LEVELS,
+                            key=f"skill_level_{i}",
+                            format_func=level_label,
+                            index=SKILL_LEVELS.index(skill.get('level', SKILL_LEVELS[0]))
+                        )
+                    if st.button(get_text('delete'), key=f"del_skill_{i}"):
+                        st.session_state.cv_data['skills'].pop(i)
+                        st.rerun()
         
         # Langues
         with st.expander(get_text('languages')):
-            if st.button(get_text('add_language')):
-                st.session_state.cv_data['languages'].append({
-                    'name': '',
-                    'level': 'A1'
+            if st.session_state.edit_mode == 'table':
+                table_editor('languages', {
+                    'name': st.column_config.TextColumn(get_text('language_name')),
+                    'level': st.column_config.SelectboxColumn(get_text('language_level'), options=LANGUAGE_LEVELS, default=LANGUAGE_LEVELS[0])
                 })
+            else:
+                if st.button(get_text('add_language')):
+                    st.session_state.cv_data['languages'].append({
+                        'name': '',
+                        'level': 'A1'
+                    })
             
-            for i, lang in enumerate(st.session_state.cv_data['languages']):
-                col_a, col_b = st.columns(2)
-                with col_a:
-                    lang['name'] = st.text_input(get_text('language_name'), key=f"lang_{i}", value=lang.get('name', ''))
-                with col_b:
-                    lang['level'] = st.selectbox(
-                        get_text('language_level'),
-                        ['A1', 'A2', 'B1', 'B2', 'C1', 'C2', 'Natif'],
-                        key=f"lang_level_{i}",
-                        index=['A1', 'A2', 'B1', 'B2', 'C1', 'C2', 'Natif'].index(lang.get('level', 'A1'))
-                    )
-                if st.button(f"Supprimer", key=f"del_lang_{i}"):
-                    st.session_state.cv_data['languages'].pop(i)
-                    st.rerun()
+                for i, lang in enumerate(st.session_state.cv_data['languages']):
+                    col_a, col_b = st.columns(2)
+                    with col_a:
+                        lang['name'] = st.text_input(get_text('language_name'), key=f"lang_{i}", value=lang.get('name', ''))
+                    with col_b:
+                        lang['level'] = st.selectbox(
+                            get_text('language_level'),
+                            LANGUAGE_LEVELS,
+                            key=f"lang_level_{i}",
+                            format_func=level_label,
+                            index=LANGUAGE_LEVELS.index(lang.get('level', LANGUAGE_LEVELS[0]))
+                        )
+                    if st.button(get_text('delete'), key=f"del_lang_{i}"):
+                        st.session_state.cv_data['languages'].pop(i)
+                        st.rerun()
         
         # Centres d'intérêt
         with st.expander(get_text('interests')):
             st.session_state.cv_data['interests'] = st.text_area(
                 get_text('interests'),
                 height=80,
-                placeholder="Vos hobbies et centres d'intérêt..."
+                placeholder=get_text('interests_placeholder'),
+                help=get_text('rich_text_help'),
+                key='interests_text'
             )
     
+    # Document normalisé, reconstruit seulement si le CV a changé, et partagé par l'aperçu et les exports
+    document_memo = st.session_state.document_memo
+    document_memo.update(st.session_state.cv_data)
+    export_json_slot.download_button(
+        get_text('export_json'),
+        data=document_memo.cv_json(),
+        file_name="cv.json",
+        mime="application/json"
+    )
+    
     with col2:
         st.header("👁️ " + get_text('preview'))
         
+        document = document_memo.document(st.session_state.selected_language)
+        
         # Aperçu du CV
         preview_container = st.container()
         
         with preview_container:
-            # Affichage de l'aperçu
-            if st.session_state.cv_data['personal_info'].get('name'):
-                st.markdown(f"# {st.session_state.cv_data['personal_info']['name']}")
-                
-                # Informations de contact
-                contact_info = []
-                for field in ['email', 'phone', 'address', 'linkedin']:
-                    if st.session_state.cv_data['personal_info'].get(field):
-                        contact_info.append(st.session_state.cv_data['personal_info'][field])
-                
-                if contact_info:
-                    st.markdown(" | ".join(contact_info))
-                
-                # Résumé professionnel
-                if st.session_state.cv_data.get('professional_summary'):
-                    st.markdown(f"## {get_text('professional_summary')}")
-                    st.markdown(st.session_state.cv_data['professional_summary'])
-                
-                # Expérience
-                if st.session_state.cv_data.get('experiences'):
-                    st.markdown(f"## {get_text('experience')}")
-                    for exp in st.session_state.cv_data['experiences']:
-                        if exp.get('job_title') and exp.get('company'):
-                            title = f"**{exp['job_title']} - {exp['company']}**"
-                            if exp.get('start_date') and exp.get('end_date'):
-                                title += f" ({exp['start_date']} - {exp['end_date']})"
-                            st.markdown(title)
-                            if exp.get('description'):
-                                st.markdown(exp['description'])
-                
-                # Formation
-                if st.session_state.cv_data.get('education'):
-                    st.markdown(f"## {get_text('education')}")
-                    for edu in st.session_state.cv_data['education']:
-                        if edu.get('degree') and edu.get('institution'):
-                            title = f"**{edu['degree']} - {edu['institution']}**"
-                            if edu.get('year'):
-                                title += f" ({edu['year']})"
-                            st.markdown(title)
-                
-                # Compétences
-                if st.session_state.cv_data.get('skills'):
-                    st.markdown(f"## {get_text('skills')}")
-                    skills_list = [f"{skill['name']} ({skill['level']})" for skill in st.session_state.cv_data['skills'] if skill.get('name')]
-                    st.markdown(" • ".join(skills_list))
-                
-                # Langues
-                if st.session_state.cv_data.get('languages'):
-                    st.markdown(f"## {get_text('languages')}")
-                    langs_list = [f"{lang['name']} ({lang['level']})" for lang in st.session_state.cv_data['languages'] if lang.get('name')]
-                    st.markdown(" • ".join(langs_list))
-                
-                # Centres d'intérêt
-                if st.session_state.cv_data.get('interests'):
-                    st.markdown(f"## {get_text('interests')}")
-                    st.markdown(st.session_state.cv_data['interests'])
+            # Affichage de l'aperçu, seules les sections modifiées sont recalculées
+            if document.name:
+                for section, markdown in st.session_state.preview_memo.render(document):
+                    if markdown:
+                        st.markdown(markdown)
+            if fonts.lacks_font(document):
+                st.warning("🔤 " + get_text('font_missing'))
         
         # Bouton de génération PDF
         st.markdown("---")
         if st.button(get_text('generate_pdf'), type="primary"):
             try:
-                pdf_buffer = create_pdf(
+                job = get_render_queue().submit(
+                    st.session_state.session_id,
                     st.session_state.cv_data,
                     st.session_state.selected_template,
                     st.session_state.selected_language
                 )
+                st.session_state.render_job_id = job.id
+            except QueueFull:
+                st.warning("⏳ " + get_text('queue_full'))
+        
+        if st.session_state.get('render_job_id'):
+            render_job_status()
+        
+        # Autres formats d'export
+        export_formats = {
+            get_text('format_text'): 'text',
+            'HTML': 'html',
+            'Markdown': 'markdown',
+            'JSON': 'json'
+        }
+        col_format, col_export = st.columns([1, 1])
+        with col_format:
+            selected_format = st.selectbox(get_text('other_format'), options=list(export_formats.keys()))
+        fmt = export_formats[selected_format]
+        _, extension, mime = EXPORTERS[fmt]
+        with col_export:
+            st.download_button(
+                label="⬇️ " + get_text('download_format', format=selected_format),
+                data=document_memo.export(fmt, st.session_state.selected_language),
+                file_name=f"CV_{document.name or 'CV'}_{datetime.now().strftime('%Y%m%d')}.{extension}",
+                mime=mime
+            )
+    
+        # Analyse ATS face à une offre d'emploi
+        with st.expander("🎯 " + get_text('ats_analysis')):
+            job_description = st.text_area(
+                get_text('job_description'),
+                height=150,
+                placeholder=get_text('job_description_placeholder'),
+                key='job_description'
+            )
+            if job_description.strip():
+                # NumPy n'est chargé qu'à la première analyse
+                from cvapp.ats import score as ats_score
                 
-                st.download_button(
-                    label="📄 Télécharger le CV (PDF)",
-                    data=pdf_buffer,
-                    file_name=f"CV_{st.session_state.cv_data['personal_info'].get('name', 'CV')}_{datetime.now().strftime('%Y%m%d')}.pdf",
-                    mime="application/pdf"
-                )
-                st.success("✅ CV généré avec succès!")
-                
-            except Exception as e:
-                st.error(f"❌ Erreur lors de la génération du PDF: {str(e)}")
+                analysis = ats_score(st.session_state.cv_data, job_description, st.session_state.selected_language)
+                col_coverage, col_similarity = st.columns(2)
+                col_coverage.metric(get_text('ats_coverage'), f"{analysis['coverage']:.0%}")
+                col_similarity.metric(get_text('ats_similarity'), f"{analysis['similarity']:.0%}")
+                if analysis['missing']:
+                    st.markdown(f"**{get_text('ats_missing')}** " + ", ".join(analysis['missing']))
+                if analysis['matched']:
+                    st.caption(get_text('ats_matched') + " " + ", ".join(analysis['matched']))
     
     # Footer
     st.markdown("---")
-    st.markdown("*Générateur de CV intelligent - Optimisé pour les systèmes ATS*")
+    st.markdown(f"*{get_text('footer')}*")
+    
+    # Sauvegarde automatique : n'écrit (plus tard, en arrière-plan) que si le CV a changé
+    if get_autosaver().schedule(
+        st.session_state.cv_id,
+        st.session_state.cv_data,
+        owner=st.session_state.owner,
+        serialized=st.session_state.document_memo.serialized
+    ):
+        st.query_params['cv'] = st.session_state.cv_id
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    start_metrics_exporter()
+    try:
+        with metrics.timed('cvapp_streamlit_rerun_seconds'):
+            main()
+    finally:
+        if os.environ.get('CVAPP_METRICS_FILE'):
+            metrics.dump(os.environ['CVAPP_METRICS_FILE'])
\ No newline at end of file
@@ -0,0 +1,8 @@
+"""Cœur du générateur de CV, utilisable sans Streamlit
+
+Les modules qui dépendent de ReportLab (pdf, templates) ou de pandas (tables)
+ne sont importés qu'à leur première utilisation.
+"""
+
+# À incrémenter à chaque changement du rendu, pour invalider les caches
+RENDERER_VERSION = 6
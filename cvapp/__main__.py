@@ -0,0 +1,278 @@
+"""Point d'entrée en ligne de commande : python -m cvapp <commande>"""
+
+import argparse
+import json
+import os
+import sys
+import zipfile
+
+from .templates import TEMPLATES
+from .translations import DEFAULT_LOCALE, available_locales
+
+
+def _render(args):
+    from .batch import render_directory
+
+    summary = render_directory(
+        args.input,
+        args.out,
+        template=args.template,
+        language=args.language,
+        workers=args.workers,
+        cache_dir=args.cache_dir,
+    )
+    for result in summary['results']:
+        if not result['ok']:
+            print(f"ÉCHEC {result['input']}: {result['error']}", file=sys.stderr)
+    print(
+        f"{summary['succeeded']}/{summary['total']} CV générés en "
+        f"{summary['seconds']:.2f}s ({summary['cvs_per_second']:.1f} CV/s, "
+        f"{summary['workers']} processus)"
+    )
+    return 1 if summary['failed'] else 0
+
+
+def _export(args):
+    from .bulk import export_zip
+
+    summary = export_zip(
+        args.input,
+        args.out,
+        template=args.template,
+        language=args.language,
+        workers=args.workers,
+        ordered=not args.unordered,
+        resume=args.resume,
+        compression=zipfile.ZIP_DEFLATED if args.compress else zipfile.ZIP_STORED,
+        window=args.window,
+    )
+    for failure in summary['failures']:
+        print(f"ÉCHEC {failure['entry']}: {failure['error']}", file=sys.stderr)
+    skipped = f", {summary['skipped']} déjà présents" if summary['skipped'] else ""
+    print(
+        f"{summary['written']} CV ajoutés à {args.out}{skipped} en "
+        f"{summary['seconds']:.2f}s ({summary['cvs_per_second']:.1f} CV/s, "
+        f"{summary['workers']} processus)"
+    )
+    return 1 if summary['failed'] else 0
+
+
+def _load_cvs(source):
+    """(identifiant, cv_data) des CV d'un dossier *.json ou d'un fichier .jsonl/.csv"""
+    from pathlib import Path
+
+    from .batch import load_cv_data
+    from .bulk import iter_records, load_record
+
+    cvs = []
+    if Path(source).is_dir():
+        for path in sorted(Path(source).glob('*.json')):
+            try:
+                cvs.append((path.stem, load_cv_data(path)))
+            except Exception as e:
+                print(f"IGNORÉ {path}: {type(e).__name__}: {e}", file=sys.stderr)
+        return cvs
+    for _, record_id, raw in iter_records(source):
+        try:
+            cvs.append((record_id, load_record(raw)))
+        except Exception as e:
+            print(f"IGNORÉ {record_id}: {type(e).__name__}: {e}", file=sys.stderr)
+    return cvs
+
+
+def _ats(args):
+    from .ats import relevance_order, score_matrix
+
+    cvs = _load_cvs(args.cvs)
+    jobs = []
+    for path in args.jobs:
+        with open(path, encoding='utf-8') as f:
+            jobs.append(f.read())
+    scores = score_matrix([cv for _, cv in cvs], jobs, args.language)
+
+    ranking = {}
+    for j, path in enumerate(args.jobs):
+        similarity = scores['similarity'][:, j]
+        coverage = scores['coverage'][:, j]
+        order = relevance_order(coverage, similarity)[:args.top]
+        ranking[path] = [
+            {'id': cvs[i][0], 'coverage': float(coverage[i]), 'similarity': float(similarity[i])}
+            for i in order
+        ]
+    if args.json:
+        print(json.dumps(ranking, ensure_ascii=False, indent=2))
+        return 0
+    for path, rows in ranking.items():
+        print(f"{path} ({len(cvs)} CV)")
+        for rank, row in enumerate(rows, 1):
+            print(f"  {rank:3d}. {row['id']:<30} mots-clés {row['coverage']:6.1%}  similarité {row['similarity']:6.1%}")
+    return 0
+
+
+def _search(args):
+    from .search import SearchIndex, parse_query
+    from .store import DEFAULT_PATH, CVStore
+
+    try:
+        query = parse_query(' '.join(args.query))
+    except ValueError as e:
+        print(f"ERREUR {e}", file=sys.stderr)
+        return 2
+    store = CVStore(args.store or os.environ.get('CVAPP_STORE_PATH', DEFAULT_PATH))
+    try:
+        index = SearchIndex.from_store(store, args.language)
+        hits = index.search(query, args.top)
+    finally:
+        store.close()
+    if args.json:
+        print(json.dumps([hit._asdict() for hit in hits], ensure_ascii=False, indent=2))
+        return 0
+    print(f"{len(hits)} CV sur {len(index)}")
+    for rank, hit in enumerate(hits, 1):
+        print(f"  {rank:3d}. {hit.cv_id:<14} {hit.name or '-':<30} score {hit.score:.3f}")
+    return 0
+
+
+def _serve(args):
+    from .service import serve
+
+    print(f"Service de rendu sur http://{args.host}:{args.port} (Ctrl+C pour arrêter)")
+    serve(
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        use_processes=not args.threads,
+        max_pending=args.max_pending,
+        cache_dir=args.cache_dir,
+        cache_mb=args.cache_mb,
+    )
+    return 0
+
+
+def _startup_report(args):
+    from .startup import check_budget, format_report, measure_startup
+
+    report = measure_startup(load_app=not args.core_only)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_report(report))
+    failures = check_budget(report, args.max_load_ms, args.max_first_render_ms)
+    for failure in failures:
+        print(f"BUDGET DÉPASSÉ : {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def _bench(args):
+    from .bench import compare, load_results, run_benchmarks, save_results
+
+    def progress(name, case):
+        print(
+            f"{name:<22} story {case['story_seconds'] * 1000:8.1f} ms  "
+            f"build {case['build_seconds'] * 1000:8.1f} ms  "
+            f"aperçu {case['preview_seconds'] * 1000:6.2f} ms  "
+            f"{case['pages']:3d} p.  {case['pdf_bytes'] / 1024:7.1f} Ko  "
+            f"pic {case['peak_memory_bytes'] / 1024 / 1024:6.1f} Mo"
+        )
+
+    results = run_benchmarks(
+        sizes=args.sizes,
+        templates=args.templates,
+        languages=args.languages,
+        repeat=args.repeat,
+        progress=progress,
+    )
+    save_results(results, args.out)
+    print(f"Résultats écrits dans {args.out}")
+
+    if not args.baseline:
+        return 0
+    regressions = compare(results, load_results(args.baseline), args.threshold)
+    for r in regressions:
+        print(
+            f"RÉGRESSION {r['case']} {r['metric']}: {r['baseline']:.4g} -> {r['current']:.4g} "
+            f"(x{r['ratio']:.2f})",
+            file=sys.stderr,
+        )
+    return 1 if regressions else 0
+
+
+def build_parser():
+    """Construit l'analyseur d'arguments de la ligne de commande"""
+    parser = argparse.ArgumentParser(prog='python -m cvapp')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    render = subparsers.add_parser('render', help="Génère les PDF d'un dossier de fichiers JSON")
+    render.add_argument('--input', required=True, help="Dossier contenant les fichiers cv_data *.json")
+    render.add_argument('--out', required=True, help="Dossier de sortie des PDF")
+    render.add_argument('--workers', type=int, default=None, help="Nombre de processus (défaut : nombre de CPU)")
+    render.add_argument('--template', choices=TEMPLATES, default='classic')
+    render.add_argument('--language', choices=available_locales(), default=DEFAULT_LOCALE)
+    render.add_argument('--cache-dir', default=None, help="Dossier du cache disque des PDF déjà générés")
+    render.set_defaults(func=_render)
+
+    export = subparsers.add_parser('export', help="Exporte une cohorte de CV (JSON lines ou CSV) en une archive ZIP")
+    export.add_argument('--input', required=True, help="Fichier source .jsonl/.ndjson (un CV par ligne) ou .csv")
+    export.add_argument('--out', required=True, help="Archive ZIP de sortie")
+    export.add_argument('--workers', type=int, default=None, help="Nombre de processus (défaut : nombre de CPU)")
+    export.add_argument('--template', choices=TEMPLATES, default='classic')
+    export.add_argument('--language', choices=available_locales(), default=DEFAULT_LOCALE)
+    export.add_argument('--unordered', action='store_true', help="Écrit les PDF dans l'ordre où ils sont prêts")
+    export.add_argument('--resume', action='store_true', help="Reprend une archive existante sans refaire ses CV")
+    export.add_argument('--compress', action='store_true', help="Compresse les PDF (deflate) au lieu de les stocker")
+    export.add_argument('--window', type=int, default=None, help="Rendus en vol au plus (défaut : 4 par processus)")
+    export.set_defaults(func=_export)
+
+    ats = subparsers.add_parser('ats', help="Classe des CV face à une ou plusieurs offres d'emploi")
+    ats.add_argument('--cvs', required=True, help="Dossier de fichiers *.json, ou fichier .jsonl/.ndjson/.csv")
+    ats.add_argument('--jobs', required=True, nargs='+', help="Fichiers texte des offres d'emploi")
+    ats.add_argument('--language', choices=available_locales(), default=DEFAULT_LOCALE)
+    ats.add_argument('--top', type=int, default=10, help="Nombre de CV affichés par offre")
+    ats.add_argument('--json', action='store_true', help="Sortie JSON")
+    ats.set_defaults(func=_ats)
+
+    search = subparsers.add_parser('search', help="Recherche dans les CV enregistrés")
+    search.add_argument('query', nargs='+', help="Requête : mots libres, skill:nom>=niveau, lang:langue>=niveau, title:…, company:…")
+    search.add_argument('--store', default=None, help="Base des CV (défaut : CVAPP_STORE_PATH ou ~/.cvapp/cvs.sqlite3)")
+    search.add_argument('--language', choices=available_locales(), default=DEFAULT_LOCALE)
+    search.add_argument('--top', type=int, default=20, help="Nombre de CV affichés")
+    search.add_argument('--json', action='store_true', help="Sortie JSON")
+    search.set_defaults(func=_search)
+
+    serve = subparsers.add_parser('serve', help="Lance le service HTTP local de rendu PDF")
+    serve.add_argument('--host', default='127.0.0.1', help="Adresse d'écoute (défaut : 127.0.0.1, local uniquement)")
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--workers', type=int, default=None, help="Processus de rendu (défaut : nombre de CPU)")
+    serve.add_argument('--threads', action='store_true', help="Rend dans des threads plutôt que des processus")
+    serve.add_argument('--max-pending', type=int, default=64, help="Rendus distincts en cours au plus (au-delà : 503)")
+    serve.add_argument('--cache-dir', default=None, help="Dossier du cache disque des PDF rendus")
+    serve.add_argument('--cache-mb', type=int, default=256, help="Taille du cache mémoire des PDF, en Mo")
+    serve.set_defaults(func=_serve)
+
+    startup = subparsers.add_parser('startup-report', help="Mesure le démarrage à froid et le premier rendu")
+    startup.add_argument('--core-only', action='store_true', help="Mesure le paquet cvapp seul, sans Streamlit")
+    startup.add_argument('--json', action='store_true', help="Sortie JSON")
+    startup.add_argument('--max-load-ms', type=float, default=None, help="Échoue si le chargement dépasse ce budget")
+    startup.add_argument('--max-first-render-ms', type=float, default=None, help="Échoue si le premier rendu dépasse ce budget")
+    startup.set_defaults(func=_startup_report)
+
+    bench = subparsers.add_parser('bench', help="Bancs d'essai du rendu PDF et de l'aperçu")
+    bench.add_argument('--out', default='bench_results.json', help="Fichier JSON des résultats")
+    bench.add_argument('--baseline', default=None, help="Résultats de référence à comparer")
+    bench.add_argument('--threshold', type=float, default=0.2, help="Régression tolérée (0.2 = +20 %%)")
+    bench.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 50, 100, 500], help="Nombres d'expériences")
+    bench.add_argument('--templates', nargs='+', choices=TEMPLATES, default=None)
+    bench.add_argument('--languages', nargs='+', choices=available_locales(), default=None)
+    bench.add_argument('--repeat', type=int, default=3)
+    bench.set_defaults(func=_bench)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
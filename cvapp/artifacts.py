@@ -0,0 +1,245 @@
+"""Fichiers générés (PDF…) gardés pour le téléchargement, sous un budget mémoire global
+
+Les sessions ne conservent plus les octets de leurs PDF : elles gardent la
+clé de rendu et relisent l'artefact ici. Un même PDF demandé par plusieurs
+sessions n'existe donc qu'une fois. Les artefacts restent en mémoire tant
+que le budget le permet ; les gros, et les moins récemment utilisés quand le
+budget est dépassé, sont déversés dans des fichiers temporaires, relus par
+mmap. Un artefact inutilisé depuis ttl secondes est oublié, et le disque a
+lui aussi son propre plafond.
+"""
+
+import atexit
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from io import BytesIO
+
+CHUNK_SIZE = 64 * 1024
+
+
+class Artifact:
+    """Un fichier généré, en mémoire (data) ou déversé sur disque (path)"""
+
+    __slots__ = ('key', 'size', 'mime', 'created_at', 'last_access', 'data', 'path')
+
+    def __init__(self, key, data, mime):
+        self.key = key
+        self.size = len(data)
+        self.mime = mime
+        self.created_at = self.last_access = time.monotonic()
+        self.data = data
+        self.path = None
+
+    @property
+    def spilled(self):
+        return self.data is None
+
+    def open(self):
+        """Fichier binaire en lecture sur le contenu, sans copie pour un artefact déversé"""
+        data = self.data
+        if data is not None:
+            return BytesIO(data)
+        return open(self.path, 'rb')
+
+    def iter_chunks(self, chunk_size=CHUNK_SIZE):
+        """Parcourt le contenu par blocs, via mmap pour un artefact déversé"""
+        data = self.data
+        if data is not None:
+            view = memoryview(data)
+            for start in range(0, self.size, chunk_size):
+                yield view[start:start + chunk_size]
+            return
+        if not self.size:
+            return
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for start in range(0, self.size, chunk_size):
+                yield mapped[start:start + chunk_size]
+
+    def read(self):
+        data = self.data
+        if data is not None:
+            return data
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+
+class ArtifactStore:
+    """Artefacts adressés par clé, LRU, bornés en mémoire et sur disque
+
+    - max_memory_bytes : budget global des artefacts gardés en mémoire ;
+    - spill_threshold : au-delà, un artefact va directement sur disque ;
+    - max_disk_bytes : plafond des fichiers déversés (les plus anciens partent) ;
+    - ttl : durée de vie sans accès, en secondes.
+    """
+
+    def __init__(self, max_memory_bytes=64 * 1024 * 1024, spill_threshold=1024 * 1024,
+                 max_disk_bytes=1024 * 1024 * 1024, ttl=600, spill_dir=None):
+        self.max_memory_bytes = max_memory_bytes
+        self.spill_threshold = spill_threshold
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+        self._spill_root = spill_dir
+        self._spill_dir = None
+        self._artifacts = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.spills = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    # Disque
+
+    def _spill_path(self, artifact):
+        if self._spill_dir is None:
+            if self._spill_root:
+                os.makedirs(self._spill_root, exist_ok=True)
+            self._spill_dir = tempfile.mkdtemp(prefix='cvapp-artifacts-', dir=self._spill_root)
+            atexit.register(shutil.rmtree, self._spill_dir, True)
+        return os.path.join(self._spill_dir, f"{artifact.key}.bin")
+
+    def _spill(self, artifact):
+        """Écrit l'artefact sur disque et libère sa copie en mémoire ; False si le disque le refuse"""
+        try:
+            path = self._spill_path(artifact)
+            fd, tmp = tempfile.mkstemp(dir=self._spill_dir, suffix='.tmp')
+        except OSError:
+            return False
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(artifact.data)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            return False
+        artifact.path = path
+        artifact.data = None
+        self._memory_bytes -= artifact.size
+        self._disk_bytes += artifact.size
+        self.spills += 1
+        return True
+
+    def _remove(self, artifact):
+        del self._artifacts[artifact.key]
+        if artifact.spilled:
+            self._disk_bytes -= artifact.size
+            try:
+                os.unlink(artifact.path)
+            except OSError:
+                pass
+        else:
+            self._memory_bytes -= artifact.size
+
+    # Éviction
+
+    def _expire(self, now):
+        """Oublie les artefacts inutilisés depuis plus de ttl secondes"""
+        if not self.ttl:
+            return
+        limit = now - self.ttl
+        # OrderedDict trié par dernier accès : on s'arrête au premier artefact récent
+        while self._artifacts:
+            artifact = next(iter(self._artifacts.values()))
+            if artifact.last_access >= limit:
+                break
+            self._remove(artifact)
+            self.expirations += 1
+
+    def _enforce_budgets(self):
+        if self._memory_bytes > self.max_memory_bytes:
+            for artifact in list(self._artifacts.values()):
+                if self._memory_bytes <= self.max_memory_bytes:
+                    break
+                if not artifact.spilled and not self._spill(artifact):
+                    self._remove(artifact)
+                    self.evictions += 1
+        if self._disk_bytes > self.max_disk_bytes:
+            for artifact in list(self._artifacts.values()):
+                if self._disk_bytes <= self.max_disk_bytes:
+                    break
+                if artifact.spilled:
+                    self._remove(artifact)
+                    self.evictions += 1
+
+    # API publique
+
+    def put(self, key, data, mime='application/pdf'):
+        """Enregistre data sous key (remplace l'artefact existant) et retourne l'artefact"""
+        artifact = Artifact(key, bytes(data), mime)
+        with self._lock:
+            old = self._artifacts.get(key)
+            if old is not None:
+                self._remove(old)
+            self._artifacts[key] = artifact
+            self._memory_bytes += artifact.size
+            if artifact.size >= self.spill_threshold and not self._spill(artifact):
+                # Disque indisponible : l'artefact reste en mémoire, sous le budget global
+                pass
+            self._expire(time.monotonic())
+            self._enforce_budgets()
+        return artifact
+
+    def get(self, key):
+        """Retourne l'artefact key (et le marque comme récemment utilisé), ou None"""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            artifact = self._artifacts.get(key)
+            if artifact is None:
+                self.misses += 1
+                return None
+            artifact.last_access = now
+            self._artifacts.move_to_end(key)
+            self.hits += 1
+            return artifact
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._artifacts
+
+    def discard(self, key):
+        with self._lock:
+            artifact = self._artifacts.get(key)
+            if artifact is not None:
+                self._remove(artifact)
+
+    def prune(self):
+        """Applique le TTL sans attendre la prochaine lecture ou écriture"""
+        with self._lock:
+            self._expire(time.monotonic())
+
+    def clear(self):
+        with self._lock:
+            for artifact in list(self._artifacts.values()):
+                self._remove(artifact)
+
+    def stats(self):
+        """Occupation mémoire et disque, et compteurs d'activité"""
+        with self._lock:
+            spilled = sum(1 for artifact in self._artifacts.values() if artifact.spilled)
+            return {
+                'artifacts': len(self._artifacts),
+                'spilled': spilled,
+                'memory_bytes': self._memory_bytes,
+                'max_memory_bytes': self.max_memory_bytes,
+                'disk_bytes': self._disk_bytes,
+                'max_disk_bytes': self.max_disk_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'spills': self.spills,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+default_artifacts = ArtifactStore()
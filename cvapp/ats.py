@@ -0,0 +1,149 @@
+"""Analyse ATS : correspondance entre des CV et des offres d'emploi
+
+Les textes sont normalisés et découpés en mots-clés par cvapp.text. Pour
+chaque paire CV × offre on calcule :
+
+- coverage : part des mots-clés distincts de l'offre présents dans le CV ;
+- similarity : similarité cosinus de leurs vecteurs TF-IDF.
+
+score_matrix traite N CV et M offres d'un bloc : les documents sont
+tokenisés une seule fois, puis les scores sont obtenus par produits de
+matrices NumPy, restreints au vocabulaire des offres et découpés en blocs de
+CV pour borner la mémoire. Aucune boucle Python par paire.
+"""
+
+from collections import Counter
+
+import numpy as np
+
+from .model import as_cv_data
+from .text import surface_forms, term_counts, tokenize
+
+# Lignes de CV traitées par bloc dans score_matrix
+CHUNK_ROWS = 4096
+
+
+def cv_text(cv_data):
+    """Texte du CV pris en compte par l'analyse : résumé, expériences, compétences"""
+    cv_data = as_cv_data(cv_data)
+    parts = [cv_data.get('professional_summary') or '']
+    for exp in cv_data.get('experiences') or ():
+        parts.extend([exp.get('job_title') or '', exp.get('description') or ''])
+    parts.extend(skill.get('name') or '' for skill in cv_data.get('skills') or ())
+    return '\n'.join(part for part in parts if part)
+
+
+class _Corpus:
+    """Documents tokenisés, sous forme creuse (document, terme, poids)"""
+
+    def __init__(self, counters):
+        vocabulary = {}
+        docs, terms, counts = [], [], []
+        for doc, counter in enumerate(counters):
+            for term, count in counter.items():
+                docs.append(doc)
+                terms.append(vocabulary.setdefault(term, len(vocabulary)))
+                counts.append(count)
+        self.vocabulary = vocabulary
+        self.size = len(counters)
+        self.docs = np.asarray(docs, dtype=np.int64)
+        self.terms = np.asarray(terms, dtype=np.int64)
+        self.counts = np.asarray(counts, dtype=np.float64)
+
+    def tfidf(self):
+        """Poids TF-IDF (tf sous-linéaire, idf lissé) et norme de chaque document"""
+        df = np.bincount(self.terms, minlength=len(self.vocabulary))
+        idf = np.log((1 + self.size) / (1 + df)) + 1.0
+        weights = (1.0 + np.log(self.counts)) * idf[self.terms]
+        norms = np.sqrt(np.bincount(self.docs, weights=weights ** 2, minlength=self.size))
+        return weights, norms, idf
+
+
+def score_matrix(cvs, jobs, language='fr', chunk_rows=CHUNK_ROWS):
+    """Scores de N CV contre M offres ; retourne deux matrices N × M
+
+    cvs : CV typés ou dictionnaires cv_data ; jobs : textes des offres.
+    L'idf est calculé sur l'ensemble des N + M documents.
+    """
+    cv_counters = [term_counts(cv_text(cv), language) for cv in cvs]
+    job_counters = [term_counts(job, language) for job in jobs]
+    n, m = len(cv_counters), len(job_counters)
+    if not n or not m:
+        return {'similarity': np.zeros((n, m)), 'coverage': np.zeros((n, m))}
+
+    corpus = _Corpus(job_counters + cv_counters)
+    weights, norms, _ = corpus.tfidf()
+
+    # Colonnes : le vocabulaire des offres, seul utile au produit scalaire
+    is_job = corpus.docs < m
+    job_terms = np.unique(corpus.terms[is_job])
+    column = np.full(len(corpus.vocabulary), -1, dtype=np.int64)
+    column[job_terms] = np.arange(len(job_terms))
+
+    job_matrix = np.zeros((m, len(job_terms)))
+    job_matrix[corpus.docs[is_job], column[corpus.terms[is_job]]] = weights[is_job]
+    job_presence = (job_matrix > 0).astype(np.float64)
+    job_keywords = job_presence.sum(axis=1)
+    job_norms = norms[:m]
+
+    # Entrées des CV qui touchent un mot-clé d'une offre, ligne = numéro de CV
+    in_jobs = ~is_job & (column[corpus.terms] >= 0)
+    cv_rows = corpus.docs[in_jobs] - m
+    cv_cols = column[corpus.terms[in_jobs]]
+    cv_weights = weights[in_jobs]
+    cv_norms = norms[m:]
+
+    similarity = np.zeros((n, m))
+    coverage = np.zeros((n, m))
+    # Entrées triées par CV : chaque bloc de lignes est une tranche contiguë
+    bounds = np.searchsorted(cv_rows, np.arange(0, n + chunk_rows, chunk_rows))
+    for block, start in enumerate(range(0, n, chunk_rows)):
+        stop = min(start + chunk_rows, n)
+        lo, hi = bounds[block], bounds[block + 1]
+        dense = np.zeros((stop - start, len(job_terms)))
+        dense[cv_rows[lo:hi] - start, cv_cols[lo:hi]] = cv_weights[lo:hi]
+        dot = dense @ job_matrix.T
+        denominator = np.outer(cv_norms[start:stop], job_norms)
+        similarity[start:stop] = np.divide(dot, denominator, out=np.zeros_like(dot), where=denominator > 0)
+        matched = (dense > 0).astype(np.float64) @ job_presence.T
+        coverage[start:stop] = np.divide(matched, job_keywords, out=np.zeros_like(matched), where=job_keywords > 0)
+    return {'similarity': similarity, 'coverage': coverage}
+
+
+def score(cv_data, job_description, language='fr', max_keywords=20):
+    """Analyse d'un CV face à une offre : scores et mots-clés présents ou manquants
+
+    Les mots-clés de l'offre sont classés par importance (nombre
+    d'occurrences dans l'offre, puis ordre d'apparition).
+    """
+    scores = score_matrix([cv_data], [job_description], language)
+    cv_terms = set(term_counts(cv_text(cv_data), language))
+    job_counts = Counter(tokenize(job_description, language))
+    forms = surface_forms(job_description)
+    keywords = [term for term, _ in job_counts.most_common()]
+    return {
+        'similarity': float(scores['similarity'][0, 0]),
+        'coverage': float(scores['coverage'][0, 0]),
+        'matched': [forms.get(term, term) for term in keywords if term in cv_terms][:max_keywords],
+        'missing': [forms.get(term, term) for term in keywords if term not in cv_terms][:max_keywords],
+    }
+
+
+def relevance_order(coverage, similarity):
+    """Ordre des CV du plus au moins pertinent : couverture des mots-clés, puis similarité
+
+    np.lexsort trie selon la dernière clé d'abord : la similarité ne départage
+    que les CV de même couverture.
+    """
+    return np.lexsort((-similarity, -coverage))
+
+
+def rank(cvs, job_description, language='fr', top=None):
+    """Indices des CV triés du plus au moins pertinent pour une offre, avec leurs scores"""
+    scores = score_matrix(cvs, [job_description], language)
+    similarity = scores['similarity'][:, 0]
+    coverage = scores['coverage'][:, 0]
+    order = relevance_order(coverage, similarity)
+    if top is not None:
+        order = order[:top]
+    return [(int(i), float(coverage[i]), float(similarity[i])) for i in order]
@@ -0,0 +1,85 @@
+"""Rendu PDF en lot, sans Streamlit, réparti sur un pool de processus"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from .cache import RenderCache, cached_create_pdf
+from .model import CV
+
+# Un cache par dossier disque et par processus de travail
+_caches = {}
+
+
+def load_cv_data(path):
+    """Charge et valide un fichier JSON (format versionné ou forme cv_data)"""
+    with open(path, 'rb') as f:
+        return CV.from_json(f.read()).to_dict()
+
+
+def _get_cache(cache_dir):
+    cache = _caches.get(cache_dir)
+    if cache is None:
+        cache = _caches[cache_dir] = RenderCache(disk_dir=cache_dir)
+    return cache
+
+
+def render_file(input_path, output_dir, template, language, cache_dir=None):
+    """Rend un seul fichier JSON en PDF ; ne lève jamais d'exception"""
+    input_path = Path(input_path)
+    output_path = Path(output_dir) / (input_path.stem + '.pdf')
+    start = time.perf_counter()
+    try:
+        cv_data = load_cv_data(input_path)
+        buffer = cached_create_pdf(cv_data, template, language, cache=_get_cache(cache_dir))
+        output_path.write_bytes(buffer.getbuffer())
+    except Exception as e:
+        return {
+            'input': str(input_path),
+            'output': None,
+            'ok': False,
+            'error': f"{type(e).__name__}: {e}",
+            'seconds': time.perf_counter() - start,
+        }
+    return {
+        'input': str(input_path),
+        'output': str(output_path),
+        'ok': True,
+        'error': None,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def render_directory(input_dir, output_dir, template='classic', language='fr', workers=None,
+                     cache_dir=None):
+    """Rend tous les fichiers *.json d'un dossier et retourne un résumé"""
+    inputs = sorted(Path(input_dir).glob('*.json'))
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    results = []
+    if workers == 1:
+        for path in inputs:
+            results.append(render_file(path, output_dir, template, language, cache_dir))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(render_file, path, output_dir, template, language, cache_dir)
+                for path in inputs
+            ]
+            for future in as_completed(futures):
+                results.append(future.result())
+    elapsed = time.perf_counter() - start
+
+    succeeded = sum(1 for r in results if r['ok'])
+    return {
+        'total': len(results),
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'seconds': elapsed,
+        'cvs_per_second': succeeded / elapsed if elapsed > 0 else 0.0,
+        'workers': workers,
+        'results': sorted(results, key=lambda r: r['input']),
+    }
@@ -0,0 +1,201 @@
+"""Bancs d'essai du rendu PDF et de l'aperçu, sur des CV synthétiques
+
+Les résultats sont écrits en JSON et peuvent être comparés à une référence
+enregistrée, avec un seuil de régression relatif.
+"""
+
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+
+from . import RENDERER_VERSION
+from .schema import LANGUAGE_LEVELS, SKILL_LEVELS, empty_cv_data
+from .templates import TEMPLATES
+from .translations import available_locales
+
+DEFAULT_SIZES = (1, 10, 50, 100, 500)
+
+# Rendus non mesurés avant le premier cas, quel que soit le nombre de cas choisis
+WARM_UP_RENDERS = 20
+
+# Métriques comparées à la référence (plus petit = meilleur)
+COMPARED_METRICS = ('story_seconds', 'build_seconds', 'total_seconds', 'preview_seconds', 'peak_memory_bytes')
+
+_WORDS = (
+    "développement gestion projet équipe client analyse données système "
+    "architecture performance qualité livraison migration cloud sécurité "
+    "automatisation tests intégration déploiement supervision optimisation"
+).split()
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def synthetic_cv(experiences, description_words=120, seed=0):
+    """Génère un cv_data réaliste avec le nombre d'expériences demandé"""
+    rng = random.Random(seed)
+    cv_data = empty_cv_data()
+    cv_data['personal_info'] = {
+        'name': 'Camille Janssens',
+        'email': 'camille.janssens@example.com',
+        'phone': '+32 470 12 34 56',
+        'address': 'Rue de la Loi 16, 1000 Bruxelles',
+        'linkedin': 'linkedin.com/in/camille-janssens',
+        'github': 'github.com/cjanssens',
+    }
+    cv_data['professional_summary'] = " ".join(_sentence(rng, 15) for _ in range(5))
+    for i in range(experiences):
+        cv_data['experiences'].append({
+            'job_title': f"Ingénieur {rng.choice(_WORDS)}",
+            'company': f"Entreprise {i + 1}",
+            'start_date': f"{2000 + i % 20}-01",
+            'end_date': f"{2001 + i % 20}-12",
+            'description': " ".join(_sentence(rng, 12) for _ in range(max(1, description_words // 12))),
+        })
+    for i in range(max(1, experiences // 5)):
+        cv_data['education'].append({
+            'degree': f"Master {rng.choice(_WORDS)}",
+            'institution': f"Université {i + 1}",
+            'year': str(1995 + i % 25),
+        })
+    cv_data['skills'] = [
+        {'name': word, 'level': rng.choice(SKILL_LEVELS)} for word in _WORDS[:max(3, min(len(_WORDS), experiences))]
+    ]
+    cv_data['languages'] = [
+        {'name': name, 'level': rng.choice(LANGUAGE_LEVELS)} for name in ('Français', 'Nederlands', 'English')
+    ]
+    cv_data['interests'] = _sentence(rng, 20)
+    return cv_data
+
+
+def _warm_up(templates, languages, renders=WARM_UP_RENDERS):
+    """Rendus non mesurés : au moins un par modèle et par langue, et renders en tout
+
+    Le premier rendu paie l'import de ReportLab, la construction des styles du
+    modèle, le chargement des polices et du catalogue de la langue ; les
+    suivants restent plus lents tant que l'interpréteur n'a pas spécialisé le
+    code. Sans ce tour à vide, le premier cas mesuré dépendrait de l'ordre
+    d'exécution, et un sous-ensemble de cas ne serait pas comparable à une
+    référence complète.
+    """
+    from .pdf import build_pdf, build_story
+    from .preview import preview_markdown
+
+    cv_data = synthetic_cv(1)
+    cases = [(template, language) for template in templates for language in languages]
+    for i in range(max(renders, len(cases))):
+        template, language = cases[i % len(cases)]
+        build_pdf(build_story(cv_data, template, language), template, BytesIO())
+        preview_markdown(cv_data, language)
+
+
+def _time_case(cv_data, template, language, repeat):
+    from .pdf import build_pdf, build_story
+    from .preview import preview_markdown
+
+    story_times, build_times, preview_times = [], [], []
+    size = pages = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        story = build_story(cv_data, template, language)
+        story_times.append(time.perf_counter() - start)
+
+        buffer = BytesIO()
+        start = time.perf_counter()
+        doc = build_pdf(story, template, buffer)
+        build_times.append(time.perf_counter() - start)
+        size = buffer.getbuffer().nbytes
+        pages = doc.page
+
+        start = time.perf_counter()
+        preview_markdown(cv_data, language)
+        preview_times.append(time.perf_counter() - start)
+
+    # Pic mémoire mesuré sur un rendu complet séparé, tracemalloc ralentissant le code
+    tracemalloc.start()
+    buffer = BytesIO()
+    build_pdf(build_story(cv_data, template, language), template, buffer)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    story_seconds = statistics.median(story_times)
+    build_seconds = statistics.median(build_times)
+    return {
+        'story_seconds': story_seconds,
+        'build_seconds': build_seconds,
+        'total_seconds': story_seconds + build_seconds,
+        'preview_seconds': statistics.median(preview_times),
+        'peak_memory_bytes': peak,
+        'pdf_bytes': size,
+        'pages': pages,
+    }
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, templates=None, languages=None, repeat=3,
+                   description_words=120, progress=None):
+    """Exécute tous les cas et retourne le rapport complet"""
+    templates = templates or TEMPLATES
+    languages = languages or available_locales()
+    _warm_up(templates, languages)
+    cases = {}
+    for size in sizes:
+        cv_data = synthetic_cv(size, description_words=description_words)
+        for template in templates:
+            for language in languages:
+                name = f"{template}/{language}/{size}"
+                cases[name] = _time_case(cv_data, template, language, repeat)
+                if progress:
+                    progress(name, cases[name])
+    return {
+        'renderer_version': RENDERER_VERSION,
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'description_words': description_words,
+        'cases': cases,
+    }
+
+
+def compare(results, baseline, threshold=0.2, min_seconds=0.001):
+    """Liste les régressions de plus de threshold (relatif) par rapport à la référence
+
+    Les durées inférieures à min_seconds des deux côtés sont ignorées : à cette
+    échelle, le bruit de mesure dépasse largement le seuil.
+    """
+    regressions = []
+    for name, case in results['cases'].items():
+        reference = baseline.get('cases', {}).get(name)
+        if reference is None:
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = reference.get(metric), case.get(metric)
+            if not old or new is None:
+                continue
+            if metric.endswith('_seconds') and max(old, new) < min_seconds:
+                continue
+            ratio = new / old
+            if ratio > 1 + threshold:
+                regressions.append({
+                    'case': name,
+                    'metric': metric,
+                    'baseline': old,
+                    'current': new,
+                    'ratio': ratio,
+                })
+    return regressions
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_results(results, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,288 @@
+"""Export d'une cohorte de CV en une seule archive ZIP, écrite au fil de l'eau
+
+Les CV sont lus un par un depuis un fichier JSON lines (un CV par ligne) ou
+CSV, rendus en parallèle, et chaque PDF est ajouté à l'archive dès qu'il est
+prêt. Seule une fenêtre bornée de rendus est en vol à la fois : la mémoire
+reste constante, quelle que soit la taille de la cohorte.
+
+En mode ordonné, les PDF sont écrits dans l'ordre de la source (les rendus
+terminés en avance attendent dans la fenêtre) ; sinon, dans l'ordre où ils
+se terminent. Avec resume=True, les CV déjà présents dans l'archive sont
+sautés : une archive interrompue, même sans son répertoire central (arrêt
+brutal), est d'abord réparée.
+"""
+
+import csv
+import json
+import os
+import re
+import struct
+import time
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from .model import CV, PersonalInfo
+
+# Colonnes CSV contenant une liste au format JSON
+CSV_LIST_COLUMNS = ('experiences', 'education', 'skills', 'languages')
+
+_UNSAFE_NAME = re.compile(r'[^\w.-]+')
+
+
+def source_format(path):
+    """'jsonl' ou 'csv', d'après l'extension du fichier"""
+    suffix = Path(path).suffix.lower()
+    if suffix in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    if suffix == '.csv':
+        return 'csv'
+    raise ValueError(f"Format de source inconnu : {suffix!r} (attendu : .jsonl, .ndjson ou .csv)")
+
+
+def _csv_cv_data(row):
+    """Forme cv_data d'une ligne CSV : colonne cv en JSON, ou colonnes à plat"""
+    if row.get('cv'):
+        return json.loads(row['cv'])
+    data = {
+        'personal_info': {field: row.get(field, '') for field in PersonalInfo.FIELDS},
+        'professional_summary': row.get('professional_summary', ''),
+        'interests': row.get('interests', ''),
+    }
+    for column in CSV_LIST_COLUMNS:
+        data[column] = json.loads(row[column]) if row.get(column) else []
+    return data
+
+
+class CsvRow(dict):
+    """Ligne d'une source CSV, à distinguer d'un objet JSON déjà décodé"""
+
+
+def _decode_line(line):
+    """(identifiant ou None, enregistrement) d'une ligne JSON lines, décodée une seule fois
+
+    Une ligne illisible, ou qui n'est pas un objet, est gardée telle quelle :
+    son décodage échouera dans le processus de rendu, pour elle seule.
+    """
+    try:
+        data = json.loads(line)
+    except ValueError:
+        return None, line
+    if not isinstance(data, dict):
+        return None, line
+    if isinstance(data.get('id'), (str, int)):
+        return str(data['id']), data
+    return None, data
+
+
+def iter_records(path, fmt=None):
+    """Parcourt la source sans la charger : (position, identifiant, enregistrement brut)
+
+    L'identifiant vient du champ id (JSON lines) ou de la colonne id (CSV),
+    à défaut du numéro de ligne. Une ligne JSON est décodée ici, une fois,
+    pour lire son identifiant ; la validation a lieu plus tard, dans les
+    processus de rendu, pour qu'un enregistrement invalide n'échoue que lui-même.
+    """
+    fmt = fmt or source_format(path)
+    with open(path, encoding='utf-8', newline='') as f:
+        if fmt == 'jsonl':
+            index = 0
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                record_id, record = _decode_line(line)
+                yield index, record_id or f"{line_number:06d}", record
+                index += 1
+        elif fmt == 'csv':
+            for index, row in enumerate(csv.DictReader(f)):
+                yield index, row.get('id') or f"{index + 1:06d}", CsvRow(row)
+        else:
+            raise ValueError(f"Format de source inconnu : {fmt!r}")
+
+
+def load_record(raw):
+    """Valide un enregistrement brut de iter_records et retourne sa forme cv_data"""
+    if isinstance(raw, CsvRow):
+        data = _csv_cv_data(raw)
+    else:
+        data = json.loads(raw) if isinstance(raw, str) else raw
+        # Une ligne peut envelopper le CV : {"id": ..., "cv": {...}}
+        if isinstance(data, dict) and 'id' in data and 'cv' in data and 'schema_version' not in data:
+            data = data['cv']
+    return CV.from_dict(data).to_dict()
+
+
+def render_record(index, name, raw, template, language):
+    """Rend un enregistrement ; ne lève jamais d'exception"""
+    from .pdf import create_pdf_bytes
+
+    try:
+        data = create_pdf_bytes(load_record(raw), template, language)
+    except Exception as e:
+        return index, name, None, f"{type(e).__name__}: {e}"
+    return index, name, data, None
+
+
+def entry_name(record_id, used):
+    """Nom de fichier sûr et unique dans l'archive"""
+    base = _UNSAFE_NAME.sub('_', str(record_id)).strip('._') or 'cv'
+    name = f"{base}.pdf"
+    n = 2
+    while name in used:
+        name = f"{base}-{n}.pdf"
+        n += 1
+    used.add(name)
+    return name
+
+
+def recover_archive(path):
+    """Répare une archive interrompue avant l'écriture de son répertoire central
+
+    Les entrées complètes sont recopiées une à une dans une nouvelle archive,
+    qui remplace l'ancienne ; retourne le nombre d'entrées conservées.
+    """
+    path = Path(path)
+    tmp = path.with_name(path.name + '.recover')
+    kept = 0
+    with open(path, 'rb') as src, zipfile.ZipFile(tmp, 'w') as dst:
+        while True:
+            header = src.read(30)
+            if len(header) < 30 or header[:4] != b'PK\x03\x04':
+                break
+            (_, _, flags, method, mtime, mdate, crc, compressed, _,
+             name_length, extra_length) = struct.unpack('<4sHHHHHIIIHH', header)
+            name = src.read(name_length).decode('utf-8' if flags & 0x800 else 'cp437')
+            src.read(extra_length)
+            if flags & 0x08:
+                # Tailles inconnues en tête d'entrée : impossible d'aller plus loin sans risque
+                break
+            raw = src.read(compressed)
+            if len(raw) < compressed:
+                break
+            if method == zipfile.ZIP_DEFLATED:
+                data = zlib.decompress(raw, -15)
+            elif method == zipfile.ZIP_STORED:
+                data = raw
+            else:
+                break
+            if zlib.crc32(data) != crc:
+                break
+            date_time = (
+                ((mdate >> 9) & 0x7F) + 1980, (mdate >> 5) & 0x0F, mdate & 0x1F,
+                (mtime >> 11) & 0x1F, (mtime >> 5) & 0x3F, (mtime & 0x1F) * 2,
+            )
+            info = zipfile.ZipInfo(name, date_time)
+            info.compress_type = method
+            dst.writestr(info, data)
+            kept += 1
+    os.replace(tmp, path)
+    return kept
+
+
+def _open_archive(path, resume):
+    """Ouvre l'archive de sortie ; avec resume, retourne aussi les noms déjà présents"""
+    if resume and os.path.exists(path) and os.path.getsize(path):
+        # En mode 'a', zipfile ajouterait une seconde archive derrière une archive tronquée
+        if not zipfile.is_zipfile(path):
+            recover_archive(path)
+        archive = zipfile.ZipFile(path, 'a')
+        return archive, set(archive.namelist())
+    return zipfile.ZipFile(path, 'w'), set()
+
+
+def export_zip(source, output, template='classic', language='fr', workers=None, ordered=True,
+               resume=False, compression=zipfile.ZIP_STORED, window=None, fmt=None, progress=None):
+    """Rend tous les CV de source dans l'archive ZIP output et retourne un résumé
+
+    window borne le nombre de rendus en vol (et, en mode ordonné, de PDF en
+    attente d'écriture) ; par défaut quatre par processus. progress(result)
+    est appelé pour chaque CV traité.
+    """
+    workers = workers or os.cpu_count() or 1
+    window = window or workers * 4
+    start = time.perf_counter()
+    date_time = time.localtime()[:6]
+    counts = {'written': 0, 'skipped': 0, 'failed': 0}
+    failures = []
+
+    archive, existing = _open_archive(output, resume)
+    # Les noms sont attribués dans l'ordre de la source : une reprise retrouve les mêmes
+    used = set()
+
+    def records():
+        for index, record_id, raw in iter_records(source, fmt):
+            name = entry_name(record_id, used)
+            if name in existing:
+                counts['skipped'] += 1
+                continue
+            yield index, name, raw
+
+    def write(result):
+        index, name, data, error = result
+        if error is None:
+            info = zipfile.ZipInfo(name, date_time)
+            info.compress_type = compression
+            archive.writestr(info, data)
+            counts['written'] += 1
+        else:
+            counts['failed'] += 1
+            failures.append({'index': index, 'entry': name, 'error': error})
+        if progress is not None:
+            progress({'index': index, 'entry': name, 'ok': error is None, 'error': error})
+
+    try:
+        if workers == 1:
+            for index, name, raw in records():
+                write(render_record(index, name, raw, template, language))
+        else:
+            _export_parallel(records(), write, template, language, workers, window, ordered)
+    finally:
+        # Même interrompue, l'archive est refermée proprement et pourra être reprise
+        archive.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        'written': counts['written'],
+        'skipped': counts['skipped'],
+        'failed': counts['failed'],
+        'seconds': elapsed,
+        'cvs_per_second': counts['written'] / elapsed if elapsed > 0 else 0.0,
+        'workers': workers,
+        'ordered': ordered,
+        'failures': failures,
+    }
+
+
+def _export_parallel(records, write, template, language, workers, window, ordered):
+    """Garde au plus window rendus en vol (ou terminés mais pas encore écrits)"""
+    records = iter(records)
+    in_flight = set()
+    done = {}
+    positions = deque()
+    exhausted = False
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            while not exhausted and len(in_flight) + len(done) < window:
+                record = next(records, None)
+                if record is None:
+                    exhausted = True
+                    break
+                index, name, raw = record
+                if ordered:
+                    positions.append(index)
+                in_flight.add(pool.submit(render_record, index, name, raw, template, language))
+            if not in_flight:
+                break
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                result = future.result()
+                if ordered:
+                    done[result[0]] = result
+                else:
+                    write(result)
+            if ordered:
+                # positions garde l'ordre de soumission : on écrit tant que la tête est prête
+                while positions and positions[0] in done:
+                    write(done.pop(positions.popleft()))
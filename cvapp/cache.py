@@ -0,0 +1,209 @@
+"""Cache des PDF générés, adressé par le contenu du CV"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+
+from . import RENDERER_VERSION, fonts
+from .model import as_cv_data
+
+# Une fois disk_max_bytes dépassé, le niveau disque est ramené à cette fraction :
+# le dossier n'est parcouru qu'une fois par tranche de 10 % écrite, et non à chaque ajout
+DISK_LOW_WATER = 0.9
+
+
+def render_key(cv_data, template, language, version=RENDERER_VERSION):
+    """Calcule l'empreinte canonique d'une demande de rendu
+
+    Le réglage des polices en fait partie : le même CV ne donne pas le même PDF
+    selon les polices installées.
+    """
+    payload = json.dumps(
+        [version, fonts.configuration(), template, language, as_cv_data(cv_data)],
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(',', ':'),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    """Cache LRU en mémoire, doublé d'un niveau disque optionnel
+
+    L'occupation du disque est comptée une fois à l'ouverture puis tenue à
+    jour à chaque ajout ; elle est recomptée à chaque éviction, ce qui
+    corrige l'écart si plusieurs processus partagent le dossier.
+    """
+
+    def __init__(self, max_entries=128, max_bytes=64 * 1024 * 1024,
+                 disk_dir=None, disk_max_bytes=1024 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._disk_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+
+    # Niveau mémoire
+
+    def _memory_get(self, key):
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+        return data
+
+    def _memory_put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old)
+        self._entries[key] = data
+        self._bytes += len(data)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    # Niveau disque
+
+    def _disk_path(self, key):
+        return self.disk_dir / key[:2] / f"{key}.pdf"
+
+    def _disk_get(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def _disk_put(self, key, data):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            replaced = path.stat().st_size
+        except OSError:
+            replaced = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            return
+        with self._disk_lock:
+            self._disk_bytes += len(data) - replaced
+            if self._disk_bytes > self.disk_max_bytes:
+                self._disk_evict()
+
+    def _disk_files(self):
+        """(date de dernier accès, taille, chemin) de chaque fichier du niveau disque"""
+        files = []
+        for path in self.disk_dir.glob('*/*.pdf'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def _disk_evict(self):
+        """Supprime les fichiers les plus anciens jusqu'à DISK_LOW_WATER de disk_max_bytes"""
+        files = self._disk_files()
+        total = sum(size for _, size, _ in files)
+        target = self.disk_max_bytes * DISK_LOW_WATER
+        for _, size, path in sorted(files):
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+        self._disk_bytes = total
+
+    # API publique
+
+    def get(self, key):
+        """Retourne les octets du PDF en cache, ou None"""
+        with self._lock:
+            data = self._memory_get(key)
+            if data is not None:
+                self.hits += 1
+                return data
+        data = self._disk_get(key)
+        with self._lock:
+            if data is not None:
+                self.disk_hits += 1
+                self._memory_put(key, data)
+            else:
+                self.misses += 1
+        return data
+
+    def put(self, key, data):
+        """Enregistre les octets d'un PDF dans les deux niveaux"""
+        with self._lock:
+            self._memory_put(key, data)
+        self._disk_put(key, data)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Compteurs de succès/échecs et occupation du cache"""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_ratio': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'disk_bytes': self._disk_bytes,
+            }
+
+
+default_cache = RenderCache()
+
+
+def cached_create_pdf(cv_data, template, language, cache=None):
+    """Comme create_pdf, mais sert les demandes identiques depuis le cache"""
+    cache = cache if cache is not None else default_cache
+    key = render_key(cv_data, template, language)
+    data = cache.get(key)
+    if data is None:
+        from .pdf import create_pdf_bytes
+
+        data = create_pdf_bytes(cv_data, template, language)
+        cache.put(key, data)
+    return BytesIO(data)
@@ -0,0 +1,172 @@
+"""Représentation intermédiaire du CV, commune à l'aperçu et à tous les exports
+
+build_document parcourt cv_data une seule fois, normalise les valeurs et
+applique les règles d'affichage (quelles entrées apparaissent, comment les
+dates sont formées, quels contacts sont montrés). Les exporteurs ne font
+ensuite que mettre en forme ce document immuable.
+"""
+
+from typing import NamedTuple, Tuple
+
+from .model import as_cv_data
+from .translations import translate, translate_level
+
+# Ordre canonique des sections
+SECTION_ORDER = ('summary', 'experience', 'education', 'skills', 'languages', 'interests')
+
+# Champs de contact affichés, dans l'ordre
+CONTACT_FIELDS = ('email', 'phone', 'address', 'linkedin', 'github')
+
+# Clé de traduction du titre de chaque section
+SECTION_TITLES = {
+    'summary': 'professional_summary',
+    'experience': 'experience',
+    'education': 'education',
+    'skills': 'skills',
+    'languages': 'languages',
+    'interests': 'interests',
+}
+
+
+class Contact(NamedTuple):
+    field: str
+    label: str
+    value: str
+
+
+class Entry(NamedTuple):
+    """Entrée datée : une expérience ou une formation"""
+    title: str
+    organization: str
+    period: str
+    description: str
+
+    @property
+    def heading(self):
+        """Intitulé et organisation, séparés par un tiret"""
+        return " - ".join(part for part in (self.title, self.organization) if part)
+
+
+class Item(NamedTuple):
+    """Élément d'une liste : une compétence ou une langue"""
+    name: str
+    level: str
+
+    @property
+    def label(self):
+        """Nom suivi du niveau entre parenthèses, s'il est connu"""
+        return f"{self.name} ({self.level})" if self.level else self.name
+
+
+class Section(NamedTuple):
+    key: str
+    title: str
+    text: str = ''
+    entries: Tuple[Entry, ...] = ()
+    items: Tuple[Item, ...] = ()
+
+
+class Document(NamedTuple):
+    language: str
+    name: str
+    contacts: Tuple[Contact, ...]
+    sections: Tuple[Section, ...]
+
+    def section(self, key):
+        """Retourne la section key, ou None si elle est vide"""
+        for section in self.sections:
+            if section.key == key:
+                return section
+        return None
+
+
+def _clean(value):
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+def _period(start, end):
+    if start and end:
+        return f"{start} - {end}"
+    return start or end
+
+
+def _experience_entries(experiences):
+    entries = []
+    for exp in experiences or ():
+        title = _clean(exp.get('job_title'))
+        company = _clean(exp.get('company'))
+        if not (title or company):
+            continue
+        entries.append(Entry(
+            title,
+            company,
+            _period(_clean(exp.get('start_date')), _clean(exp.get('end_date'))),
+            _clean(exp.get('description')),
+        ))
+    return tuple(entries)
+
+
+def _education_entries(education):
+    entries = []
+    for edu in education or ():
+        degree = _clean(edu.get('degree'))
+        institution = _clean(edu.get('institution'))
+        if not (degree or institution):
+            continue
+        entries.append(Entry(degree, institution, _clean(edu.get('year')), ''))
+    return tuple(entries)
+
+
+def _items(records, language):
+    return tuple(
+        Item(_clean(record.get('name')), translate_level(_clean(record.get('level')), language))
+        for record in records or ()
+        if _clean(record.get('name'))
+    )
+
+
+def build_document(cv_data, language):
+    """Construit le document normalisé et immuable d'un CV (dictionnaire ou CV typé)"""
+    cv_data = as_cv_data(cv_data)
+    personal_info = cv_data.get('personal_info') or {}
+    contacts = tuple(
+        Contact(field, translate(field, language), _clean(personal_info.get(field)))
+        for field in CONTACT_FIELDS
+        if _clean(personal_info.get(field))
+    )
+
+    content = {
+        'summary': {'text': _clean(cv_data.get('professional_summary'))},
+        'experience': {'entries': _experience_entries(cv_data.get('experiences'))},
+        'education': {'entries': _education_entries(cv_data.get('education'))},
+        'skills': {'items': _items(cv_data.get('skills'), language)},
+        'languages': {'items': _items(cv_data.get('languages'), language)},
+        'interests': {'text': _clean(cv_data.get('interests'))},
+    }
+    sections = tuple(
+        Section(key, translate(SECTION_TITLES[key], language), **content[key])
+        for key in SECTION_ORDER
+        if any(content[key].values())
+    )
+    return Document(language, _clean(personal_info.get('name')), contacts, sections)
+
+
+def document_to_dict(document):
+    """Document sous forme de dictionnaires et listes, prêt pour JSON"""
+    return {
+        'language': document.language,
+        'name': document.name,
+        'contacts': [contact._asdict() for contact in document.contacts],
+        'sections': [
+            {
+                'key': section.key,
+                'title': section.title,
+                'text': section.text,
+                'entries': [entry._asdict() for entry in section.entries],
+                'items': [item._asdict() for item in section.items],
+            }
+            for section in document.sections
+        ],
+    }
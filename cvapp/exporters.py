@@ -0,0 +1,159 @@
+"""Exporteurs du document normalisé : Markdown, HTML, texte ATS, JSON et PDF
+
+Chaque exporteur prend un Document (voir cvapp.document) et ne relit jamais
+cv_data : un même document alimente l'aperçu et tous les téléchargements.
+"""
+
+import html
+import json
+
+from . import richtext
+from .document import document_to_dict
+
+
+# Markdown (aperçu Streamlit)
+
+def header_markdown(document):
+    """Markdown du nom et des coordonnées, échappés comme le texte libre"""
+    if not document.name:
+        return ''
+    e = richtext.escape_markdown
+    blocks = [f"# {e(document.name)}"]
+    if document.contacts:
+        blocks.append(" | ".join(e(contact.value) for contact in document.contacts))
+    return "\n\n".join(blocks)
+
+
+def section_markdown(section):
+    """Markdown d'une seule section"""
+    e = richtext.escape_markdown
+    blocks = [f"## {e(section.title)}"]
+    if section.text:
+        blocks.append(richtext.to_markdown(section.text))
+    for entry in section.entries:
+        title = f"**{e(entry.heading)}**"
+        if entry.period:
+            title += f" ({e(entry.period)})"
+        blocks.append(title)
+        if entry.description:
+            blocks.append(richtext.to_markdown(entry.description))
+    if section.items:
+        blocks.append(" • ".join(e(item.label) for item in section.items))
+    return "\n\n".join(blocks)
+
+
+def to_markdown(document):
+    blocks = [header_markdown(document)]
+    blocks.extend(section_markdown(section) for section in document.sections)
+    return "\n\n".join(block for block in blocks if block)
+
+
+# HTML
+
+def rich_html(text):
+    """HTML d'un texte libre : paragraphes, listes à puces, gras et italique"""
+    parts = []
+    in_list = False
+    for block in richtext.parse_blocks(text):
+        if block.bullet != in_list:
+            parts.append("<ul>" if block.bullet else "</ul>")
+            in_list = block.bullet
+        tag = "li" if block.bullet else "p"
+        parts.append(f"<{tag}>{richtext.to_html(block.runs)}</{tag}>")
+    if in_list:
+        parts.append("</ul>")
+    return "\n".join(parts)
+
+
+def to_html(document):
+    e = html.escape
+    parts = [
+        "<!DOCTYPE html>",
+        f'<html lang="{e(document.language)}">',
+        "<head>",
+        '<meta charset="utf-8">',
+        f"<title>{e(document.name or 'CV')}</title>",
+        "</head>",
+        "<body>",
+    ]
+    if document.name:
+        parts.append(f"<h1>{e(document.name)}</h1>")
+    if document.contacts:
+        parts.append('<ul class="contacts">')
+        for contact in document.contacts:
+            parts.append(f'<li class="{e(contact.field)}">{e(contact.label)}: {e(contact.value)}</li>')
+        parts.append("</ul>")
+    for section in document.sections:
+        parts.append(f'<section class="{e(section.key)}">')
+        parts.append(f"<h2>{e(section.title)}</h2>")
+        if section.text:
+            parts.append(rich_html(section.text))
+        for entry in section.entries:
+            title = f"<strong>{e(entry.heading)}</strong>"
+            if entry.period:
+                title += f' <span class="period">({e(entry.period)})</span>'
+            parts.append(f"<h3>{title}</h3>")
+            if entry.description:
+                parts.append(rich_html(entry.description))
+        if section.items:
+            parts.append("<ul>")
+            parts.extend(f"<li>{e(item.label)}</li>" for item in section.items)
+            parts.append("</ul>")
+        parts.append("</section>")
+    parts.extend(["</body>", "</html>"])
+    return "\n".join(parts) + "\n"
+
+
+# Texte brut pour les systèmes ATS : pas de colonnes, pas de décoration
+
+def to_text(document):
+    lines = []
+    if document.name:
+        lines.append(document.name)
+    for contact in document.contacts:
+        lines.append(f"{contact.label}: {contact.value}")
+    for section in document.sections:
+        lines.extend(["", section.title.upper()])
+        if section.text:
+            lines.append(richtext.to_plain(section.text))
+        for entry in section.entries:
+            title = entry.heading
+            if entry.period:
+                title += f" ({entry.period})"
+            lines.append(title)
+            if entry.description:
+                lines.append(richtext.to_plain(entry.description))
+        for item in section.items:
+            lines.append(f"- {item.label}")
+    return "\n".join(lines) + "\n"
+
+
+# JSON
+
+def to_json(document):
+    return json.dumps(document_to_dict(document), ensure_ascii=False, indent=2)
+
+
+def to_pdf(document, template='classic'):
+    from .pdf import render_document
+
+    return render_document(document, template).getvalue()
+
+
+# Nom -> (fonction, extension, type MIME)
+EXPORTERS = {
+    'pdf': (to_pdf, 'pdf', 'application/pdf'),
+    'markdown': (to_markdown, 'md', 'text/markdown'),
+    'html': (to_html, 'html', 'text/html'),
+    'text': (to_text, 'txt', 'text/plain'),
+    'json': (to_json, 'json', 'application/json'),
+}
+
+
+def export(document, fmt, **options):
+    """Exporte le document dans le format demandé"""
+    try:
+        exporter = EXPORTERS[fmt][0]
+    except KeyError:
+        raise ValueError(f"Format d'export inconnu : {fmt!r} (attendu : {', '.join(EXPORTERS)})") from None
+    return exporter(document, **options)
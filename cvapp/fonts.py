@@ -0,0 +1,232 @@
+"""Polices du PDF : polices de base PDF ou famille TrueType intégrée en sous-ensemble
+
+Les polices de base (Helvetica) ne sont pas intégrées au fichier, mais ne
+couvrent que le jeu WinAnsi (cp1252) : un nom en grec, en cyrillique ou en
+arabe y sort illisible. Une famille TrueType couvre ces écritures ; ReportLab
+n'intègre alors que les glyphes réellement utilisés (sous-ensemble), et non
+la police entière.
+
+Mode choisi par CVAPP_PDF_FONT :
+
+- auto (défaut) : polices de base si tout le texte du CV est en cp1252, sinon
+  famille TrueType : les CV latins restent aussi légers qu'avant ;
+- base : toujours les polices de base ;
+- embedded : toujours la famille TrueType ;
+- nom d'une famille (DejaVuSans, NotoSans…) : comme embedded, avec celle-ci.
+
+Les fichiers sont cherchés une fois par processus dans CVAPP_PDF_FONT_DIR
+puis dans les dossiers de polices du système ; chaque face n'est analysée
+et enregistrée auprès de ReportLab qu'une fois par processus. Sans aucune
+famille installée, le rendu retombe sur les polices de base et le signale
+(journal, et lacks_font pour l'interface).
+"""
+
+import logging
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import NamedTuple
+
+MODES = ('auto', 'base', 'embedded')
+
+# Police de base -> face de la famille qui la remplace
+FACE_OF_BASE_FONT = {
+    'Helvetica': 'regular',
+    'Helvetica-Bold': 'bold',
+    'Helvetica-Oblique': 'italic',
+    'Helvetica-BoldOblique': 'bold_italic',
+}
+
+# Familles cherchées, par ordre de préférence : fichiers regular, bold, italic, bold_italic
+FAMILIES = {
+    'DejaVuSans': ('DejaVuSans.ttf', 'DejaVuSans-Bold.ttf', 'DejaVuSans-Oblique.ttf', 'DejaVuSans-BoldOblique.ttf'),
+    'NotoSans': ('NotoSans-Regular.ttf', 'NotoSans-Bold.ttf', 'NotoSans-Italic.ttf', 'NotoSans-BoldItalic.ttf'),
+    'LiberationSans': ('LiberationSans-Regular.ttf', 'LiberationSans-Bold.ttf',
+                       'LiberationSans-Italic.ttf', 'LiberationSans-BoldItalic.ttf'),
+    'Arial': ('arial.ttf', 'arialbd.ttf', 'ariali.ttf', 'arialbi.ttf'),
+}
+
+_FACES = ('regular', 'bold', 'italic', 'bold_italic')
+
+
+class FontFamily(NamedTuple):
+    """Noms sous lesquels les quatre faces d'une famille sont enregistrées"""
+    name: str
+    regular: str
+    bold: str
+    italic: str
+    bold_italic: str
+
+    def face(self, base_font):
+        """Face qui remplace une police de base ; une police inconnue est gardée"""
+        face = FACE_OF_BASE_FONT.get(base_font)
+        return getattr(self, face) if face else base_font
+
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_font_files = None
+_registered = {}
+_fallback_logged = False
+
+
+def search_dirs():
+    """Dossiers où chercher les polices, du plus prioritaire au moins prioritaire"""
+    dirs = [Path(d) for d in os.environ.get('CVAPP_PDF_FONT_DIR', '').split(os.pathsep) if d]
+    home = Path.home()
+    if sys.platform == 'win32':
+        dirs.append(Path(os.environ.get('WINDIR', r'C:\Windows')) / 'Fonts')
+    elif sys.platform == 'darwin':
+        dirs.extend([home / 'Library' / 'Fonts', Path('/Library/Fonts'), Path('/System/Library/Fonts')])
+    else:
+        dirs.extend([home / '.local' / 'share' / 'fonts', home / '.fonts',
+                     Path('/usr/local/share/fonts'), Path('/usr/share/fonts')])
+    return dirs
+
+
+def font_files():
+    """Nom de fichier (en minuscules) -> chemin, pour les fichiers des FAMILIES trouvés"""
+    global _font_files
+    if _font_files is None:
+        wanted = {name.lower() for files in FAMILIES.values() for name in files}
+        found = {}
+        for directory in search_dirs():
+            for root, _, names in os.walk(directory):
+                for name in names:
+                    key = name.lower()
+                    if key in wanted and key not in found:
+                        found[key] = os.path.join(root, name)
+        _font_files = found
+    return _font_files
+
+
+def available_families():
+    """Familles dont au moins la face regular est installée, par ordre de préférence"""
+    files = font_files()
+    return [name for name, faces in FAMILIES.items() if faces[0].lower() in files]
+
+
+def family_paths(name):
+    """Chemins des quatre faces ; une face absente est remplacée par la plus proche"""
+    files = font_files()
+    paths = dict(zip(_FACES, (files.get(f.lower()) for f in FAMILIES[name])))
+    paths['bold'] = paths['bold'] or paths['regular']
+    paths['italic'] = paths['italic'] or paths['regular']
+    paths['bold_italic'] = paths['bold_italic'] or paths['bold']
+    return paths
+
+
+def register_family(name):
+    """Enregistre une famille auprès de ReportLab (une fois par processus) et la retourne"""
+    family = _registered.get(name)
+    if family is not None:
+        return family
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    with _lock:
+        if name not in _registered:
+            paths = family_paths(name)
+            if paths['regular'] is None:
+                raise ValueError(f"Police introuvable : {name!r} (disponibles : {', '.join(available_families()) or 'aucune'})")
+            family = FontFamily(name, *(f"{name}-{face}" for face in _FACES))
+            # Une face absente est enregistrée sous son propre nom, avec le fichier de remplacement :
+            # la correspondance <b>/<i> de ReportLab reste ainsi sans ambiguïté
+            for face in _FACES:
+                pdfmetrics.registerFont(TTFont(getattr(family, face), paths[face]))
+            pdfmetrics.registerFontFamily(
+                family.regular, normal=family.regular, bold=family.bold,
+                italic=family.italic, boldItalic=family.bold_italic,
+            )
+            _registered[name] = family
+        return _registered[name]
+
+
+def mode():
+    """Valeur de CVAPP_PDF_FONT : un des MODES ou un nom de famille"""
+    value = os.environ.get('CVAPP_PDF_FONT', '').strip() or 'auto'
+    if value not in MODES and value not in FAMILIES:
+        raise ValueError(f"CVAPP_PDF_FONT inconnu : {value!r} (attendu : {', '.join(MODES + tuple(FAMILIES))})")
+    return value
+
+
+def _embedded_family_name():
+    value = mode()
+    if value in FAMILIES:
+        return value
+    families = available_families()
+    return families[0] if families else None
+
+
+def configuration():
+    """Réglage effectif des polices, pour l'empreinte des rendus mis en cache"""
+    return f"{mode()}:{_embedded_family_name() or 'base'}"
+
+
+def fits_base_fonts(text):
+    """Vrai si les polices de base savent afficher tout le texte"""
+    if text.isascii():
+        return True
+    try:
+        text.encode('cp1252')
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def document_texts(document):
+    """Tous les textes affichés d'un document"""
+    yield document.name
+    for contact in document.contacts:
+        yield contact.label
+        yield contact.value
+    for section in document.sections:
+        yield section.title
+        yield section.text
+        for entry in section.entries:
+            yield from entry
+        for item in section.items:
+            yield from item
+
+
+def _needs_family(document, value):
+    if value == 'base':
+        return False
+    return value != 'auto' or not all(fits_base_fonts(text) for text in document_texts(document))
+
+
+def lacks_font(document):
+    """Vrai si le document demande une famille TrueType mais qu'aucune n'est installée
+
+    Le PDF sort alors avec les polices de base, et les caractères hors cp1252
+    (grec, cyrillique, arabe…) y sont illisibles.
+    """
+    value = mode()
+    return _needs_family(document, value) and _embedded_family_name() is None
+
+
+def _log_fallback():
+    """Signale une fois par processus le repli sur les polices de base"""
+    global _fallback_logged
+    if not _fallback_logged:
+        _fallback_logged = True
+        logger.warning(
+            "Aucune police TrueType trouvée (%s) : les caractères hors cp1252 sortiront illisibles. "
+            "Installez DejaVu Sans ou Noto Sans, ou indiquez leur dossier dans CVAPP_PDF_FONT_DIR.",
+            ', '.join(FAMILIES)
+        )
+
+
+def family_for(document):
+    """Famille TrueType à utiliser pour un document, ou None pour les polices de base"""
+    value = mode()
+    if not _needs_family(document, value):
+        return None
+    name = _embedded_family_name()
+    if name is None:
+        # Sans police installée, on retombe sur les polices de base
+        _log_fallback()
+        return None
+    return register_family(name)
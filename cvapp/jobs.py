@@ -0,0 +1,236 @@
+"""File d'attente de rendus PDF en arrière-plan, à concurrence bornée"""
+
+import copy
+import threading
+import time
+import uuid
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from .artifacts import default_artifacts
+from .cache import render_key
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+
+class QueueFull(Exception):
+    """Levée quand trop de rendus sont déjà en attente"""
+
+
+class RenderJob:
+    """Un rendu demandé par un utilisateur
+
+    Le PDF produit n'est pas gardé ici : il est rangé dans le magasin
+    d'artefacts sous la clé de rendu (voir RenderQueue.artifact).
+    """
+
+    def __init__(self, owner, key):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.key = key
+        self.status = PENDING
+        self.error = None
+        self.submitted_at = time.time()
+        self.finished_at = None
+        self.future = None
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+
+def _render_bytes(cv_data, template, language):
+    from .pdf import create_pdf_bytes
+
+    return create_pdf_bytes(cv_data, template, language)
+
+
+def _render_with_service(client, cv_data, template, language):
+    """Rend via le service de rendu, ou localement s'il est indisponible"""
+    from .service import ServiceUnavailable
+
+    try:
+        return client.render(cv_data, template, language)
+    except ServiceUnavailable:
+        return _render_bytes(cv_data, template, language)
+
+
+class RenderQueue:
+    """Exécute les rendus dans un pool borné, un seul rendu actif par utilisateur
+
+    Une nouvelle demande d'un même utilisateur annule la précédente ;
+    au-delà de max_pending rendus non terminés, submit lève QueueFull.
+    Les PDF produits vont dans artifacts ; cache (un RenderCache, par
+    exemple avec un niveau disque) est un second niveau optionnel.
+
+    Avec client (un service.RenderClient), les rendus sont confiés au service
+    de rendu partagé et ne sont faits sur place que s'il est indisponible ;
+    les appels au service n'occupant qu'un thread, le pool est alors un pool
+    de threads, même avec use_processes.
+    """
+
+    def __init__(self, max_workers=2, max_pending=16, use_processes=False,
+                 artifacts=None, cache=None, finished_ttl=600, client=None):
+        self._executor_class = ProcessPoolExecutor if use_processes and client is None else ThreadPoolExecutor
+        self._executor = self._executor_class(max_workers=max_workers)
+        self.restarts = 0
+        self.client = client
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.artifacts = artifacts if artifacts is not None else default_artifacts
+        self.cache = cache
+        self.finished_ttl = finished_ttl
+        self._jobs = {}
+        self._latest = {}
+        # Réentrant : le rappel de fin peut s'exécuter immédiatement dans submit
+        self._lock = threading.RLock()
+
+    def _active_count(self):
+        """Rendus qui occupent ou attendent un processus, annulés en cours d'exécution compris"""
+        return sum(
+            1 for job in self._jobs.values()
+            if not job.finished or job.future is not None and not job.future.done()
+        )
+
+    def _prune(self):
+        """Oublie les rendus terminés depuis plus de finished_ttl secondes"""
+        limit = time.time() - self.finished_ttl
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and job.finished_at < limit:
+                del self._jobs[job_id]
+                if self._latest.get(job.owner) == job_id:
+                    del self._latest[job.owner]
+
+    def _cancel(self, job):
+        if job.finished:
+            return
+        if job.future is not None:
+            job.future.cancel()
+        job.status = CANCELLED
+        job.finished_at = time.time()
+
+    def _start(self, snapshot, template, language):
+        """Confie un rendu au pool ; un pool hors d'usage est remplacé une fois"""
+        if self.client is not None:
+            function, args = _render_with_service, (self.client, snapshot, template, language)
+        else:
+            function, args = _render_bytes, (snapshot, template, language)
+        try:
+            return self._executor.submit(function, *args)
+        except BrokenExecutor:
+            # Un processus mort (mémoire, plantage) casse tout le pool : on en crée un autre
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._executor_class(max_workers=self.max_workers)
+            self.restarts += 1
+            return self._executor.submit(function, *args)
+
+    def submit(self, owner, cv_data, template, language):
+        """Soumet un rendu et retourne le RenderJob correspondant"""
+        key = render_key(cv_data, template, language)
+        # Copie figée : l'utilisateur peut continuer à éditer pendant le rendu
+        snapshot = copy.deepcopy(cv_data)
+
+        with self._lock:
+            self._prune()
+            previous_id = self._latest.get(owner)
+            previous = self._jobs.get(previous_id)
+            if previous is not None and previous.key == key and (
+                    previous.status in (PENDING, RUNNING)
+                    # Un PDF évincé du magasin d'artefacts est à refaire
+                    or previous.status == DONE and key in self.artifacts):
+                return previous
+
+            if previous is not None:
+                self._cancel(previous)
+            if self._active_count() >= self.max_pending:
+                raise QueueFull(f"{self.max_pending} rendus déjà en attente")
+
+            job = RenderJob(owner, key)
+            cached = key in self.artifacts
+            if not cached and self.cache is not None:
+                data = self.cache.get(key)
+                if data is not None:
+                    self.artifacts.put(key, data)
+                    cached = True
+            if cached:
+                job.status = DONE
+                job.finished_at = time.time()
+            else:
+                # Confié au pool avant d'être enregistré : un échec ne laisse pas de rendu en attente à jamais
+                try:
+                    job.future = self._start(snapshot, template, language)
+                except (BrokenExecutor, OSError) as e:
+                    job.status = FAILED
+                    job.error = f"{type(e).__name__}: {e}"
+                    job.finished_at = time.time()
+                else:
+                    job.future.add_done_callback(lambda future, job=job: self._on_done(job, future))
+                    if job.future.running() and job.status == PENDING:
+                        job.status = RUNNING
+            self._jobs[job.id] = job
+            self._latest[owner] = job.id
+        return job
+
+    def _on_done(self, job, future):
+        if future.cancelled():
+            return
+        try:
+            data = future.result()
+        except Exception as e:
+            data, error = None, f"{type(e).__name__}: {e}"
+        else:
+            error = None
+            # Hors du verrou : un magasin qui déborde sur un disque lent ne bloque ni submit ni get.
+            # Même annulé, le PDF reste valable pour sa clé et servira au prochain rendu identique.
+            self.artifacts.put(job.key, data)
+        with self._lock:
+            if job.status != CANCELLED:
+                if error is None:
+                    job.status = DONE
+                else:
+                    job.status = FAILED
+                    job.error = error
+                job.finished_at = time.time()
+        if error is None and self.cache is not None:
+            self.cache.put(job.key, data)
+
+    def get(self, job_id):
+        """Retourne un rendu par identifiant, ou None s'il a été oublié"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.status == PENDING and job.future is not None and job.future.running():
+                job.status = RUNNING
+            return job
+
+    def artifact(self, job):
+        """PDF d'un rendu terminé, ou None s'il a été évincé du magasin d'artefacts"""
+        if job.status != DONE:
+            return None
+        return self.artifacts.get(job.key)
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._cancel(job)
+
+    def stats(self):
+        """Nombre de rendus par état"""
+        with self._lock:
+            counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0, CANCELLED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            counts['max_workers'] = self.max_workers
+            counts['max_pending'] = self.max_pending
+            counts['restarts'] = self.restarts
+        if self.client is not None:
+            counts['service'] = self.client.stats()
+        return counts
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        if self.client is not None:
+            self.client.close()
@@ -0,0 +1,173 @@
+"""Instrumentation du rendu : histogrammes par étape, format texte Prometheus
+
+Les mesures sont propres au processus. Elles peuvent être exposées par un
+petit serveur HTTP local (start_http_server), écrites dans un fichier
+(dump) ou lues directement (summary) pour un panneau de débogage.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Bornes des seaux par type de mesure
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PAGES_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 200)
+BYTES_BUCKETS = (4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Description et seaux de chaque histogramme connu
+METRICS = {
+    'cvapp_render_stage_seconds': ("Durée de chaque étape du rendu PDF", SECONDS_BUCKETS),
+    'cvapp_render_pages': ("Nombre de pages par PDF généré", PAGES_BUCKETS),
+    'cvapp_render_bytes': ("Taille des PDF générés en octets", BYTES_BUCKETS),
+    'cvapp_streamlit_rerun_seconds': ("Durée d'une exécution complète du script Streamlit", SECONDS_BUCKETS),
+    'cvapp_service_request_seconds': ("Durée des demandes au service de rendu, par issue", SECONDS_BUCKETS),
+}
+
+
+class Histogram:
+    """Histogramme cumulatif à seaux fixes, par combinaison d'étiquettes"""
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self._series = {}
+
+    def observe(self, value, labels=()):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * len(self.buckets), 0, 0.0]
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[0][index] += 1
+        series[1] += 1
+        series[2] += value
+
+    def exposition(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, count, total) in sorted(self._series.items()):
+            base = ",".join(f'{key}="{value}"' for key, value in labels)
+            prefix = base + "," if base else ""
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound:g}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            suffix = f"{{{base}}}" if base else ""
+            lines.append(f"{self.name}_count{suffix} {count}")
+            lines.append(f"{self.name}_sum{suffix} {total:.6f}")
+        return lines
+
+    def summary(self):
+        return [
+            {
+                'metric': self.name,
+                'labels': ",".join(f"{key}={value}" for key, value in labels),
+                'count': count,
+                'sum': total,
+                'mean': total / count if count else 0.0,
+            }
+            for labels, (_, count, total) in sorted(self._series.items())
+        ]
+
+
+_lock = threading.Lock()
+_histograms = {name: Histogram(name, doc, buckets) for name, (doc, buckets) in METRICS.items()}
+_hooks = []
+_gauges = {}
+
+
+def add_hook(callback):
+    """Enregistre callback(name, value, labels), appelé à chaque mesure"""
+    _hooks.append(callback)
+
+
+def remove_hook(callback):
+    _hooks.remove(callback)
+
+
+def add_gauge(name, documentation, callback):
+    """Enregistre une jauge, lue par callback() à chaque exposition"""
+    _gauges[name] = (documentation, callback)
+
+
+def observe(name, value, **labels):
+    """Ajoute une mesure à l'histogramme name"""
+    label_items = tuple(sorted(labels.items()))
+    with _lock:
+        _histograms[name].observe(value, label_items)
+    for callback in list(_hooks):
+        callback(name, value, labels)
+
+
+@contextmanager
+def timed(name, **labels):
+    """Chronomètre le bloc et l'enregistre dans l'histogramme name, même en cas d'erreur"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def stage(stage_name):
+    """Chronomètre une étape du rendu PDF"""
+    return timed('cvapp_render_stage_seconds', stage=stage_name)
+
+
+def render_prometheus():
+    """Toutes les mesures au format texte d'exposition Prometheus"""
+    with _lock:
+        lines = []
+        for histogram in _histograms.values():
+            lines.extend(histogram.exposition())
+    for name, (documentation, callback) in list(_gauges.items()):
+        lines.extend([f"# HELP {name} {documentation}", f"# TYPE {name} gauge", f"{name} {callback():g}"])
+    return "\n".join(lines) + "\n"
+
+
+def summary():
+    """Nombre, somme et moyenne de chaque série, pour l'affichage"""
+    with _lock:
+        rows = []
+        for histogram in _histograms.values():
+            rows.extend(histogram.summary())
+    return rows
+
+
+def reset():
+    with _lock:
+        for histogram in _histograms.values():
+            histogram._series.clear()
+
+
+def dump(path):
+    """Écrit les mesures dans un fichier (collecteur textfile de node_exporter)"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(render_prometheus())
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server(port=9464, host='127.0.0.1'):
+    """Expose /metrics sur un serveur HTTP local, dans un thread démon"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name='cvapp-metrics', daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,238 @@
+"""Modèle typé et compact du CV, avec validation et (dé)sérialisation JSON
+
+Les classes utilisent __slots__ pour limiter l'empreinte mémoire quand des
+centaines de milliers de CV sont chargés. La validation se fait en un seul
+passage et rassemble toutes les erreurs avant de lever ValidationError.
+
+Le format JSON est versionné :
+
+    {"schema_version": 1, "cv": {...forme de cv_data...}}
+
+L'ancienne forme (le dictionnaire cv_data nu) est toujours acceptée.
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import ClassVar, List
+
+from .schema import LANGUAGE_LEVELS, SKILL_LEVELS
+
+SCHEMA_VERSION = 1
+
+# Niveaux canoniques : chaque niveau validé réutilise la même chaîne en mémoire
+_SKILL_LEVELS = {level: level for level in SKILL_LEVELS}
+_LANGUAGE_LEVELS = {level: level for level in LANGUAGE_LEVELS}
+
+
+class ValidationError(ValueError):
+    """Données de CV invalides ; errors contient un message par problème"""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        super().__init__("; ".join(self.errors))
+
+
+def _text(value, path, errors):
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    errors.append(f"{path}: texte attendu, {type(value).__name__} reçu")
+    return ''
+
+
+def _level(value, levels, path, errors):
+    if value is None or value == '':
+        return next(iter(levels))
+    canonical = levels.get(value)
+    if canonical is None:
+        errors.append(f"{path}: niveau inconnu {value!r} (attendu : {', '.join(levels)})")
+        return next(iter(levels))
+    return canonical
+
+
+def _mapping(value, path, errors):
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        errors.append(f"{path}: objet attendu, {type(value).__name__} reçu")
+        return {}
+    return value
+
+
+def _records(value, path, errors):
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        errors.append(f"{path}: liste attendue, {type(value).__name__} reçu")
+        return []
+    return value
+
+
+@dataclass(slots=True)
+class PersonalInfo:
+    name: str = ''
+    email: str = ''
+    phone: str = ''
+    address: str = ''
+    linkedin: str = ''
+    github: str = ''
+
+    FIELDS: ClassVar[tuple] = ('name', 'email', 'phone', 'address', 'linkedin', 'github')
+
+    @classmethod
+    def _parse(cls, data, path, errors):
+        data = _mapping(data, path, errors)
+        return cls(*[_text(data.get(name), f"{path}.{name}", errors) for name in cls.FIELDS])
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+@dataclass(slots=True)
+class Experience:
+    job_title: str = ''
+    company: str = ''
+    start_date: str = ''
+    end_date: str = ''
+    description: str = ''
+
+    FIELDS: ClassVar[tuple] = ('job_title', 'company', 'start_date', 'end_date', 'description')
+
+    @classmethod
+    def _parse(cls, data, path, errors):
+        data = _mapping(data, path, errors)
+        return cls(*[_text(data.get(name), f"{path}.{name}", errors) for name in cls.FIELDS])
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+@dataclass(slots=True)
+class Education:
+    degree: str = ''
+    institution: str = ''
+    year: str = ''
+
+    FIELDS: ClassVar[tuple] = ('degree', 'institution', 'year')
+
+    @classmethod
+    def _parse(cls, data, path, errors):
+        data = _mapping(data, path, errors)
+        return cls(*[_text(data.get(name), f"{path}.{name}", errors) for name in cls.FIELDS])
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+@dataclass(slots=True)
+class Skill:
+    name: str = ''
+    level: str = SKILL_LEVELS[0]
+
+    @classmethod
+    def _parse(cls, data, path, errors):
+        data = _mapping(data, path, errors)
+        return cls(
+            _text(data.get('name'), f"{path}.name", errors),
+            _level(data.get('level'), _SKILL_LEVELS, f"{path}.level", errors),
+        )
+
+    def to_dict(self):
+        return {'name': self.name, 'level': self.level}
+
+
+@dataclass(slots=True)
+class Language:
+    name: str = ''
+    level: str = LANGUAGE_LEVELS[0]
+
+    @classmethod
+    def _parse(cls, data, path, errors):
+        data = _mapping(data, path, errors)
+        return cls(
+            _text(data.get('name'), f"{path}.name", errors),
+            _level(data.get('level'), _LANGUAGE_LEVELS, f"{path}.level", errors),
+        )
+
+    def to_dict(self):
+        return {'name': self.name, 'level': self.level}
+
+
+@dataclass(slots=True)
+class CV:
+    personal_info: PersonalInfo = field(default_factory=PersonalInfo)
+    professional_summary: str = ''
+    experiences: List[Experience] = field(default_factory=list)
+    education: List[Education] = field(default_factory=list)
+    skills: List[Skill] = field(default_factory=list)
+    languages: List[Language] = field(default_factory=list)
+    interests: str = ''
+
+    @classmethod
+    def from_dict(cls, data):
+        """Valide et charge un CV (forme versionnée ou ancienne forme cv_data)"""
+        errors = []
+        data = _mapping(data, 'cv', errors)
+        if 'schema_version' in data:
+            version = data['schema_version']
+            if version != SCHEMA_VERSION:
+                raise ValidationError([f"schema_version {version!r} non prise en charge (attendu : {SCHEMA_VERSION})"])
+            data = _mapping(data.get('cv'), 'cv', errors)
+
+        cv = cls(
+            PersonalInfo._parse(data.get('personal_info'), 'personal_info', errors),
+            _text(data.get('professional_summary'), 'professional_summary', errors),
+            [Experience._parse(item, f"experiences[{i}]", errors)
+             for i, item in enumerate(_records(data.get('experiences'), 'experiences', errors))],
+            [Education._parse(item, f"education[{i}]", errors)
+             for i, item in enumerate(_records(data.get('education'), 'education', errors))],
+            [Skill._parse(item, f"skills[{i}]", errors)
+             for i, item in enumerate(_records(data.get('skills'), 'skills', errors))],
+            [Language._parse(item, f"languages[{i}]", errors)
+             for i, item in enumerate(_records(data.get('languages'), 'languages', errors))],
+            _text(data.get('interests'), 'interests', errors),
+        )
+        if errors:
+            raise ValidationError(errors)
+        return cv
+
+    @classmethod
+    def from_json(cls, text):
+        """Charge un CV depuis du JSON (str ou bytes)"""
+        try:
+            data = json.loads(text)
+        except ValueError as e:
+            raise ValidationError([f"JSON invalide : {e}"]) from None
+        return cls.from_dict(data)
+
+    def to_dict(self):
+        """Retourne l'ancienne forme cv_data, utilisée par l'interface et le rendu"""
+        return {
+            'personal_info': self.personal_info.to_dict(),
+            'professional_summary': self.professional_summary,
+            'experiences': [item.to_dict() for item in self.experiences],
+            'education': [item.to_dict() for item in self.education],
+            'skills': [item.to_dict() for item in self.skills],
+            'languages': [item.to_dict() for item in self.languages],
+            'interests': self.interests,
+        }
+
+    def to_json(self, indent=None):
+        """Sérialise le CV au format JSON versionné"""
+        separators = None if indent else (',', ':')
+        return json.dumps(
+            {'schema_version': SCHEMA_VERSION, 'cv': self.to_dict()},
+            ensure_ascii=False,
+            indent=indent,
+            separators=separators,
+        )
+
+
+def as_cv_data(value):
+    """Accepte un CV typé ou un dictionnaire cv_data et retourne le dictionnaire"""
+    if isinstance(value, CV):
+        return value.to_dict()
+    return value
@@ -0,0 +1,159 @@
+"""Rendu PDF du CV avec ReportLab, sans dépendance à Streamlit"""
+
+import threading
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+from reportlab.platypus.flowables import HRFlowable
+
+from . import metrics
+from .document import build_document
+from .fonts import family_for
+from .richtext import parse_blocks, to_reportlab
+from .templates import get_template
+
+# Retrait des puces, en points
+BULLET_INDENT = 4
+BULLET_TEXT_INDENT = 14
+
+# (nom du style, puce, serré) -> style dérivé, construit une fois par processus
+_derived_styles = {}
+_derived_lock = threading.Lock()
+
+
+def _block_style(style, bullet, tight):
+    """Style d'un bloc de texte libre : puce en retrait, sans espace après une ligne du même paragraphe"""
+    if not (bullet or tight):
+        return style
+    key = (style.name, bullet, tight)
+    derived = _derived_styles.get(key)
+    if derived is None:
+        options = {}
+        if bullet:
+            options.update(leftIndent=style.leftIndent + BULLET_TEXT_INDENT,
+                           bulletIndent=style.leftIndent + BULLET_INDENT)
+        if tight:
+            options['spaceAfter'] = 0
+        with _derived_lock:
+            derived = _derived_styles.setdefault(key, ParagraphStyle(
+                f"{style.name}{'Bullet' if bullet else ''}{'Tight' if tight else ''}",
+                parent=style, **options
+            ))
+    return derived
+
+
+def rich_text(text, style):
+    """Flowables d'un texte libre : un paragraphe par ligne ou puce, balisage saisi échappé"""
+    return [
+        Paragraph(to_reportlab(block.runs), _block_style(style, block.bullet, block.tight),
+                  bulletText='•' if block.bullet else None)
+        for block in parse_blocks(text)
+    ]
+
+
+def _heading(text, tpl):
+    """Titre de section, avec filet horizontal si le modèle le demande"""
+    flowables = [Paragraph(escape(text), tpl.styles['heading'])]
+    if tpl.heading_rule:
+        flowables.append(HRFlowable(width='100%', thickness=0.8,
+                                    color=tpl.palette['border'], spaceAfter=6))
+    return flowables
+
+
+def _text_section(section, tpl):
+    return _heading(section.title, tpl) + rich_text(section.text, tpl.styles['normal'])
+
+
+def _entries_section(section, tpl):
+    story = _heading(section.title, tpl)
+    for entry in section.entries:
+        entry_title = f"<b>{escape(entry.heading)}</b>"
+        if entry.period:
+            entry_title += f" ({escape(entry.period)})"
+        story.append(Paragraph(entry_title, tpl.styles['entry']))
+        if entry.description:
+            story.extend(rich_text(entry.description, tpl.styles['normal']))
+        story.append(Spacer(1, 6))
+    return story
+
+
+def _items_section(section, tpl):
+    items_text = tpl.list_separator.join(escape(item.label) for item in section.items)
+    return _heading(section.title, tpl) + [Paragraph(items_text, tpl.styles['normal'])]
+
+
+SECTION_BUILDERS = {
+    'summary': _text_section,
+    'experience': _entries_section,
+    'education': _entries_section,
+    'skills': _items_section,
+    'languages': _items_section,
+    'interests': _text_section,
+}
+
+
+def document_story(document, template):
+    """Construit la liste des flowables d'un document, sans mise en page"""
+    tpl = get_template(template, family_for(document))
+    story = []
+
+    # En-tête avec nom
+    if document.name:
+        story.append(Paragraph(escape(document.name), tpl.styles['title']))
+
+    # Informations de contact
+    if document.contacts:
+        contact_info = [f"{contact.label}: {contact.value}" for contact in document.contacts]
+        story.append(Paragraph(escape(" | ".join(contact_info)), tpl.styles['contact']))
+
+    story.append(Spacer(1, 12))
+
+    # Sections, dans l'ordre propre au modèle
+    for key in tpl.sections:
+        section = document.section(key)
+        if section is not None:
+            story.extend(SECTION_BUILDERS[key](section, tpl))
+
+    return story
+
+
+def build_story(cv_data, template, language):
+    """Construit la liste des flowables du CV, sans mise en page"""
+    return document_story(build_document(cv_data, language), template)
+
+
+def build_pdf(story, template, buffer):
+    """Met en page les flowables dans buffer et retourne le document"""
+    tpl = get_template(template)
+    doc = SimpleDocTemplate(buffer, **tpl.page)
+    doc.build(story)
+    return doc
+
+
+def render_document(document, template):
+    """Génère le PDF d'un document déjà construit"""
+    with metrics.stage('story'):
+        story = document_story(document, template)
+    buffer = BytesIO()
+    with metrics.stage('layout'):
+        doc = build_pdf(story, template, buffer)
+    metrics.observe('cvapp_render_pages', doc.page, template=template)
+    metrics.observe('cvapp_render_bytes', buffer.getbuffer().nbytes, template=template)
+    buffer.seek(0)
+    return buffer
+
+
+def create_pdf(cv_data, template, language):
+    """Génère un PDF du CV avec le style choisi"""
+    with metrics.stage('document'):
+        document = build_document(cv_data, language)
+    return render_document(document, template)
+
+
+def create_pdf_bytes(cv_data, template, language):
+    """Comme create_pdf, mais retourne directement les octets du PDF"""
+    buffer = create_pdf(cv_data, template, language)
+    with metrics.stage('copy'):
+        return buffer.getvalue()
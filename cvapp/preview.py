@@ -0,0 +1,102 @@
+"""Aperçu Markdown du CV, mémoïsé section par section"""
+
+import json
+
+from .cache import render_key
+from .document import build_document
+from .exporters import export, header_markdown, section_markdown, to_markdown
+from .model import CV
+from .store import serialize
+
+
+class PreviewMemo:
+    """Garde le Markdown de chaque section et ne recalcule que les sections modifiées
+
+    Les sections du document étant immuables, une simple comparaison d'égalité
+    suffit à savoir si le Markdown mémorisé est encore valable.
+    """
+
+    def __init__(self):
+        self._sections = {}
+        self.recomputed = 0
+        self.reused = 0
+
+    def _memoized(self, key, value, render):
+        cached = self._sections.get(key)
+        if cached is not None and cached[0] == value:
+            self.reused += 1
+            return cached[1]
+        markdown = render()
+        self._sections[key] = (value, markdown)
+        self.recomputed += 1
+        return markdown
+
+    def render(self, document):
+        """Liste (section, Markdown) de l'aperçu complet du document"""
+        blocks = [(
+            'header',
+            self._memoized('header', (document.name, document.contacts), lambda: header_markdown(document))
+        )]
+        for section in document.sections:
+            blocks.append((
+                section.key,
+                self._memoized(section.key, section, lambda section=section: section_markdown(section))
+            ))
+        return blocks
+
+
+class DocumentMemo:
+    """Document, exports et clé de rendu d'un CV, recalculés seulement quand son contenu change
+
+    update() sérialise cv_data une fois par exécution de l'interface ; le
+    JSON canonique et son empreinte (serialized) servent aussi à la
+    sauvegarde automatique. Tout ce qui en est dérivé est gardé tant que
+    l'empreinte ne change pas.
+    """
+
+    def __init__(self, cv_data):
+        self.serialized = None
+        self._cv_data = None
+        self._values = {}
+        self.rebuilt = 0
+        self.reused = 0
+        self.update(cv_data)
+
+    def update(self, cv_data):
+        """Prend en compte le contenu actuel ; retourne vrai s'il a changé"""
+        serialized = serialize(cv_data)
+        if self.serialized is not None and serialized[1] == self.serialized[1]:
+            return False
+        self.serialized = serialized
+        # Copie figée : le dictionnaire de la session continue d'être modifié
+        self._cv_data = json.loads(serialized[0])['cv']
+        self._values = {}
+        return True
+
+    def _memoized(self, key, compute):
+        value = self._values.get(key)
+        if value is None:
+            value = self._values[key] = compute()
+            self.rebuilt += 1
+        else:
+            self.reused += 1
+        return value
+
+    def document(self, language):
+        return self._memoized(('document', language), lambda: build_document(self._cv_data, language))
+
+    def export(self, fmt, language):
+        return self._memoized(('export', fmt, language), lambda: export(self.document(language), fmt))
+
+    def render_key(self, template, language):
+        return self._memoized(('render_key', template, language),
+                              lambda: render_key(self._cv_data, template, language))
+
+    def cv_json(self):
+        """JSON versionné du CV, pour l'export"""
+        return self._memoized(('cv_json',), lambda: CV.from_dict(self._cv_data).to_json(indent=2))
+
+
+def preview_markdown(cv_data, language):
+    """Aperçu complet en un seul texte Markdown, sans mémoïsation"""
+    return to_markdown(build_document(cv_data, language))
@@ -0,0 +1,177 @@
+"""Texte libre du CV (résumé, descriptions, intérêts) découpé en blocs sûrs
+
+Le texte saisi n'est jamais interprété comme du balisage : il est découpé
+une seule fois en blocs (paragraphes et puces), chacun fait de segments de
+texte brut marqués gras ou italique. Chaque exporteur produit ensuite son
+propre balisage, en échappant le texte.
+
+Sous-ensemble reconnu, le même que l'aperçu Markdown :
+
+- une ligne par paragraphe ; une ligne vide espace davantage ;
+- « - », « * », « + » ou « • » en début de ligne : puce ;
+- **gras** et *italique*.
+
+Un paragraphe très long est coupé entre deux phrases : ReportLab met en
+page plusieurs paragraphes moyens bien plus vite qu'un seul énorme.
+"""
+
+import html
+import re
+from functools import lru_cache
+from xml.sax import saxutils
+from typing import NamedTuple, Tuple
+
+# Au-delà, un paragraphe est coupé à la fin d'une phrase
+MAX_BLOCK_CHARS = 1500
+
+_BULLET = re.compile(r'^\s*[-*+•]\s+')
+_BOLD = re.compile(r'\*\*(?=\S)(.+?\**)(?<=\S)\*\*')
+_ITALIC = re.compile(r'\*(?=[^\s*])(.+?)(?<=[^\s*])\*')
+_SENTENCE_END = re.compile(r'[.!?;](?:\s+)')
+# Caractères de contrôle (sauf tabulation) : invisibles, et refusés par certains lecteurs
+_CONTROL = re.compile(r'[\x00-\x08\x0b-\x1f\x7f]')
+
+
+class Run(NamedTuple):
+    text: str
+    bold: bool = False
+    italic: bool = False
+
+
+class Block(NamedTuple):
+    """Paragraphe ou puce ; tight : suivi d'une ligne du même paragraphe, sans espace"""
+    runs: Tuple[Run, ...]
+    bullet: bool = False
+    tight: bool = False
+
+    @property
+    def text(self):
+        return ''.join(run.text for run in self.runs)
+
+
+def _italic_runs(text, bold):
+    runs = []
+    position = 0
+    for match in _ITALIC.finditer(text):
+        if match.start() > position:
+            runs.append(Run(text[position:match.start()], bold))
+        runs.append(Run(match.group(1), bold, True))
+        position = match.end()
+    if position < len(text):
+        runs.append(Run(text[position:], bold))
+    return runs
+
+
+def parse_runs(text):
+    """Segments d'une ligne ; un astérisque isolé reste du texte"""
+    runs = []
+    position = 0
+    for match in _BOLD.finditer(text):
+        runs.extend(_italic_runs(text[position:match.start()], False))
+        runs.extend(_italic_runs(match.group(1), True))
+        position = match.end()
+    runs.extend(_italic_runs(text[position:], False))
+    return tuple(run for run in runs if run.text)
+
+
+def _split_runs(runs, limit):
+    """Coupe une suite de segments en morceaux d'environ limit caractères, entre deux phrases"""
+    chunks, current, size = [], [], 0
+    for run in runs:
+        text = run.text
+        while size + len(text) > limit:
+            cut = None
+            for match in _SENTENCE_END.finditer(text, 0, max(limit - size, 0) + 1):
+                cut = match.end()
+            if cut is None:
+                if current:
+                    # Aucune fin de phrase ici : on coupe avant ce segment
+                    chunks.append(tuple(current))
+                    current, size = [], 0
+                    continue
+                # Une seule phrase démesurée : elle reste entière
+                break
+            current.append(run._replace(text=text[:cut].rstrip()))
+            chunks.append(tuple(current))
+            current, size = [], 0
+            text = text[cut:]
+        if text:
+            current.append(run._replace(text=text))
+            size += len(text)
+    if current:
+        chunks.append(tuple(current))
+    return chunks
+
+
+@lru_cache(maxsize=4096)
+def parse_blocks(text, limit=MAX_BLOCK_CHARS):
+    """Blocs d'un texte libre ; en cache, car le même texte est rendu à chaque aperçu et export"""
+    blocks = []
+    for line in _CONTROL.sub('', text or '').splitlines():
+        if not line.strip():
+            # Une ligne vide détache le bloc précédent du suivant
+            if blocks:
+                blocks[-1] = blocks[-1]._replace(tight=False)
+            continue
+        bullet = _BULLET.match(line)
+        if bullet:
+            line = line[bullet.end():]
+        chunks = _split_runs(parse_runs(' '.join(line.split())), limit)
+        for chunk in chunks:
+            blocks.append(Block(chunk, bool(bullet), True))
+    if blocks:
+        blocks[-1] = blocks[-1]._replace(tight=False)
+    return tuple(blocks)
+
+
+def _markup(runs, escape, bold, italic):
+    parts = []
+    for run in runs:
+        text = escape(run.text)
+        if run.italic:
+            text = italic % text
+        if run.bold:
+            text = bold % text
+        parts.append(text)
+    return ''.join(parts)
+
+
+def to_reportlab(runs):
+    """Balisage de paragraphe ReportLab, texte échappé"""
+    return _markup(runs, saxutils.escape, '<b>%s</b>', '<i>%s</i>')
+
+
+def to_html(runs):
+    return _markup(runs, html.escape, '<strong>%s</strong>', '<em>%s</em>')
+
+
+_MARKDOWN_SPECIAL = re.compile(r'([\\`*_\[\]<>#|~&$])')
+
+
+def escape_markdown(text):
+    """Texte brut rendu tel quel en Markdown : balisage, HTML et entités échappés"""
+    return _MARKDOWN_SPECIAL.sub(r'\\\1', text)
+
+
+def to_markdown(text):
+    """Markdown d'un texte libre : retour à la ligne forcé dans un paragraphe, puces en « - »"""
+    lines = []
+    previous = None
+    for block in parse_blocks(text):
+        if previous is not None and previous.bullet and not block.bullet and previous.tight:
+            # Sans ligne vide, la ligne suivante prolongerait la dernière puce
+            lines.append("\n")
+        line = _markup(block.runs, escape_markdown, '**%s**', '*%s*')
+        if block.bullet:
+            lines.append(f"- {line}\n" if block.tight else f"- {line}\n\n")
+        elif block.tight:
+            lines.append(f"{line}  \n")
+        else:
+            lines.append(f"{line}\n\n")
+        previous = block
+    return ''.join(lines).rstrip()
+
+
+def to_plain(text):
+    """Texte sans marques de mise en forme, une ligne par bloc, puces en « - »"""
+    return '\n'.join(('- ' if block.bullet else '') + block.text for block in parse_blocks(text))
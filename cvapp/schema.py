@@ -0,0 +1,41 @@
+"""Structure des données du CV (forme de st.session_state.cv_data)"""
+
+# Niveaux proposés dans les listes déroulantes, du plus faible au plus élevé
+SKILL_LEVELS = ['Débutant', 'Intermédiaire', 'Avancé', 'Expert']
+LANGUAGE_LEVELS = ['A1', 'A2', 'B1', 'B2', 'C1', 'C2', 'Natif']
+
+# Champs de chaque entrée des sections sous forme de liste
+LIST_SECTIONS = {
+    'experiences': ['job_title', 'company', 'start_date', 'end_date', 'description'],
+    'education': ['degree', 'institution', 'year'],
+    'skills': ['name', 'level'],
+    'languages': ['name', 'level'],
+}
+
+# Valeurs par défaut d'une nouvelle entrée
+LIST_DEFAULTS = {
+    'experiences': {},
+    'education': {},
+    'skills': {'level': SKILL_LEVELS[0]},
+    'languages': {'level': LANGUAGE_LEVELS[0]},
+}
+
+
+def empty_cv_data():
+    """Retourne un CV vide"""
+    return {
+        'personal_info': {},
+        'professional_summary': '',
+        'experiences': [],
+        'education': [],
+        'skills': [],
+        'languages': [],
+        'interests': ''
+    }
+
+
+def new_entry(section):
+    """Retourne une entrée vide pour une section sous forme de liste"""
+    entry = {field: '' for field in LIST_SECTIONS[section]}
+    entry.update(LIST_DEFAULTS[section])
+    return entry
@@ -0,0 +1,379 @@
+"""Recherche dans les CV enregistrés : index inversé en mémoire, mis à jour à chaque enregistrement
+
+L'index associe à chaque terme l'ensemble des CV qui le contiennent :
+
+- compétences et langues, par niveau : « Python Avancé ou plus » est l'union
+  de quelques ensembles (Avancé, Expert), sans parcourir les CV ;
+- mots des intitulés de poste et des entreprises ;
+- texte libre (résumé, descriptions, formations, intérêts…), classé par BM25.
+
+Les filtres se combinent par intersection, en partant du plus petit
+ensemble ; seuls les candidats restants sont notés, et heapq ne garde que
+les k meilleurs.
+
+Syntaxe des requêtes (parse_query) :
+
+    skill:python>=avancé lang:nl>=C1 title:développeur company:acme django
+    skill:"machine learning"
+"""
+
+import heapq
+import math
+import shlex
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+
+from .schema import LANGUAGE_LEVELS, SKILL_LEVELS
+from .text import normalize, term_counts, tokenize
+from .translations import LEVEL_KEYS, available_locales, catalog
+
+SKILL_RANK = {level: rank for rank, level in enumerate(SKILL_LEVELS)}
+LANGUAGE_RANK = {level: rank for rank, level in enumerate(LANGUAGE_LEVELS)}
+
+# Noms d'une même langue en fr, en, nl (et code ISO) ; le premier sert de clé
+_LANGUAGE_NAMES = (
+    ('francais', 'french', 'frans', 'fr'),
+    ('neerlandais', 'dutch', 'nederlands', 'nl', 'flamand', 'vlaams'),
+    ('anglais', 'english', 'engels', 'en'),
+    ('allemand', 'german', 'duits', 'deutsch', 'de'),
+    ('espagnol', 'spanish', 'spaans', 'espanol', 'es'),
+    ('italien', 'italian', 'italiaans', 'italiano', 'it'),
+    ('portugais', 'portuguese', 'portugees', 'pt'),
+    ('arabe', 'arabic', 'arabisch', 'ar'),
+    ('chinois', 'chinese', 'chinees', 'mandarin', 'zh'),
+    ('russe', 'russian', 'russisch', 'ru'),
+    ('turc', 'turkish', 'turks', 'tr'),
+    ('polonais', 'polish', 'pools', 'pl'),
+)
+LANGUAGE_ALIASES = {name: names[0] for names in _LANGUAGE_NAMES for name in names}
+
+# Paramètres BM25 du texte libre
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+class SearchHit(NamedTuple):
+    cv_id: str
+    name: str
+    score: float
+
+
+class Query(NamedTuple):
+    """Critères d'une recherche ; compétences et langues : (nom, niveau minimal ou '')"""
+    skills: Tuple[Tuple[str, str], ...] = ()
+    languages: Tuple[Tuple[str, str], ...] = ()
+    titles: Tuple[str, ...] = ()
+    companies: Tuple[str, ...] = ()
+    text: str = ''
+
+
+def _clean(value):
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+def skill_terms(name, language='fr'):
+    """Termes d'index d'une compétence : le nom complet et chacun de ses mots"""
+    full = ' '.join(normalize(_clean(name)).split())
+    if not full:
+        return set()
+    return {full, *tokenize(full, language)}
+
+
+def language_term(name):
+    full = ' '.join(normalize(_clean(name)).split())
+    return LANGUAGE_ALIASES.get(full, full)
+
+
+@lru_cache(maxsize=None)
+def _level_labels(levels):
+    """Libellés normalisés (toutes langues, codes CECRL) -> niveau canonique"""
+    labels = {normalize(level): level for level in levels}
+    for locale in available_locales():
+        table = catalog(locale)
+        for level in levels:
+            key = LEVEL_KEYS.get(level)
+            if key and key in table:
+                labels.setdefault(normalize(table[key]), level)
+    return labels
+
+
+def parse_level(text, levels):
+    """Niveau canonique désigné par text (« avancé », « advanced », « c1 »…)"""
+    level = _level_labels(tuple(levels)).get(normalize(text.strip()))
+    if level is None:
+        raise ValueError(f"Niveau inconnu : {text!r} (attendu : {', '.join(levels)})")
+    return level
+
+
+def _criterion(value):
+    name, _, level = value.partition('>=')
+    return name.strip(), level.strip()
+
+
+def parse_query(text):
+    """Analyse une requête texte en Query (voir la syntaxe en tête de module)"""
+    skills, languages, titles, companies, words = [], [], [], [], []
+    try:
+        parts = shlex.split(text)
+    except ValueError:
+        parts = text.split()
+    for part in parts:
+        field, sep, value = part.partition(':')
+        field = field.lower()
+        if not sep or not value:
+            words.append(part)
+        elif field in ('skill', 'competence', 'compétence'):
+            name, level = _criterion(value)
+            skills.append((name, parse_level(level, SKILL_LEVELS) if level else ''))
+        elif field in ('lang', 'language', 'langue'):
+            name, level = _criterion(value)
+            languages.append((name, parse_level(level, LANGUAGE_LEVELS) if level else ''))
+        elif field in ('title', 'titre', 'poste'):
+            titles.append(value)
+        elif field in ('company', 'entreprise'):
+            companies.append(value)
+        else:
+            words.append(part)
+    return Query(tuple(skills), tuple(languages), tuple(titles), tuple(companies), ' '.join(words))
+
+
+class _Doc:
+    """Ce qui a été indexé pour un CV, pour pouvoir l'en retirer"""
+
+    __slots__ = ('cv_id', 'name', 'skills', 'languages', 'titles', 'companies', 'terms', 'length')
+
+    def __init__(self, cv_id, name):
+        self.cv_id = cv_id
+        self.name = name
+        self.skills = {}
+        self.languages = {}
+        self.titles = set()
+        self.companies = set()
+        self.terms = {}
+        self.length = 0
+
+
+class SearchIndex:
+    """Index inversé des CV, sûr entre threads ; add() remplace la version précédente"""
+
+    def __init__(self, language='fr'):
+        self.language = language
+        self._docs = {}
+        self._slots = {}
+        self._next_slot = 0
+        # terme -> un ensemble de CV par niveau (index = rang du niveau)
+        self._skills = defaultdict(lambda: [set() for _ in SKILL_LEVELS])
+        self._languages = defaultdict(lambda: [set() for _ in LANGUAGE_LEVELS])
+        self._titles = defaultdict(set)
+        self._companies = defaultdict(set)
+        # terme -> {CV: occurrences}
+        self._text = defaultdict(dict)
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    # Mise à jour
+
+    def _text_of(self, cv_data):
+        parts = [_clean(cv_data.get('professional_summary')), _clean(cv_data.get('interests'))]
+        for exp in cv_data.get('experiences') or ():
+            parts.extend(_clean(exp.get(field)) for field in ('job_title', 'company', 'description'))
+        for edu in cv_data.get('education') or ():
+            parts.extend(_clean(edu.get(field)) for field in ('degree', 'institution'))
+        parts.extend(_clean(skill.get('name')) for skill in cv_data.get('skills') or ())
+        return '\n'.join(part for part in parts if part)
+
+    def _document(self, cv_id, cv_data):
+        personal_info = cv_data.get('personal_info') or {}
+        doc = _Doc(cv_id, _clean(personal_info.get('name')))
+        for skill in cv_data.get('skills') or ():
+            rank = SKILL_RANK.get(_clean(skill.get('level')), 0)
+            for term in skill_terms(skill.get('name'), self.language):
+                if rank >= doc.skills.get(term, -1):
+                    doc.skills[term] = rank
+        for language in cv_data.get('languages') or ():
+            term = language_term(language.get('name'))
+            if term:
+                rank = LANGUAGE_RANK.get(_clean(language.get('level')), 0)
+                doc.languages[term] = max(rank, doc.languages.get(term, -1))
+        for exp in cv_data.get('experiences') or ():
+            doc.titles.update(tokenize(_clean(exp.get('job_title')), self.language))
+            doc.companies.update(tokenize(_clean(exp.get('company')), self.language))
+        doc.terms = term_counts(self._text_of(cv_data), self.language)
+        doc.length = sum(doc.terms.values())
+        return doc
+
+    def add(self, cv_id, cv_data, replace=True):
+        """Indexe (ou réindexe) un CV ; avec replace=False, un CV déjà indexé est laissé tel quel"""
+        # Tokenisation hors du verrou : les recherches concurrentes ne l'attendent pas
+        doc = self._document(cv_id, cv_data)
+        with self._lock:
+            if cv_id in self._slots:
+                if not replace:
+                    return
+                self._remove(cv_id)
+            slot = self._next_slot
+            self._next_slot += 1
+
+            for term, rank in doc.skills.items():
+                self._skills[term][rank].add(slot)
+            for term, rank in doc.languages.items():
+                self._languages[term][rank].add(slot)
+            for term in doc.titles:
+                self._titles[term].add(slot)
+            for term in doc.companies:
+                self._companies[term].add(slot)
+            for term, count in doc.terms.items():
+                self._text[term][slot] = count
+            self._total_length += doc.length
+            self._docs[slot] = doc
+            self._slots[cv_id] = slot
+
+    def _remove(self, cv_id):
+        slot = self._slots.pop(cv_id)
+        doc = self._docs.pop(slot)
+        for postings, items in ((self._skills, doc.skills), (self._languages, doc.languages)):
+            for term, rank in items.items():
+                postings[term][rank].discard(slot)
+                if not any(postings[term]):
+                    del postings[term]
+        for postings, terms in ((self._titles, doc.titles), (self._companies, doc.companies)):
+            for term in terms:
+                postings[term].discard(slot)
+                if not postings[term]:
+                    del postings[term]
+        for term in doc.terms:
+            del self._text[term][slot]
+            if not self._text[term]:
+                del self._text[term]
+        self._total_length -= doc.length
+
+    def remove(self, cv_id):
+        with self._lock:
+            if cv_id in self._slots:
+                self._remove(cv_id)
+
+    def on_save(self, cv_id, cv_data):
+        """Écouteur de CVStore : réindexe le CV enregistré, ou le retire s'il est supprimé"""
+        if cv_data is None:
+            self.remove(cv_id)
+        else:
+            self.add(cv_id, cv_data)
+
+    @classmethod
+    def from_store(cls, store, language='fr'):
+        """Index de tous les CV d'un CVStore, tenu à jour à chaque enregistrement"""
+        index = cls(language)
+        # Abonné avant la lecture : un CV enregistré pendant la construction n'est pas écrasé
+        store.add_listener(index.on_save)
+        for cv_id, cv_data in store.iter_cvs():
+            index.add(cv_id, cv_data, replace=False)
+        return index
+
+    # Recherche
+
+    def _leveled(self, postings, term, min_rank):
+        levels = postings.get(term)
+        if levels is None:
+            return set()
+        if min_rank == 0:
+            return set().union(*levels)
+        return set().union(*levels[min_rank:])
+
+    def _words(self, postings, text):
+        """CV dont le champ contient tous les mots de text"""
+        sets = [postings.get(term, set()) for term in tokenize(text, self.language)]
+        if not sets:
+            return None
+        sets.sort(key=len)
+        return sets[0].intersection(*sets[1:])
+
+    def search(self, query, top=20, among=None):
+        """Les top CV qui satisfont tous les filtres de query, les mieux classés d'abord
+
+        Score : niveaux obtenus sur les compétences et langues demandées
+        (1 par critère au niveau maximal), plus le BM25 du texte libre.
+        Avec among (des ID de CV), seuls ces CV peuvent être retournés.
+        """
+        if isinstance(query, str):
+            query = parse_query(query)
+        with self._lock:
+            filters = []
+            skills = [(term, SKILL_RANK.get(level, 0))
+                      for name, level in query.skills for term in [' '.join(normalize(name).split())]]
+            languages = [(language_term(name), LANGUAGE_RANK.get(level, 0)) for name, level in query.languages]
+            for term, rank in skills:
+                filters.append(self._leveled(self._skills, term, rank))
+            for term, rank in languages:
+                filters.append(self._leveled(self._languages, term, rank))
+            for title in query.titles:
+                filters.append(self._words(self._titles, title))
+            for company in query.companies:
+                filters.append(self._words(self._companies, company))
+            filters = [found for found in filters if found is not None]
+
+            terms = list(dict.fromkeys(tokenize(query.text, self.language)))
+            if terms:
+                matching = set()
+                for term in terms:
+                    matching.update(self._text.get(term, ()))
+                filters.append(matching)
+            if not filters:
+                return []
+            if among is not None:
+                filters.append({self._slots[cv_id] for cv_id in among if cv_id in self._slots})
+
+            filters.sort(key=len)
+            candidates = filters[0].intersection(*filters[1:])
+            if not candidates:
+                return []
+
+            scores = dict.fromkeys(candidates, 0.0)
+            max_skill = len(SKILL_LEVELS) - 1
+            max_language = len(LANGUAGE_LEVELS) - 1
+            for slot in candidates:
+                doc = self._docs[slot]
+                scores[slot] += sum(doc.skills.get(term, 0) for term, _ in skills) / max_skill
+                scores[slot] += sum(doc.languages.get(term, 0) for term, _ in languages) / max_language
+            if terms:
+                self._bm25(terms, candidates, scores)
+
+            best = heapq.nlargest(top, scores.items(), key=lambda item: item[1])
+            return [SearchHit(self._docs[slot].cv_id, self._docs[slot].name, score) for slot, score in best]
+
+    def _bm25(self, terms, candidates, scores):
+        count = len(self._docs)
+        average = self._total_length / count if count else 1.0
+        docs = self._docs
+        # Normalisation de longueur de chaque candidat, commune à tous les termes
+        norms = {slot: BM25_K1 * (1 - BM25_B + BM25_B * docs[slot].length / average) for slot in candidates}
+        for term in terms:
+            postings = self._text.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            boost = idf * (BM25_K1 + 1)
+            # Parcourt le plus petit des deux : les candidats ou la liste du terme
+            if len(candidates) < len(postings):
+                pairs = ((slot, postings[slot]) for slot in candidates if slot in postings)
+            else:
+                pairs = ((slot, tf) for slot, tf in postings.items() if slot in norms)
+            for slot, tf in pairs:
+                scores[slot] += boost * tf / (tf + norms[slot])
+
+    def stats(self):
+        with self._lock:
+            return {
+                'cvs': len(self._docs),
+                'skills': len(self._skills),
+                'languages': len(self._languages),
+                'titles': len(self._titles),
+                'companies': len(self._companies),
+                'terms': len(self._text),
+            }
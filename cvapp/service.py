@@ -0,0 +1,458 @@
+"""Service HTTP local de rendu PDF, partagé par plusieurs instances de l'interface
+
+Le service reçoit cv_data (JSON) avec le modèle et la langue, et retourne le
+PDF. Derrière lui :
+
+- un pool de processus de rendu, dimensionné indépendamment de l'interface ;
+- la déduplication : des demandes identiques en cours partagent un seul rendu ;
+- un cache des résultats (RenderCache, avec niveau disque optionnel).
+
+Il n'écoute par défaut que sur 127.0.0.1 :
+
+    python -m cvapp serve --port 8765 --workers 4
+
+Côté interface, RenderClient garde des connexions HTTP/1.1 ouvertes
+(keep-alive) dans un pool. Si le service est injoignable ou saturé, il lève
+ServiceUnavailable et l'appelant rend le PDF lui-même (voir RenderQueue).
+
+API :
+
+    POST /render  {"cv_data": {...}, "template": "classic", "language": "fr"}
+                  -> 200 application/pdf (en-têtes X-Render-Key, X-Render-Source)
+                  -> 400 JSON {"error": ..., "errors": [...]} si la demande est invalide
+                  -> 422 JSON {"error": ...} si le rendu de ce CV échoue
+                  -> 503 JSON {"error": ..., "code": "busy"} si trop de rendus sont en cours (Retry-After)
+                  -> 503 JSON {"error": ..., "code": "broken"} si le pool de rendu est hors d'usage
+    GET /health   -> 200 JSON : état du pool et du cache ; 503 si le pool est hors d'usage
+    GET /metrics  -> mesures au format Prometheus
+"""
+
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from . import metrics
+from .cache import RenderCache, render_key
+from .jobs import _render_bytes
+from .model import CV, ValidationError
+from .translations import available_locales
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Secondes d'inactivité avant que le serveur ferme une connexion gardée ouverte
+IDLE_TIMEOUT = 60.0
+
+# Taille maximale d'une demande : un CV, même très long, tient largement dedans
+MAX_REQUEST_BYTES = 8 * 1024 * 1024
+
+
+class ServiceUnavailable(Exception):
+    """Le service est injoignable, saturé ou en erreur : l'appelant peut rendre lui-même"""
+    code = 'busy'
+
+
+class PoolBroken(ServiceUnavailable):
+    """Le pool de rendu est hors d'usage (processus tué) et n'a pas pu être remplacé"""
+    code = 'broken'
+
+
+class RenderRejected(ValueError):
+    """Demande refusée ou CV impossible à rendre : un rendu local échouerait de même"""
+
+
+class RenderService:
+    """Pool de rendu avec déduplication des demandes en cours et cache des résultats"""
+
+    def __init__(self, workers=None, use_processes=True, max_pending=64, cache=None, timeout=60.0):
+        workers = workers or os.cpu_count() or 1
+        self._executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self._executor = self._executor_class(max_workers=workers)
+        self.workers = workers
+        self.max_pending = max_pending
+        self.cache = cache if cache is not None else RenderCache()
+        self.timeout = timeout
+        # clé -> (future, pool qui l'exécute)
+        self._in_flight = {}
+        # Réentrant : le rappel de fin peut s'exécuter immédiatement dans _submit
+        self._lock = threading.RLock()
+        # Message d'erreur tant que le pool n'a pas pu être remplacé
+        self.broken = None
+        self._closed = False
+        self.counts = {'rendered': 0, 'cached': 0, 'shared': 0, 'failed': 0, 'rejected': 0, 'busy': 0,
+                       'restarts': 0}
+
+    def _count(self, outcome):
+        with self._lock:
+            self.counts[outcome] += 1
+
+    def _validate(self, cv_data, template, language):
+        from .templates import TEMPLATES
+
+        if template not in TEMPLATES:
+            raise ValueError(f"Modèle inconnu : {template!r} (attendu : {', '.join(TEMPLATES)})")
+        if language not in available_locales():
+            raise ValueError(f"Langue inconnue : {language!r} (attendu : {', '.join(available_locales())})")
+        if not isinstance(cv_data, dict):
+            raise ValueError("cv_data doit être un objet JSON")
+        return CV.from_dict(cv_data).to_dict()
+
+    def _restart(self, executor):
+        """Remplace un pool hors d'usage (sous self._lock) ; sans effet s'il l'a déjà été"""
+        if executor is not self._executor and self.broken is None:
+            return
+        if self._closed:
+            self.broken = "service arrêté"
+            return
+        # Les rendus en cours sur l'ancien pool ont échoué : leurs demandes recommencent sur le nouveau
+        try:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        except Exception:
+            pass
+        try:
+            self._executor = self._executor_class(max_workers=self.workers)
+        except Exception as e:
+            self.broken = f"{type(e).__name__}: {e}"
+            return
+        self.broken = None
+        self.counts['restarts'] += 1
+
+    def healthy(self):
+        """Vrai si le pool est utilisable ; un pool hors d'usage est remplacé au passage"""
+        with self._lock:
+            # _broken : marqué par concurrent.futures dès qu'un processus du pool meurt
+            if self.broken is not None or getattr(self._executor, '_broken', False):
+                self._restart(self._executor)
+            return self.broken is None
+
+    def _submit(self, key, cv_data, template, language):
+        """(future, pool, source) : le rendu en cours de la même demande, ou un nouveau"""
+        with self._lock:
+            if self.broken is not None:
+                self._restart(self._executor)
+                if self.broken is not None:
+                    self.counts['failed'] += 1
+                    raise PoolBroken(f"Pool de rendu hors d'usage : {self.broken}")
+            entry = self._in_flight.get(key)
+            # Un rendu de l'ancien pool a échoué : il ne se partage plus
+            if entry is not None and entry[1] is self._executor:
+                return entry[0], entry[1], 'shared'
+            if len(self._in_flight) >= self.max_pending:
+                self.counts['busy'] += 1
+                raise ServiceUnavailable(f"Trop de rendus en cours (au plus {self.max_pending})")
+            for attempt in (0, 1):
+                executor = self._executor
+                try:
+                    future = executor.submit(_render_bytes, cv_data, template, language)
+                    break
+                except (BrokenExecutor, RuntimeError, OSError) as e:
+                    self._restart(executor)
+                    if attempt or self.broken is not None:
+                        self.broken = self.broken or f"{type(e).__name__}: {e}"
+                        self.counts['failed'] += 1
+                        raise PoolBroken(f"Pool de rendu hors d'usage : {self.broken}") from e
+            self._in_flight[key] = (future, executor)
+            future.add_done_callback(lambda future, key=key: self._on_done(key, future))
+            return future, executor, 'rendered'
+
+    def render(self, cv_data, template, language):
+        """(clé de rendu, octets du PDF, source) ; source vaut rendered, cached ou shared
+
+        Lève ValueError (ValidationError comprise) pour une demande invalide,
+        RenderRejected si le rendu de ce CV échoue, ServiceUnavailable quand
+        max_pending rendus sont déjà en cours, et PoolBroken quand le pool
+        est hors d'usage. Un processus du pool qui meurt (mémoire, plantage)
+        casse tout le pool : il est remplacé et la demande retentée une fois.
+        """
+        try:
+            cv_data = self._validate(cv_data, template, language)
+        except ValueError:
+            self._count('rejected')
+            raise
+        key = render_key(cv_data, template, language)
+
+        data = self.cache.get(key)
+        if data is not None:
+            self._count('cached')
+            return key, data, 'cached'
+
+        for attempt in (0, 1):
+            future, executor, source = self._submit(key, cv_data, template, language)
+            try:
+                data = future.result(timeout=self.timeout)
+            except FutureTimeout:
+                self._count('failed')
+                raise ServiceUnavailable(f"Rendu trop long (plus de {self.timeout:g}s)") from None
+            except BrokenExecutor as e:
+                with self._lock:
+                    self._restart(executor)
+                if attempt:
+                    self._count('failed')
+                    raise PoolBroken(f"Pool de rendu hors d'usage : {e}") from e
+                continue
+            except Exception as e:
+                self._count('failed')
+                raise RenderRejected(f"{type(e).__name__}: {e}") from e
+            self._count(source)
+            return key, data, source
+
+    def _on_done(self, key, future):
+        # Le cache est rempli avant le retrait des rendus en cours : une demande trouve l'un ou l'autre
+        if not future.cancelled() and future.exception() is None:
+            self.cache.put(key, future.result())
+        with self._lock:
+            entry = self._in_flight.get(key)
+            if entry is not None and entry[0] is future:
+                del self._in_flight[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'status': 'broken' if self.broken is not None else 'ok',
+                'workers': self.workers,
+                'in_flight': len(self._in_flight),
+                'max_pending': self.max_pending,
+                **self.counts,
+                'cache': self.cache.stats(),
+            }
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            self._closed = True
+            executor = self._executor
+        executor.shutdown(wait=wait, cancel_futures=True)
+
+
+class _RenderHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 : la connexion reste ouverte entre deux demandes d'un même client
+    protocol_version = 'HTTP/1.1'
+    # En-têtes et corps partent en deux écritures : sans TCP_NODELAY, l'ACK différé du client ajoute ~40 ms
+    disable_nagle_algorithm = True
+    service = None
+
+    def _send(self, status, body, content_type, headers=()):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, payload, headers=()):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self._send(status, body, 'application/json; charset=utf-8', headers)
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        if path == '/health':
+            healthy = self.service.healthy()
+            self._send_json(200 if healthy else 503, self.service.stats())
+        elif path == '/metrics':
+            self._send(200, metrics.render_prometheus().encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8')
+        else:
+            self._send_json(404, {'error': f"Chemin inconnu : {path}"})
+
+    def do_POST(self):
+        if self.path.split('?')[0] != '/render':
+            self._send_json(404, {'error': f"Chemin inconnu : {self.path}"})
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_REQUEST_BYTES:
+            # Le corps n'est pas lu : la connexion ne peut pas être réutilisée
+            self.close_connection = True
+            self._send_json(413, {'error': f"Demande trop volumineuse (plus de {MAX_REQUEST_BYTES} octets)"})
+            return
+        start = time.perf_counter()
+        outcome = 'error'
+        try:
+            request = json.loads(self.rfile.read(length))
+            if not isinstance(request, dict):
+                raise ValueError("le corps doit être un objet JSON")
+            key, data, outcome = self.service.render(
+                request.get('cv_data'),
+                request.get('template', 'classic'),
+                request.get('language', 'fr'),
+            )
+        except RenderRejected as e:
+            outcome = 'failed'
+            self._send_json(422, {'error': str(e)})
+        except ValidationError as e:
+            outcome = 'rejected'
+            self._send_json(400, {'error': str(e), 'errors': e.errors})
+        except ValueError as e:
+            # JSON illégal, modèle ou langue inconnus
+            outcome = 'rejected'
+            self._send_json(400, {'error': f"Demande invalide : {e}"})
+        except ServiceUnavailable as e:
+            outcome = e.code
+            # Saturation : le client peut revenir tout de suite ; pool hors d'usage : il attend
+            headers = [('Retry-After', '1')] if e.code == 'busy' else []
+            self._send_json(503, {'error': str(e), 'code': e.code}, headers)
+        except Exception as e:
+            self._send_json(500, {'error': f"{type(e).__name__}: {e}"})
+        else:
+            self._send(200, data, 'application/pdf', [('X-Render-Key', key), ('X-Render-Source', outcome)])
+        finally:
+            metrics.observe('cvapp_service_request_seconds', time.perf_counter() - start, outcome=outcome)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT, idle_timeout=IDLE_TIMEOUT):
+    """Serveur HTTP du service (port 0 : port libre choisi par le système)
+
+    Une connexion inactive depuis idle_timeout secondes est fermée, et son thread libéré.
+    """
+    handler = type('RenderHandler', (_RenderHandler,), {'service': service, 'timeout': idle_timeout})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT, idle_timeout=IDLE_TIMEOUT):
+    """Lance le service dans un thread démon et retourne le serveur (server.server_address)"""
+    server = make_server(service, host, port, idle_timeout)
+    thread = threading.Thread(target=server.serve_forever, name='cvapp-render-service', daemon=True)
+    thread.start()
+    return server
+
+
+class RenderClient:
+    """Client du service de rendu : pool de connexions keep-alive, sûr entre threads
+
+    Après une panne (connexion refusée, délai dépassé, 5xx), le service n'est
+    plus sollicité pendant retry_after secondes : les appels lèvent aussitôt
+    ServiceUnavailable, et l'appelant rend lui-même sans attendre.
+    """
+
+    def __init__(self, url, pool_size=4, timeout=30.0, retry_after=10.0):
+        parts = urlsplit(url)
+        if parts.scheme != 'http' or not parts.hostname:
+            raise ValueError(f"URL du service invalide : {url!r} (attendu : http://hôte:port)")
+        self.url = url
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+        self.counts = {'remote': 0, 'unavailable': 0, 'reconnects': 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def _connection(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _release(self, conn):
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _request(self, method, path, body=None, headers=None):
+        """(statut, en-têtes, corps) ; une connexion fermée entre-temps par le serveur est remplacée une fois"""
+        conn = self._connection()
+        for attempt in (0, 1):
+            reused = conn.sock is not None
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                response = conn.getresponse()
+                data = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if reused and attempt == 0:
+                    # Les autres connexions au repos ont sans doute expiré aussi
+                    self.close()
+                    self._count('reconnects')
+                    conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            return response.status, response.headers, data
+
+    def _unavailable(self, message):
+        with self._lock:
+            self._down_until = time.monotonic() + self.retry_after
+            self.counts['unavailable'] += 1
+        return ServiceUnavailable(message)
+
+    def render(self, cv_data, template, language):
+        """Octets du PDF rendu par le service"""
+        if time.monotonic() < self._down_until:
+            raise ServiceUnavailable(f"Service {self.url} indisponible, nouvel essai plus tard")
+        body = json.dumps({'cv_data': cv_data, 'template': template, 'language': language},
+                          ensure_ascii=False).encode('utf-8')
+        try:
+            status, _, data = self._request('POST', '/render', body, {'Content-Type': 'application/json'})
+        except (OSError, http.client.HTTPException) as e:
+            raise self._unavailable(f"Service {self.url} injoignable : {type(e).__name__}: {e}") from e
+        if status == 200:
+            self._count('remote')
+            return data
+        try:
+            payload = json.loads(data)
+            error, code = payload.get('error', ''), payload.get('code')
+        except (ValueError, AttributeError):
+            error, code = data[:200].decode('utf-8', 'replace'), None
+        if status == 503 and code == 'busy':
+            # Saturation passagère : inutile de mettre le service de côté
+            self._count('unavailable')
+            raise ServiceUnavailable(f"Service {self.url} saturé : {error}")
+        if 400 <= status < 500:
+            raise RenderRejected(error)
+        raise self._unavailable(f"Service {self.url} en erreur ({status}) : {error}")
+
+    def health(self):
+        """État du service (GET /health)"""
+        status, _, data = self._request('GET', '/health')
+        if status != 200:
+            raise ServiceUnavailable(f"Service {self.url} en erreur ({status})")
+        return json.loads(data)
+
+    def stats(self):
+        with self._lock:
+            return {'url': self.url, 'idle_connections': self._idle.qsize(), **self.counts}
+
+    def close(self):
+        """Ferme les connexions au repos"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, use_processes=True, max_pending=64,
+          cache_dir=None, cache_mb=256):
+    """Lance le service au premier plan jusqu'à Ctrl+C"""
+    cache = RenderCache(max_entries=4096, max_bytes=cache_mb * 1024 * 1024, disk_dir=cache_dir)
+    service = RenderService(workers, use_processes, max_pending, cache)
+    server = make_server(service, host, port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown(wait=False)
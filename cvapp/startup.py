@@ -0,0 +1,101 @@
+"""Mesure du démarrage à froid : temps d'import par module et premier rendu
+
+Chaque mesure est faite dans un interpréteur neuf (python -X importtime),
+pour que les modules déjà chargés par le processus courant ne faussent rien.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+APP_SCRIPT = Path(__file__).resolve().parent.parent / 'CV.APP.py'
+
+# Script exécuté dans le sous-processus : charge l'application sans lancer main(),
+# puis chronomètre le premier rendu (imports ReportLab paresseux compris) et le suivant.
+_PROBE = r'''
+import json, resource, runpy, sys, time, warnings
+warnings.simplefilter('ignore')
+start = time.perf_counter()
+if {load_app!r}:
+    runpy.run_path({app!r}, run_name='cvapp_startup')
+else:
+    import cvapp.cache, cvapp.preview, cvapp.jobs
+load = time.perf_counter() - start
+from cvapp.schema import empty_cv_data
+cv_data = empty_cv_data()
+cv_data['personal_info']['name'] = 'Startup Probe'
+cv_data['professional_summary'] = 'Mesure du premier rendu.'
+start = time.perf_counter()
+from cvapp.pdf import create_pdf
+create_pdf(cv_data, 'classic', 'fr')
+first = time.perf_counter() - start
+start = time.perf_counter()
+create_pdf(cv_data, 'classic', 'fr')
+second = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{'load': load, 'first_render': first, 'second_render': second, 'max_rss_kb': rss}}))
+'''
+
+
+def _parse_importtime(stderr):
+    """Extrait le temps cumulé (µs) des modules importés au premier niveau"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Les modules imbriqués sont indentés ; seuls les imports directs nous intéressent
+        if name.startswith('  '):
+            continue
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def measure_startup(load_app=True):
+    """Lance une sonde dans un interpréteur neuf et retourne son rapport"""
+    code = _PROBE.format(load_app=load_app, app=str(APP_SCRIPT))
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True,
+        text=True,
+        cwd=str(APP_SCRIPT.parent),
+        check=True,
+    )
+    probe = json.loads(completed.stdout.strip().splitlines()[-1])
+    modules = _parse_importtime(completed.stderr)
+    return {
+        'load_seconds': probe['load'],
+        'first_render_seconds': probe['first_render'],
+        'second_render_seconds': probe['second_render'],
+        'max_rss_kb': probe['max_rss_kb'],
+        'import_ms': {
+            name: micros / 1000
+            for name, micros in sorted(modules.items(), key=lambda item: -item[1])
+        },
+    }
+
+
+def format_report(report, top=15):
+    """Met en forme le rapport pour la console"""
+    lines = [
+        f"Chargement de l'application : {report['load_seconds'] * 1000:.1f} ms",
+        f"Premier rendu PDF           : {report['first_render_seconds'] * 1000:.1f} ms",
+        f"Rendu suivant               : {report['second_render_seconds'] * 1000:.1f} ms",
+        f"Mémoire résidente max.      : {report['max_rss_kb'] / 1024:.1f} Mo",
+        "",
+        "Imports les plus coûteux (cumulé) :",
+    ]
+    for name, ms in list(report['import_ms'].items())[:top]:
+        lines.append(f"  {ms:9.1f} ms  {name}")
+    return "\n".join(lines)
+
+
+def check_budget(report, max_load_ms=None, max_first_render_ms=None):
+    """Retourne la liste des dépassements de budget (vide si tout va bien)"""
+    failures = []
+    if max_load_ms is not None and report['load_seconds'] * 1000 > max_load_ms:
+        failures.append(f"chargement {report['load_seconds'] * 1000:.1f} ms > {max_load_ms} ms")
+    if max_first_render_ms is not None and report['first_render_seconds'] * 1000 > max_first_render_ms:
+        failures.append(f"premier rendu {report['first_render_seconds'] * 1000:.1f} ms > {max_first_render_ms} ms")
+    return failures
@@ -0,0 +1,461 @@
+"""Stockage persistant des CV (SQLite en mode WAL) et sauvegarde automatique différée
+
+Chaque enregistrement crée une nouvelle version d'un CV, identifié par un ID
+stable : on peut reprendre un CV après l'expiration de la session ou le
+redémarrage du serveur, et revenir à une version antérieure.
+
+La base est commune à toutes les sessions : chaque CV appartient au
+propriétaire qui l'a créé (un jeton secret, propre au navigateur), et seules
+les lectures faites au nom de ce propriétaire le voient. Sans propriétaire
+(owner=None), les lectures portent sur toute la base : réservé aux outils en
+ligne de commande.
+
+AutoSaver regroupe les modifications : l'interface lui confie le CV à chaque
+exécution, mais seul un contenu dont l'empreinte a changé est retenu, et il
+n'est écrit qu'après un délai de calme (ou un délai maximal), par un thread
+dédié. L'écriture ne bloque donc jamais l'interface.
+"""
+
+import atexit
+import hashlib
+import json
+import queue
+import secrets
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+from .model import CV, SCHEMA_VERSION, as_cv_data
+
+DEFAULT_PATH = Path.home() / '.cvapp' / 'cvs.sqlite3'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cvs (
+    id TEXT PRIMARY KEY,
+    owner TEXT,
+    name TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    version INTEGER NOT NULL,
+    content_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS versions (
+    cv_id TEXT NOT NULL REFERENCES cvs(id) ON DELETE CASCADE,
+    version INTEGER NOT NULL,
+    saved_at REAL NOT NULL,
+    content_hash TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (cv_id, version)
+);
+CREATE INDEX IF NOT EXISTS cvs_updated_at ON cvs (updated_at DESC);
+"""
+
+# Créé après la migration : une base antérieure n'a pas encore la colonne owner
+OWNER_INDEX = "CREATE INDEX IF NOT EXISTS cvs_owner_updated_at ON cvs (owner, updated_at DESC);"
+
+# Connexions SQLite gardées ouvertes entre deux appels
+POOL_SIZE = 4
+
+# Empreintes gardées par AutoSaver ; au-delà, les CV les moins récemment vus sont oubliés
+MAX_KNOWN_DIGESTS = 10_000
+
+
+def new_cv_id():
+    return uuid.uuid4().hex
+
+
+def new_owner_token():
+    """Jeton secret d'un propriétaire : il n'apparaît dans aucune liste, il ne se devine pas"""
+    return secrets.token_urlsafe(24)
+
+
+def is_owner_token(value):
+    return isinstance(value, str) and 16 <= len(value) <= 128 and value.replace('-', '').replace('_', '').isalnum()
+
+
+def serialize(cv_data):
+    """JSON versionné et canonique d'un CV, avec son empreinte SHA-256"""
+    payload = json.dumps(
+        {'schema_version': SCHEMA_VERSION, 'cv': as_cv_data(cv_data)},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(',', ':'),
+        default=str,
+    )
+    return payload, hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _cv_name(cv_data):
+    return str((cv_data.get('personal_info') or {}).get('name') or '').strip()
+
+
+class CVStore:
+    """Base SQLite des CV et de leurs versions, utilisable depuis plusieurs threads"""
+
+    def __init__(self, path=DEFAULT_PATH, max_versions=50, pool_size=POOL_SIZE):
+        self.path = Path(path)
+        self.max_versions = max_versions
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Streamlit exécute presque chaque relance dans un nouveau thread : une connexion par
+        # thread fuirait. Les connexions libres sont rendues à un pool borné, le surplus est fermé.
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+        self._open = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._listeners = []
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+            columns = {row['name'] for row in conn.execute('PRAGMA table_info(cvs)')}
+            if 'owner' not in columns:
+                # Les CV d'une base antérieure n'ont pas de propriétaire : l'interface ne les montre plus
+                conn.execute('ALTER TABLE cvs ADD COLUMN owner TEXT')
+            conn.execute(OWNER_INDEX)
+
+    def add_listener(self, callback):
+        """Enregistre callback(cv_id, cv_data), appelé après chaque nouvelle version
+
+        cv_data vaut None quand le CV est supprimé.
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        self._listeners.remove(callback)
+
+    def _notify(self, cv_id, cv_data):
+        for callback in list(self._listeners):
+            callback(cv_id, cv_data)
+
+    def _new_connection(self):
+        # Partagée entre threads, mais jamais par deux à la fois : le pool la prête à un seul appel
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        # WAL : les lectures de l'interface ne sont pas bloquées par l'écriture en cours
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA foreign_keys=ON')
+        with self._lock:
+            self._open += 1
+        return conn
+
+    def _close_connection(self, conn):
+        conn.close()
+        with self._lock:
+            self._open -= 1
+
+    @contextmanager
+    def _connection(self):
+        """Connexion prêtée par le pool le temps d'un appel"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._new_connection()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            if self._closed:
+                self._close_connection(conn)
+            else:
+                try:
+                    self._idle.put_nowait(conn)
+                except queue.Full:
+                    self._close_connection(conn)
+
+    def _query(self, sql, params=()):
+        with self._connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def save(self, cv_id, cv_data, payload=None, digest=None, owner=None):
+        """Enregistre une nouvelle version ; retourne son numéro, ou None si rien n'a changé
+
+        Un nouveau CV appartient à owner ; un CV existant d'un autre propriétaire
+        lève PermissionError.
+        """
+        if payload is None:
+            payload, digest = serialize(cv_data)
+        with self._connection() as conn:
+            version = self._save(conn, cv_id, cv_data, payload, digest, owner)
+        if version is not None:
+            self._notify(cv_id, as_cv_data(cv_data))
+        return version
+
+    def _save(self, conn, cv_id, cv_data, payload, digest, owner):
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT owner, version, content_hash FROM cvs WHERE id = ?', (cv_id,)).fetchone()
+            if row is not None and row['owner'] != owner:
+                raise PermissionError(f"Le CV {cv_id} appartient à un autre propriétaire")
+            if row is not None and row['content_hash'] == digest:
+                conn.execute('COMMIT')
+                return None
+            version = row['version'] + 1 if row is not None else 1
+            name = _cv_name(as_cv_data(cv_data))
+            if row is None:
+                conn.execute(
+                    'INSERT INTO cvs (id, owner, name, created_at, updated_at, version, content_hash)'
+                    ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (cv_id, owner, name, now, now, version, digest),
+                )
+            else:
+                conn.execute(
+                    'UPDATE cvs SET name = ?, updated_at = ?, version = ?, content_hash = ? WHERE id = ?',
+                    (name, now, version, digest, cv_id),
+                )
+            conn.execute(
+                'INSERT INTO versions (cv_id, version, saved_at, content_hash, data) VALUES (?, ?, ?, ?, ?)',
+                (cv_id, version, now, digest, payload),
+            )
+            if self.max_versions:
+                conn.execute(
+                    'DELETE FROM versions WHERE cv_id = ? AND version <= ?',
+                    (cv_id, version - self.max_versions),
+                )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return version
+
+    @staticmethod
+    def _owned(owner, column='owner'):
+        """Condition SQL (et paramètres) qui limite une lecture aux CV de owner"""
+        if owner is None:
+            return '', ()
+        return f' AND {column} = ?', (owner,)
+
+    def load(self, cv_id, version=None, owner=None):
+        """Charge un CV (dernière version par défaut) ; KeyError s'il n'existe pas ou n'est pas à owner"""
+        where, params = self._owned(owner, 'c.owner')
+        sql = 'SELECT v.data FROM versions v JOIN cvs c ON c.id = v.cv_id WHERE v.cv_id = ?' + where
+        if version is None:
+            rows = self._query(sql + ' ORDER BY v.version DESC LIMIT 1', (cv_id, *params))
+        else:
+            rows = self._query(sql + ' AND v.version = ?', (cv_id, *params, version))
+        if not rows:
+            raise KeyError(cv_id if version is None else (cv_id, version))
+        return CV.from_json(rows[0]['data'])
+
+    def exists(self, cv_id, owner=None):
+        where, params = self._owned(owner)
+        return bool(self._query('SELECT 1 FROM cvs WHERE id = ?' + where, (cv_id, *params)))
+
+    def iter_cvs(self):
+        """(id, cv_data) de la dernière version de chaque CV, lus au fil de l'eau"""
+        with self._connection() as conn:
+            rows = conn.execute(
+                'SELECT v.cv_id, v.data FROM cvs c JOIN versions v ON v.cv_id = c.id AND v.version = c.version'
+            )
+            for row in rows:
+                yield row['cv_id'], json.loads(row['data'])['cv']
+
+    def cv_ids(self, owner):
+        """Identifiants des CV de owner"""
+        return {row['id'] for row in self._query('SELECT id FROM cvs WHERE owner = ?', (owner,))}
+
+    def list_cvs(self, owner=None, limit=50):
+        """CV enregistrés (ceux de owner s'il est donné), du plus récemment modifié au plus ancien"""
+        where, params = self._owned(owner)
+        rows = self._query(
+            'SELECT id, name, created_at, updated_at, version FROM cvs WHERE 1' + where
+            + ' ORDER BY updated_at DESC LIMIT ?',
+            (*params, limit),
+        )
+        return [dict(row) for row in rows]
+
+    def history(self, cv_id, owner=None):
+        """Versions conservées d'un CV, de la plus récente à la plus ancienne ; vide s'il n'est pas à owner"""
+        where, params = self._owned(owner, 'c.owner')
+        rows = self._query(
+            'SELECT v.version, v.saved_at, v.content_hash FROM versions v JOIN cvs c ON c.id = v.cv_id'
+            ' WHERE v.cv_id = ?' + where + ' ORDER BY v.version DESC',
+            (cv_id, *params),
+        )
+        return [dict(row) for row in rows]
+
+    def delete(self, cv_id, owner=None):
+        where, params = self._owned(owner)
+        with self._connection() as conn:
+            deleted = conn.execute('DELETE FROM cvs WHERE id = ?' + where, (cv_id, *params)).rowcount
+        if deleted:
+            self._notify(cv_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {'connections': self._open, 'idle': self._idle.qsize()}
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close_connection(conn)
+
+
+class AutoSaver:
+    """Sauvegarde différée et regroupée des CV, écrite par un thread dédié
+
+    schedule() est appelée à chaque exécution de l'interface. Elle ne fait
+    que sérialiser le CV et comparer son empreinte à la dernière connue : un
+    CV inchangé ne coûte aucune écriture. Un CV modifié est écrit quand il
+    n'a plus changé depuis delay secondes, ou au plus tard après max_delay
+    secondes d'éditions continues ; les versions intermédiaires sont fusionnées.
+
+    Les empreintes connues sont bornées à max_known CV et oubliées à la
+    suppression d'un CV : un CV oublié coûte au plus une lecture de la base à
+    sa prochaine modification, CVStore.save ignorant un contenu inchangé.
+    """
+
+    def __init__(self, store, delay=2.0, max_delay=10.0, max_known=MAX_KNOWN_DIGESTS):
+        self.store = store
+        self.delay = delay
+        self.max_delay = max_delay
+        self.max_known = max_known
+        self._pending = {}
+        self._known = OrderedDict()
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._closed = False
+        self.writes = 0
+        self.unchanged = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.last_error = None
+        store.add_listener(self._on_store_change)
+        self._thread = threading.Thread(target=self._run, name='cvapp-autosave', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _remember(self, cv_id, digest):
+        self._known[cv_id] = digest
+        self._known.move_to_end(cv_id)
+        while len(self._known) > self.max_known:
+            self._known.popitem(last=False)
+
+    def _on_store_change(self, cv_id, cv_data):
+        """Écouteur de CVStore : un CV supprimé n'est plus suivi, ni réécrit"""
+        if cv_data is None:
+            with self._condition:
+                self._known.pop(cv_id, None)
+                self._pending.pop(cv_id, None)
+
+    def remember(self, cv_id, cv_data):
+        """Déclare le contenu déjà enregistré d'un CV (après un chargement, par exemple)"""
+        _, digest = serialize(cv_data)
+        with self._condition:
+            self._remember(cv_id, digest)
+
+    def schedule(self, cv_id, cv_data, owner=None, serialized=None):
+        """Programme l'enregistrement de cv_data au nom de owner ; retourne False si rien n'a changé
+
+        serialized : (JSON, empreinte) de cv_data s'ils sont déjà calculés (voir serialize).
+        """
+        payload, digest = serialized or serialize(cv_data)
+        now = time.monotonic()
+        with self._condition:
+            if self._closed:
+                return False
+            if self._known.get(cv_id) == digest:
+                self._known.move_to_end(cv_id)
+                self.unchanged += 1
+                return False
+            self._remember(cv_id, digest)
+            pending = self._pending.get(cv_id)
+            if pending is not None:
+                self.coalesced += 1
+                first = pending[4]
+            else:
+                first = now
+            # Copie figée : le dictionnaire de la session continue d'être modifié
+            self._pending[cv_id] = (json.loads(payload)['cv'], payload, digest, owner, first, now)
+            self._condition.notify()
+        return True
+
+    def pending(self, cv_id=None):
+        """Nombre d'enregistrements en attente (ou si cv_id en a un)"""
+        with self._condition:
+            if cv_id is not None:
+                return cv_id in self._pending
+            return len(self._pending)
+
+    def _due(self, now):
+        due = []
+        next_deadline = None
+        for cv_id, (_, _, _, _, first, last) in self._pending.items():
+            deadline = min(last + self.delay, first + self.max_delay)
+            if deadline <= now:
+                due.append(cv_id)
+            elif next_deadline is None or deadline < next_deadline:
+                next_deadline = deadline
+        return due, next_deadline
+
+    def _write(self, cv_id, item):
+        cv_data, payload, digest, owner, _, _ = item
+        try:
+            self.store.save(cv_id, cv_data, payload, digest, owner)
+        except Exception as e:
+            with self._condition:
+                self.errors += 1
+                self.last_error = e
+                # Oublie l'empreinte pour que la prochaine exécution retente l'écriture
+                if self._known.get(cv_id) == digest:
+                    del self._known[cv_id]
+            return
+        with self._condition:
+            self.writes += 1
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        return
+                    due, next_deadline = self._due(time.monotonic())
+                    if due:
+                        break
+                    timeout = None if next_deadline is None else max(0.0, next_deadline - time.monotonic())
+                    self._condition.wait(timeout)
+            # Retirer et écrire sous le même verrou garde l'ordre des versions face à flush()
+            with self._write_lock:
+                with self._condition:
+                    items = [(cv_id, self._pending.pop(cv_id)) for cv_id in due if cv_id in self._pending]
+                for cv_id, item in items:
+                    self._write(cv_id, item)
+
+    def flush(self):
+        """Écrit immédiatement tout ce qui est en attente"""
+        with self._write_lock:
+            with self._condition:
+                items = list(self._pending.items())
+                self._pending.clear()
+            for cv_id, item in items:
+                self._write(cv_id, item)
+
+    def stats(self):
+        with self._condition:
+            return {
+                'pending': len(self._pending),
+                'writes': self.writes,
+                'unchanged': self.unchanged,
+                'coalesced': self.coalesced,
+                'errors': self.errors,
+                'known': len(self._known),
+            }
+
+    def close(self):
+        """Arrête le thread d'écriture après avoir vidé la file"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout=5.0)
+        self.flush()
+        self.store.remove_listener(self._on_store_change)
@@ -0,0 +1,43 @@
+"""Conversion des sections sous forme de liste vers et depuis des DataFrame"""
+
+import pandas as pd
+
+from .schema import LIST_DEFAULTS, LIST_SECTIONS
+
+# Colonne utilisée pour réordonner les lignes dans l'éditeur en tableau
+POSITION_COLUMN = 'position'
+
+
+def records_to_frame(section, records):
+    """Construit le DataFrame éditable d'une section"""
+    columns = LIST_SECTIONS[section]
+    frame = pd.DataFrame(
+        [[record.get(field, '') for field in columns] for record in records],
+        columns=columns,
+        dtype=object,
+    )
+    frame.insert(0, POSITION_COLUMN, range(1, len(frame) + 1))
+    return frame
+
+
+def frame_to_records(section, frame):
+    """Reconstruit la liste d'entrées d'une section à partir du tableau édité
+
+    Les lignes sont triées selon la colonne de position (les nouvelles lignes
+    sans position vont à la fin) et les lignes entièrement vides sont ignorées.
+    """
+    columns = LIST_SECTIONS[section]
+    defaults = LIST_DEFAULTS[section]
+    if POSITION_COLUMN in frame.columns:
+        frame = frame.sort_values(POSITION_COLUMN, na_position='last', kind='stable')
+
+    records = []
+    for row in frame[columns].itertuples(index=False, name=None):
+        record = {}
+        for field, value in zip(columns, row):
+            if value is None or (isinstance(value, float) and pd.isna(value)):
+                value = defaults.get(field, '')
+            record[field] = str(value)
+        if any(record[field] and record[field] != defaults.get(field) for field in columns):
+            records.append(record)
+    return records
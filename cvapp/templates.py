@@ -0,0 +1,268 @@
+"""Registre des modèles de CV : styles, couleurs, mise en page et sections
+
+Chaque modèle est construit une seule fois par processus ; les rendus
+suivants ne font qu'une recherche dans le registre.
+"""
+
+import threading
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+
+from .document import SECTION_ORDER
+
+# Ordre par défaut des sections du CV
+DEFAULT_SECTIONS = SECTION_ORDER
+
+
+class Template:
+    """Ensemble précompilé des réglages d'un modèle de CV"""
+
+    def __init__(self, name, styles, palette, page, sections=DEFAULT_SECTIONS,
+                 heading_rule=False, list_separator=" • "):
+        self.name = name
+        self.styles = styles
+        self.palette = palette
+        self.page = page
+        self.sections = tuple(sections)
+        self.heading_rule = heading_rule
+        self.list_separator = list_separator
+
+    def __repr__(self):
+        return f"Template({self.name!r})"
+
+    def with_fonts(self, family):
+        """Copie du modèle dont les styles utilisent les faces de family au lieu d'Helvetica"""
+        clones = {}
+        styles = {}
+        for key, style in self.styles.items():
+            # Deux clés peuvent partager un style (classic) : elles partagent aussi sa copie
+            if id(style) not in clones:
+                clones[id(style)] = ParagraphStyle(
+                    f"{style.name}-{family.name}",
+                    parent=style,
+                    fontName=family.face(style.fontName),
+                    bulletFontName=family.face(style.bulletFontName),
+                )
+            styles[key] = clones[id(style)]
+        return Template(self.name, styles, self.palette, self.page, self.sections,
+                        self.heading_rule, self.list_separator)
+
+
+def _build_classic(base):
+    palette = {
+        'title': colors.HexColor('#2C3E50'),
+        'heading': colors.HexColor('#34495E'),
+        'border': colors.HexColor('#BDC3C7'),
+        'text': colors.black,
+    }
+    styles = {
+        'title': ParagraphStyle(
+            'ClassicTitle',
+            parent=base['Heading1'],
+            fontSize=20,
+            spaceAfter=12,
+            textColor=palette['title'],
+            alignment=TA_CENTER
+        ),
+        'heading': ParagraphStyle(
+            'ClassicHeading',
+            parent=base['Heading2'],
+            fontSize=14,
+            spaceAfter=6,
+            spaceBefore=12,
+            textColor=palette['heading'],
+            borderWidth=1,
+            borderColor=palette['border'],
+            borderPadding=5
+        ),
+        'normal': ParagraphStyle(
+            'ClassicNormal',
+            parent=base['Normal'],
+            fontSize=10,
+            spaceAfter=6
+        ),
+    }
+    styles['contact'] = styles['normal']
+    styles['entry'] = styles['normal']
+    page = {
+        'pagesize': A4,
+        'topMargin': 1 * inch,
+        'bottomMargin': 1 * inch,
+        'leftMargin': 0.75 * inch,
+        'rightMargin': 0.75 * inch,
+    }
+    return Template('classic', styles, palette, page)
+
+
+def _build_modern(base):
+    palette = {
+        'title': colors.HexColor('#1F2D3D'),
+        'heading': colors.HexColor('#1F6FB2'),
+        'border': colors.HexColor('#1F6FB2'),
+        'muted': colors.HexColor('#6C7A89'),
+        'text': colors.HexColor('#222222'),
+    }
+    styles = {
+        'title': ParagraphStyle(
+            'ModernTitle',
+            parent=base['Heading1'],
+            fontName='Helvetica-Bold',
+            fontSize=24,
+            leading=28,
+            spaceAfter=4,
+            textColor=palette['title'],
+            alignment=TA_LEFT
+        ),
+        'heading': ParagraphStyle(
+            'ModernHeading',
+            parent=base['Heading2'],
+            fontName='Helvetica-Bold',
+            fontSize=12,
+            leading=15,
+            spaceBefore=14,
+            spaceAfter=2,
+            textColor=palette['heading'],
+        ),
+        'contact': ParagraphStyle(
+            'ModernContact',
+            parent=base['Normal'],
+            fontSize=9,
+            textColor=palette['muted'],
+            spaceAfter=6
+        ),
+        'entry': ParagraphStyle(
+            'ModernEntry',
+            parent=base['Normal'],
+            fontSize=10.5,
+            leading=13,
+            spaceBefore=4,
+            spaceAfter=2,
+            textColor=palette['text']
+        ),
+        'normal': ParagraphStyle(
+            'ModernNormal',
+            parent=base['Normal'],
+            fontSize=9.5,
+            leading=12.5,
+            spaceAfter=4,
+            textColor=palette['text']
+        ),
+    }
+    page = {
+        'pagesize': A4,
+        'topMargin': 0.6 * inch,
+        'bottomMargin': 0.6 * inch,
+        'leftMargin': 0.6 * inch,
+        'rightMargin': 0.6 * inch,
+    }
+    sections = ('summary', 'skills', 'languages', 'experience', 'education', 'interests')
+    return Template('modern', styles, palette, page, sections=sections,
+                    heading_rule=True, list_separator="  ·  ")
+
+
+def _build_creative(base):
+    palette = {
+        'title': colors.HexColor('#8E44AD'),
+        'heading': colors.white,
+        'heading_background': colors.HexColor('#8E44AD'),
+        'accent': colors.HexColor('#E67E22'),
+        'text': colors.HexColor('#2D2D2D'),
+    }
+    styles = {
+        'title': ParagraphStyle(
+            'CreativeTitle',
+            parent=base['Title'],
+            fontName='Helvetica-Bold',
+            fontSize=28,
+            leading=32,
+            spaceAfter=6,
+            textColor=palette['title'],
+            alignment=TA_CENTER
+        ),
+        'heading': ParagraphStyle(
+            'CreativeHeading',
+            parent=base['Heading2'],
+            fontName='Helvetica-Bold',
+            fontSize=13,
+            leading=16,
+            spaceBefore=14,
+            spaceAfter=6,
+            textColor=palette['heading'],
+            backColor=palette['heading_background'],
+            borderPadding=(3, 6, 3, 6)
+        ),
+        'contact': ParagraphStyle(
+            'CreativeContact',
+            parent=base['Normal'],
+            fontSize=9.5,
+            textColor=palette['accent'],
+            alignment=TA_CENTER,
+            spaceAfter=6
+        ),
+        'entry': ParagraphStyle(
+            'CreativeEntry',
+            parent=base['Normal'],
+            fontSize=10.5,
+            leading=13,
+            spaceBefore=4,
+            spaceAfter=2,
+            textColor=palette['accent']
+        ),
+        'normal': ParagraphStyle(
+            'CreativeNormal',
+            parent=base['Normal'],
+            fontSize=10,
+            leading=13,
+            spaceAfter=5,
+            textColor=palette['text']
+        ),
+    }
+    page = {
+        'pagesize': A4,
+        'topMargin': 0.75 * inch,
+        'bottomMargin': 0.75 * inch,
+        'leftMargin': 0.9 * inch,
+        'rightMargin': 0.9 * inch,
+    }
+    sections = ('summary', 'skills', 'experience', 'education', 'languages', 'interests')
+    return Template('creative', styles, palette, page, sections=sections,
+                    list_separator="  |  ")
+
+
+_BUILDERS = {
+    'classic': _build_classic,
+    'modern': _build_modern,
+    'creative': _build_creative,
+}
+
+TEMPLATES = list(_BUILDERS)
+
+_registry = {}
+_registry_lock = threading.Lock()
+_base_styles = None
+
+
+def get_template(name, fonts=None):
+    """Retourne le modèle précompilé, construit au premier appel seulement
+
+    fonts : FontFamily enregistrée (voir cvapp.fonts), ou None pour les polices de base.
+    """
+    global _base_styles
+    key = (name, fonts.name if fonts is not None else None)
+    template = _registry.get(key)
+    if template is not None:
+        return template
+    if name not in _BUILDERS:
+        raise ValueError(f"Modèle inconnu : {name!r} (attendu : {', '.join(TEMPLATES)})")
+    with _registry_lock:
+        if (name, None) not in _registry:
+            if _base_styles is None:
+                _base_styles = getSampleStyleSheet()
+            _registry[name, None] = _BUILDERS[name](_base_styles)
+        if key not in _registry:
+            _registry[key] = _registry[name, None].with_fonts(fonts)
+        return _registry[key]
@@ -0,0 +1,98 @@
+"""Normalisation et découpage des textes en mots-clés, communs à l'analyse ATS et à la recherche
+
+Les textes sont mis en minuscules, débarrassés de leurs accents, découpés en
+mots-clés (c++, c#, node.js, ci-cd restent d'un seul tenant) puis filtrés :
+mots vides de la langue (fr, en, nl) et nombres seuls sont exclus.
+"""
+
+import re
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+
+# Mots vides par langue, sous leur forme normalisée (sans accents)
+_STOPWORDS = {
+    'fr': """
+        a afin ai ainsi alors au aussi aux avec avez avoir avons c ce ceci cela celle celles celui
+        ces cet cette ceux chez comme d dans de des donc dont du elle elles en entre est et etaient
+        etait ete etre eu eux fait faire il ils j je l la le les leur leurs lui m ma mais me meme
+        mes moi mon n ne nos notre nous on ont ou par pas peu plus pour qu que quel quelle qui s sa
+        sans se ses si son sont sous sur t ta te tes toi ton tous tout toute toutes tres tu un une
+        vers vos votre vous y
+    """,
+    'en': """
+        a about after all also an and any are as at be been being both but by can could did do does
+        each for from had has have he her his how i if in into is it its just may might more most
+        my no not of on only or other our out over own same she should so some such than that the
+        their them then there these they this those to under up very was we were what when where
+        which who whom why will with would you your
+    """,
+    'nl': """
+        aan al als bij dan dat de der des deze die dit door een en er geen had heb heeft hem het hij
+        hoe hun ik in is je kan kon maar me meer men met mij mijn na naar niet nog nu of om ons ook
+        op over te tot u uit van veel voor was wat we wel werd wie wij word worden wordt zal ze zich
+        zij zijn zo zonder
+    """,
+}
+STOPWORDS = {language: frozenset(words.split()) for language, words in _STOPWORDS.items()}
+
+# Garde c++, c#, node.js, ci-cd… d'un seul tenant
+TOKEN = re.compile(r"[^\W_][\w+#]*(?:[.\-/][\w+#]+)*")
+
+
+def _strip_accents(text):
+    if text.isascii():
+        return text
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+@lru_cache(maxsize=65536)
+def fold(word):
+    """Mot sans accents ; en cache, car un corpus répète sans cesse les mêmes mots"""
+    return _strip_accents(word)
+
+
+def normalize(text):
+    """Minuscules et sans accents"""
+    return _strip_accents(text.lower())
+
+
+def base_language(language):
+    """Langue sans variante régionale : nl-BE -> nl"""
+    return language.replace('_', '-').split('-')[0]
+
+
+@lru_cache(maxsize=131072)
+def _keyword(word, language):
+    """Mot-clé d'un mot en minuscules, ou None pour un mot vide ou un nombre seul"""
+    token = fold(word)
+    if len(token) < 2 or token.isdigit() or token in STOPWORDS.get(language, ()):
+        return None
+    return token
+
+
+def tokenize(text, language='fr'):
+    """Mots-clés d'un texte, mots vides et nombres seuls exclus"""
+    language = base_language(language)
+    keywords = (_keyword(word, language) for word in TOKEN.findall((text or '').lower()))
+    return [token for token in keywords if token is not None]
+
+
+def term_counts(text, language='fr'):
+    """Occurrences de chaque mot-clé ; chaque mot distinct n'est normalisé qu'une fois"""
+    language = base_language(language)
+    counts = Counter()
+    for word, count in Counter(TOKEN.findall((text or '').lower())).items():
+        token = _keyword(word, language)
+        if token is not None:
+            counts[token] += count
+    return counts
+
+
+def surface_forms(text):
+    """Première forme écrite de chaque mot-clé d'un texte, pour l'affichage"""
+    forms = {}
+    for word in TOKEN.findall(text or ''):
+        forms.setdefault(fold(word.lower()), word)
+    return forms
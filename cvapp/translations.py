@@ -0,0 +1,107 @@
+"""Catalogues de traduction par langue, chargés à la demande
+
+Chaque langue a son fichier locales/<code>.json. Un catalogue n'est lu qu'à
+sa première utilisation, puis « compilé » : la chaîne de repli (par exemple
+nl-BE -> nl -> fr) est fusionnée une fois pour toutes dans un seul
+dictionnaire, si bien qu'une traduction coûte une seule recherche.
+Ajouter une langue revient à ajouter un fichier, sans rien charger de plus
+au démarrage, et son nom à locales/_names.json : le sélecteur de langue
+affiche les noms sans lire aucun catalogue.
+"""
+
+import json
+import threading
+from pathlib import Path
+
+LOCALES_DIR = Path(__file__).resolve().parent / 'locales'
+
+# Nom de chaque langue dans sa propre langue
+NAMES_FILE = LOCALES_DIR / '_names.json'
+
+# Langue source de l'application, dernier maillon de toute chaîne de repli
+DEFAULT_LOCALE = 'fr'
+
+# Niveau stocké dans cv_data -> clé de traduction de son libellé
+LEVEL_KEYS = {
+    'Débutant': 'level_beginner',
+    'Intermédiaire': 'level_intermediate',
+    'Avancé': 'level_advanced',
+    'Expert': 'level_expert',
+    'Natif': 'level_native',
+}
+
+_compiled = {}
+_names = None
+_lock = threading.Lock()
+
+
+def available_locales():
+    """Codes des langues disponibles, sans charger leurs catalogues"""
+    return sorted(path.stem for path in LOCALES_DIR.glob('*.json') if not path.stem.startswith('_'))
+
+
+def fallback_chain(locale):
+    """Langues consultées pour locale, de la plus précise à la langue source"""
+    chain = []
+    parts = locale.replace('_', '-').split('-')
+    for i in range(len(parts), 0, -1):
+        candidate = '-'.join(parts[:i])
+        if candidate not in chain:
+            chain.append(candidate)
+    if DEFAULT_LOCALE not in chain:
+        chain.append(DEFAULT_LOCALE)
+    return chain
+
+
+def _load_file(locale):
+    path = LOCALES_DIR / f"{locale}.json"
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def catalog(locale):
+    """Table de traduction compilée de locale, chaîne de repli comprise"""
+    table = _compiled.get(locale)
+    if table is not None:
+        return table
+    with _lock:
+        table = _compiled.get(locale)
+        if table is None:
+            table = {}
+            for candidate in reversed(fallback_chain(locale)):
+                table.update(_load_file(candidate))
+            _compiled[locale] = table
+    return table
+
+
+def translate(key, language, **values):
+    """Récupère le texte traduit pour une langue donnée"""
+    text = catalog(language).get(key, key)
+    if values:
+        return text.format(**values)
+    return text
+
+
+def translate_level(level, language):
+    """Libellé traduit d'un niveau de compétence ou de langue (A1…C2 restent tels quels)"""
+    key = LEVEL_KEYS.get(level)
+    if key is None:
+        return level
+    return catalog(language).get(key, level)
+
+
+def locale_names():
+    """Nom de chaque langue disponible, dans sa propre langue, langue source en tête
+
+    Lu une fois dans NAMES_FILE ; une langue qui n'y figure pas garde son code.
+    """
+    global _names
+    if _names is None:
+        with open(NAMES_FILE, encoding='utf-8') as f:
+            names = json.load(f)
+        locales = sorted(available_locales(), key=lambda locale: locale != DEFAULT_LOCALE)
+        _names = {locale: names.get(locale, locale) for locale in locales}
+    return _names
@@ -0,0 +1,41 @@
+import time
+
+import pytest
+
+from cvapp.schema import empty_cv_data
+
+
+def make_cv(name):
+    cv_data = empty_cv_data()
+    cv_data['personal_info'].update(name=name, email='test@example.com')
+    cv_data['professional_summary'] = "Développeur **Python**."
+    cv_data['skills'] = [{'name': 'Python', 'level': 'Expert'}]
+    return cv_data
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "délai dépassé"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def cv_named():
+    """Fabrique de CV minimaux et valides, distingués par leur nom"""
+    return make_cv
+
+
+@pytest.fixture
+def wait_for():
+    """Attend qu'une condition soit vraie, sans dépasser timeout secondes"""
+    return wait_until
+
+
+@pytest.fixture
+def wait():
+    """Attend la fin d'un RenderJob et le retourne"""
+    def wait_job(job, timeout=30.0):
+        wait_until(lambda: job.finished, timeout)
+        return job
+    return wait_job
@@ -0,0 +1,97 @@
+from pathlib import Path
+
+import json
+
+import pytest
+import streamlit as st
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.testing.v1 import AppTest
+
+from cvapp import fonts
+from cvapp.translations import translate
+
+APP = str(Path(__file__).resolve().parent.parent / 'CV.APP.py')
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv('CVAPP_STORE_PATH', str(tmp_path / 'cvs.sqlite3'))
+    # Base, sauvegarde automatique et file de rendu sont partagées par toutes les sessions du processus
+    st.cache_resource.clear()
+    yield AppTest.from_file(APP, default_timeout=60).run()
+    st.cache_resource.clear()
+
+
+@pytest.fixture
+def downloads(monkeypatch):
+    """Contenu des boutons de téléchargement, par nom de fichier, à la dernière exécution"""
+    files = {}
+    load = MemoryMediaFileStorage.load_and_get_id
+
+    def record(self, path_or_data, mimetype, kind, filename=None):
+        files[filename] = path_or_data
+        return load(self, path_or_data, mimetype, kind, filename)
+
+    monkeypatch.setattr(MemoryMediaFileStorage, 'load_and_get_id', record)
+    return files
+
+
+def fill(app):
+    app.text_input(key='pi_name').input('Jean Dupont').run()
+    app.text_input(key='pi_email').input('jean@example.com').run()
+    app.text_area(key='summary_text').input("Développeur **Python**.").run()
+    app.text_area(key='interests_text').input("Vélo").run()
+
+
+def inputs(app):
+    return (
+        app.text_input(key='pi_name').value,
+        app.text_input(key='pi_email').value,
+        app.text_area(key='summary_text').value,
+        app.text_area(key='interests_text').value,
+    )
+
+
+EDITED = ('Jean Dupont', 'jean@example.com', "Développeur **Python**.", "Vélo")
+
+
+def test_edits_survive_a_template_switch(app):
+    fill(app)
+    app.sidebar.selectbox[1].select('Moderne').run()
+    assert not app.exception
+    assert app.session_state.selected_template == 'modern'
+    assert inputs(app) == EDITED
+    assert app.session_state.cv_data['personal_info']['name'] == 'Jean Dupont'
+
+
+def test_edits_survive_an_edit_mode_switch(app):
+    fill(app)
+    app.sidebar.radio[0].set_value(app.sidebar.radio[0].options[1]).run()
+    assert not app.exception
+    assert app.session_state.edit_mode == 'table'
+    assert inputs(app) == EDITED
+    assert app.session_state.cv_data['interests'] == "Vélo"
+
+
+def test_edits_survive_a_language_switch(app):
+    fill(app)
+    app.sidebar.selectbox[0].select('English').run()
+    assert not app.exception
+    assert app.session_state.selected_language == 'en'
+    assert inputs(app) == EDITED
+
+
+def test_json_export_includes_the_latest_edit(app, downloads):
+    app.text_input(key='pi_name').input('Jean').run()
+    assert json.loads(downloads['cv.json'])['cv']['personal_info']['name'] == 'Jean'
+    app.text_input(key='pi_name').input('Jean Dupont').run()
+    assert json.loads(downloads['cv.json'])['cv']['personal_info']['name'] == 'Jean Dupont'
+
+
+def test_missing_font_is_reported_in_the_preview(app, monkeypatch):
+    monkeypatch.delenv('CVAPP_PDF_FONT', raising=False)
+    monkeypatch.setattr(fonts, '_font_files', {})
+    app.text_input(key='pi_name').input('Jean').run()
+    assert not app.warning
+    app.text_input(key='pi_name').input('Дмитрий').run()
+    assert [warning.value for warning in app.warning] == ["🔤 " + translate('font_missing', 'fr')]
@@ -0,0 +1,97 @@
+import os
+
+import pytest
+
+from cvapp import artifacts as artifacts_module
+from cvapp.artifacts import ArtifactStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ArtifactStore(max_memory_bytes=1000, spill_threshold=400, max_disk_bytes=2000, ttl=600,
+                          spill_dir=tmp_path)
+    yield store
+    store.clear()
+
+
+def spilled_files(store):
+    return sorted(name for name in os.listdir(store._spill_dir) if name.endswith('.bin'))
+
+
+def test_large_artifact_goes_straight_to_disk(store):
+    data = bytes(range(256)) * 2
+    artifact = store.put('gros', data)
+    assert artifact.spilled
+    assert store.stats()['memory_bytes'] == 0
+    assert store.stats()['disk_bytes'] == len(data)
+    assert store.get('gros').read() == data
+    assert b''.join(store.get('gros').iter_chunks(100)) == data
+    with store.get('gros').open() as f:
+        assert f.read() == data
+
+
+def test_memory_budget_spills_least_recently_used(store):
+    for i in range(3):
+        store.put(f"a{i}", b'x' * 300)
+    store.get('a0')
+    store.put('a3', b'x' * 300)
+
+    stats = store.stats()
+    assert stats['memory_bytes'] <= 1000
+    assert stats['artifacts'] == 4
+    assert stats['spilled'] == 1
+    assert stats['evictions'] == 0
+    # a0 vient d'être lu : c'est a1, le moins récemment utilisé, qui part sur disque
+    assert not store.get('a0').spilled
+    assert store.get('a1').spilled
+    assert store.get('a1').read() == b'x' * 300
+
+
+def test_disk_budget_evicts_oldest_files(store):
+    for i in range(8):
+        store.put(f"d{i}", b'y' * 500)
+    stats = store.stats()
+    assert stats['disk_bytes'] <= 2000
+    assert stats['evictions'] == 4
+    assert store.get('d0') is None
+    assert store.get('d7').read() == b'y' * 500
+    assert spilled_files(store) == [f"d{i}.bin" for i in range(4, 8)]
+
+
+def test_replacing_an_artifact_frees_the_old_one(store):
+    store.put('cv', b'z' * 500)
+    store.put('cv', b'z' * 100)
+    stats = store.stats()
+    assert (stats['artifacts'], stats['memory_bytes'], stats['disk_bytes']) == (1, 100, 0)
+    assert spilled_files(store) == []
+
+
+def test_unused_artifacts_expire(store, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(artifacts_module.time, 'monotonic', lambda: now[0])
+    store.put('ancien', b'a' * 100)
+    store.put('gros', b'b' * 500)
+    now[0] += 300
+    store.put('recent', b'c' * 100)
+    now[0] += 301
+    assert store.get('ancien') is None
+    assert store.get('recent') is not None
+    stats = store.stats()
+    assert stats['expirations'] == 2
+    assert (stats['memory_bytes'], stats['disk_bytes']) == (100, 0)
+    assert spilled_files(store) == []
+
+
+def test_artifacts_are_dropped_when_they_cannot_be_spilled(store, monkeypatch):
+    def full_disk(*args, **kwargs):
+        raise OSError("No space left on device")
+
+    store._spill_path(artifacts_module.Artifact('essai', b'', 'application/pdf'))
+    monkeypatch.setattr(artifacts_module.tempfile, 'mkstemp', full_disk)
+    for i in range(5):
+        store.put(f"m{i}", b'x' * 300)
+    stats = store.stats()
+    assert stats['memory_bytes'] <= 1000
+    assert stats['spilled'] == 0
+    assert stats['evictions'] == 2
+    assert store.get('m4') is not None
@@ -0,0 +1,121 @@
+import json
+import math
+import random
+
+import numpy as np
+import pytest
+
+from cvapp.__main__ import main
+from cvapp.ats import cv_text, rank, relevance_order, score, score_matrix
+from cvapp.text import term_counts
+
+WORDS = ("python django flask api rest sql postgresql docker kubernetes aws java spring react "
+         "typescript linux git ci-cd c++ c# node.js tests agile scrum données analyse").split()
+
+# Mots sans rapport avec les offres des tests, qui font baisser la similarité
+FILLER = "java spring react typescript linux git agile scrum analyse " * 3
+
+
+def cv_with(summary, skills=()):
+    return {'professional_summary': summary, 'skills': [{'name': name, 'level': 'Expert'} for name in skills]}
+
+
+def reference_scores(cvs, jobs, language='fr'):
+    """Scores paire par paire, en Python pur, selon les définitions du module"""
+    counters = [term_counts(job, language) for job in jobs] + [term_counts(cv_text(cv), language) for cv in cvs]
+    df = {}
+    for counter in counters:
+        for term in counter:
+            df[term] = df.get(term, 0) + 1
+    size = len(counters)
+
+    def vector(counter):
+        return {term: (1 + math.log(count)) * (math.log((1 + size) / (1 + df[term])) + 1) for term, count in counter.items()}
+
+    vectors = [vector(counter) for counter in counters]
+    job_vectors, cv_vectors = vectors[:len(jobs)], vectors[len(jobs):]
+    similarity = np.zeros((len(cvs), len(jobs)))
+    coverage = np.zeros((len(cvs), len(jobs)))
+    for i, cv in enumerate(cv_vectors):
+        for j, job in enumerate(job_vectors):
+            dot = sum(weight * cv.get(term, 0.0) for term, weight in job.items())
+            norms = math.sqrt(sum(w * w for w in cv.values())) * math.sqrt(sum(w * w for w in job.values()))
+            similarity[i, j] = dot / norms if norms else 0.0
+            coverage[i, j] = sum(1 for term in job if term in cv) / len(job) if job else 0.0
+    return similarity, coverage
+
+
+@pytest.fixture
+def corpus():
+    rng = random.Random(7)
+    cvs = [cv_with(' '.join(rng.choices(WORDS, k=rng.randint(0, 30))), rng.sample(WORDS, 3)) for _ in range(40)]
+    cvs.append(cv_with(''))
+    jobs = [' '.join(rng.choices(WORDS, k=rng.randint(5, 20))) for _ in range(5)] + ["le la les et"]
+    return cvs, jobs
+
+
+def test_matrix_matches_pairwise_scores(corpus):
+    cvs, jobs = corpus
+    scores = score_matrix(cvs, jobs)
+    similarity, coverage = reference_scores(cvs, jobs)
+    np.testing.assert_allclose(scores['similarity'], similarity, atol=1e-12)
+    np.testing.assert_allclose(scores['coverage'], coverage, atol=1e-12)
+    # Une offre sans mot-clé et un CV vide ne correspondent à rien
+    assert not scores['coverage'][:, -1].any()
+    assert not scores['similarity'][-1].any()
+
+
+def test_chunking_does_not_change_scores(corpus):
+    cvs, jobs = corpus
+    scores = score_matrix(cvs, jobs)
+    for chunk_rows in (1, 7, 1000):
+        chunked = score_matrix(cvs, jobs, chunk_rows=chunk_rows)
+        np.testing.assert_allclose(chunked['similarity'], scores['similarity'])
+        np.testing.assert_array_equal(chunked['coverage'], scores['coverage'])
+
+
+def test_empty_inputs():
+    assert score_matrix([], ["python"])['similarity'].shape == (0, 1)
+    assert score_matrix([cv_with("python")], [])['coverage'].shape == (1, 0)
+
+
+def test_score_lists_matched_and_missing_keywords():
+    cv = {'professional_summary': "Développeur Python et Django", 'experiences': [{'job_title': 'Dév API'}],
+          'skills': [{'name': 'Docker', 'level': 'Avancé'}]}
+    analysis = score(cv, "Python, Python, Kubernetes, Docker et Données", 'fr')
+    assert analysis['matched'] == ['Python', 'Docker']
+    assert analysis['missing'] == ['Kubernetes', 'Données']
+    assert analysis['coverage'] == pytest.approx(0.5)
+    assert 0 < analysis['similarity'] < 1
+
+
+def test_ranking_puts_coverage_first():
+    coverage = np.array([0.5, 1.0, 0.5, 0.0])
+    similarity = np.array([0.9, 0.1, 0.95, 1.0])
+    assert list(relevance_order(coverage, similarity)) == [1, 2, 0, 3]
+
+    job = "python django docker kubernetes"
+    cvs = [
+        cv_with("python django docker"),                          # proche de l'offre, sans kubernetes
+        cv_with("python django docker kubernetes " + FILLER),     # tous les mots-clés, noyés dans le reste
+        cv_with("python"),
+    ]
+    ranked = rank(cvs, job)
+    assert ranked[0][2] < ranked[1][2]
+    assert [i for i, _, _ in ranked] == [1, 0, 2]
+    assert [i for i, _, _ in rank(cvs, job, top=1)] == [1]
+
+
+def test_cli_ranks_by_coverage(tmp_path, capsys):
+    source = tmp_path / 'cvs.jsonl'
+    with open(source, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'id': 'proche', 'professional_summary': "python django"}) + '\n')
+        f.write(json.dumps({'id': 'complet', 'professional_summary': "python django docker " + FILLER}) + '\n')
+    job = tmp_path / 'offre.txt'
+    job.write_text("python django docker", encoding='utf-8')
+
+    assert main(['ats', '--cvs', str(source), '--jobs', str(job), '--json']) == 0
+    rows = json.loads(capsys.readouterr().out)[str(job)]
+    assert [row['id'] for row in rows] == ['complet', 'proche']
+    assert rows[0]['coverage'] == 1.0
+    assert rows[0]['similarity'] < rows[1]['similarity']
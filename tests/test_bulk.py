@@ -0,0 +1,152 @@
+import json
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from cvapp import bulk
+from cvapp.bulk import CsvRow, export_zip, iter_records, load_record, recover_archive
+
+
+def write_jsonl(path, names):
+    with open(path, 'w', encoding='utf-8') as f:
+        for name in names:
+            f.write(json.dumps({'id': name, 'cv': {'personal_info': {'name': name}}}) + '\n')
+    return path
+
+
+def test_records_are_decoded_once_in_the_main_process(tmp_path):
+    source = tmp_path / 'cvs.jsonl'
+    source.write_text('{"id": "alice", "personal_info": {"name": "Alice"}}\n\n{pas du json\n[1, 2]\n',
+                      encoding='utf-8')
+    records = list(iter_records(source))
+    assert [(index, record_id) for index, record_id, _ in records] == [(0, 'alice'), (1, '000003'), (2, '000004')]
+    assert records[0][2] == {'id': 'alice', 'personal_info': {'name': 'Alice'}}
+    assert load_record(records[0][2])['personal_info']['name'] == 'Alice'
+    # Une ligne illisible reste brute et n'échoue qu'au chargement
+    assert records[1][2] == '{pas du json\n'
+    with pytest.raises(ValueError):
+        load_record(records[1][2])
+
+    source = tmp_path / 'cvs.csv'
+    source.write_text('id,name,skills\nbob,Bob,"[{""name"": ""Python"", ""level"": ""Expert""}]"\n',
+                      encoding='utf-8')
+    (_, record_id, row), = iter_records(source)
+    assert record_id == 'bob' and isinstance(row, CsvRow)
+    assert load_record(row)['skills'] == [{'name': 'Python', 'level': 'Expert'}]
+
+
+def test_export_writes_one_pdf_per_cv_and_reports_failures(tmp_path):
+    source = write_jsonl(tmp_path / 'cvs.jsonl', ['alice', 'bob', 'alice'])
+    with open(source, 'a', encoding='utf-8') as f:
+        f.write('{"id": "carole", "skills": [{"name": "Python", "level": "Dieu"}]}\n')
+    output = tmp_path / 'cvs.zip'
+    summary = export_zip(source, output, workers=1)
+    assert (summary['written'], summary['failed']) == (3, 1)
+    assert summary['failures'][0]['entry'] == 'carole.pdf'
+    with zipfile.ZipFile(output) as archive:
+        assert archive.namelist() == ['alice.pdf', 'bob.pdf', 'alice-2.pdf']
+        assert archive.read('bob.pdf').startswith(b'%PDF-')
+
+
+def interrupted(path, entries):
+    """Tronque une archive au milieu de son entrée entries + 1, comme un arrêt brutal"""
+    data = path.read_bytes()
+    with zipfile.ZipFile(path) as archive:
+        cut = archive.infolist()[entries].header_offset + 40
+    path.write_bytes(data[:cut])
+
+
+@pytest.mark.parametrize('compression', [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED])
+def test_recover_archive_keeps_complete_entries(tmp_path, compression):
+    path = tmp_path / 'cvs.zip'
+    with zipfile.ZipFile(path, 'w', compression) as archive:
+        for i in range(4):
+            archive.writestr(f"cv{i}.pdf", f"contenu {i} ".encode() * 100)
+    interrupted(path, 3)
+    assert not zipfile.is_zipfile(path)
+
+    assert recover_archive(path) == 3
+    with zipfile.ZipFile(path) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == ['cv0.pdf', 'cv1.pdf', 'cv2.pdf']
+        assert archive.read('cv2.pdf') == b'contenu 2 ' * 100
+
+
+def test_resume_skips_cvs_already_in_the_archive(tmp_path):
+    names = [f"cv{i}" for i in range(5)]
+    source = write_jsonl(tmp_path / 'cvs.jsonl', names)
+    output = tmp_path / 'cvs.zip'
+    export_zip(source, output, workers=1)
+    interrupted(output, 2)
+
+    summary = export_zip(source, output, workers=1, resume=True)
+    assert (summary['skipped'], summary['written'], summary['failed']) == (2, 3, 0)
+    with zipfile.ZipFile(output) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == [f"{name}.pdf" for name in names]
+
+
+@pytest.fixture
+def slow_first_renders(monkeypatch):
+    """Rendus en threads, d'autant plus lents que le CV est tôt dans la source
+
+    Compte les rendus exécutés en même temps et les rendus soumis mais pas
+    encore écrits, que la fenêtre doit borner.
+    """
+    state = {'running': 0, 'max_running': 0, 'submitted': 0, 'written': 0, 'max_unwritten': 0}
+    lock = threading.Lock()
+
+    class Pool(ThreadPoolExecutor):
+        def submit(self, *args):
+            state['submitted'] += 1
+            state['max_unwritten'] = max(state['max_unwritten'], state['submitted'] - state['written'])
+            return super().submit(*args)
+
+    def render(index, name, raw, template, language):
+        with lock:
+            state['running'] += 1
+            state['max_running'] = max(state['max_running'], state['running'])
+        time.sleep(0.02 * (6 - index % 6))
+        with lock:
+            state['running'] -= 1
+        return index, name, b'%PDF-' + name.encode(), None
+
+    def progress(result):
+        state['written'] += 1
+        state.setdefault('order', []).append(result['index'])
+
+    monkeypatch.setattr(bulk, 'ProcessPoolExecutor', Pool)
+    monkeypatch.setattr(bulk, 'render_record', render)
+    state['progress'] = progress
+    return state
+
+
+def test_ordered_export_follows_the_source(tmp_path, slow_first_renders):
+    names = [f"cv{i:02d}" for i in range(12)]
+    source = write_jsonl(tmp_path / 'cvs.jsonl', names)
+    output = tmp_path / 'cvs.zip'
+    summary = export_zip(source, output, workers=3, window=4, ordered=True,
+                         progress=slow_first_renders['progress'])
+    assert summary['written'] == 12
+    assert slow_first_renders['max_running'] <= 3
+    # Les rendus terminés en avance attendent leur tour dans la fenêtre, sans la dépasser
+    assert slow_first_renders['max_unwritten'] <= 4
+    with zipfile.ZipFile(output) as archive:
+        assert archive.namelist() == [f"{name}.pdf" for name in names]
+
+
+def test_unordered_export_writes_as_renders_finish(tmp_path, slow_first_renders):
+    names = [f"cv{i:02d}" for i in range(12)]
+    source = write_jsonl(tmp_path / 'cvs.jsonl', names)
+    output = tmp_path / 'cvs.zip'
+    summary = export_zip(source, output, workers=3, window=3, ordered=False,
+                         progress=slow_first_renders['progress'])
+    assert summary['written'] == 12
+    assert slow_first_renders['max_unwritten'] <= 3
+    # Le premier CV, le plus lent de sa fenêtre, n'est pas écrit en premier
+    assert slow_first_renders['order'][0] != 0
+    with zipfile.ZipFile(output) as archive:
+        assert sorted(archive.namelist()) == [f"{name}.pdf" for name in names]
@@ -0,0 +1,41 @@
+from cvapp.cache import DISK_LOW_WATER, RenderCache
+
+
+def disk_usage(directory):
+    return sum(path.stat().st_size for path in directory.glob('*/*.pdf'))
+
+
+def key(i):
+    return f"{i:064x}"
+
+
+def test_disk_level_stays_under_budget(tmp_path):
+    cache = RenderCache(max_entries=4, disk_dir=tmp_path, disk_max_bytes=10_000)
+    for i in range(200):
+        cache.put(key(i), b'x' * 500)
+    assert disk_usage(tmp_path) <= 10_000
+    assert cache.stats()['disk_bytes'] == disk_usage(tmp_path)
+    # Les plus récents restent sur le disque, les plus anciens sont partis
+    cache.clear()
+    assert cache.get(key(199)) == b'x' * 500
+    assert cache.get(key(0)) is None
+
+
+def test_disk_is_walked_only_when_over_budget(tmp_path, monkeypatch):
+    cache = RenderCache(max_entries=4, disk_dir=tmp_path, disk_max_bytes=100_000)
+    walks = []
+    walk = cache._disk_files
+    monkeypatch.setattr(cache, '_disk_files', lambda: walks.append(1) or walk())
+    for i in range(1000):
+        cache.put(key(i), b'x' * 1000)
+    # Chaque éviction libère (1 - DISK_LOW_WATER) du budget, soit 10 ajouts ici
+    assert len(walks) <= 1000 * 1000 / (100_000 * (1 - DISK_LOW_WATER))
+    assert disk_usage(tmp_path) <= 100_000
+
+
+def test_disk_usage_is_counted_on_open_and_on_overwrite(tmp_path):
+    RenderCache(disk_dir=tmp_path).put(key(1), b'x' * 300)
+    cache = RenderCache(disk_dir=tmp_path)
+    assert cache.stats()['disk_bytes'] == 300
+    cache.put(key(1), b'y' * 100)
+    assert cache.stats()['disk_bytes'] == 100 == disk_usage(tmp_path)
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from cvapp.document import build_document
+from cvapp.exporters import export, header_markdown, section_markdown, to_markdown
+
+HOSTILE = {
+    'personal_info': {'name': "Jean <Dupont> & co", 'email': "jean_dupont@example.com",
+                      'github': "[moi](javascript:alert(1))"},
+    'professional_summary': "Résumé <i>libre</i>.",
+    'experiences': [{'job_title': "# R&D *lead*", 'company': "<ACME>", 'start_date': "2020", 'end_date': "$2021$"}],
+    'skills': [{'name': "C#", 'level': 'Expert'}, {'name': "**Go**", 'level': 'Avancé'}],
+}
+
+
+def rendered(markdown):
+    markdown_it = pytest.importorskip('markdown_it')
+    return markdown_it.MarkdownIt('commonmark', {'html': True}).render(markdown)
+
+
+@pytest.fixture
+def document():
+    return build_document(HOSTILE, 'fr')
+
+
+def test_header_fields_are_escaped(document):
+    markdown = header_markdown(document)
+    assert markdown.startswith(r"# Jean \<Dupont\> \& co")
+    html = rendered(markdown)
+    assert "<h1>Jean &lt;Dupont&gt; &amp; co</h1>" in html
+    assert "<dupont>" not in html.lower()
+    assert "href" not in html
+    assert "jean_dupont@example.com" in html
+
+
+def test_entry_headings_and_items_are_escaped(document):
+    experience = section_markdown(document.section('experience'))
+    html = rendered(experience)
+    assert "# R&amp;D *lead*" in html
+    assert "<em>" not in html and "&lt;ACME&gt;" in html
+    assert "$2021$" in html
+
+    skills = rendered(section_markdown(document.section('skills')))
+    assert "C#" in skills and "**Go**" in skills
+    assert "<strong>" not in skills
+
+
+def test_other_formats_keep_the_text_as_is(document):
+    assert "Jean <Dupont> & co" in export(document, 'text')
+    assert "Jean &lt;Dupont&gt; &amp; co" in export(document, 'html')
+    assert json.loads(export(document, 'json'))['name'] == "Jean <Dupont> & co"
+    assert to_markdown(document).count("\\<Dupont\\>") == 1
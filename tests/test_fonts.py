@@ -0,0 +1,76 @@
+import logging
+
+import pytest
+
+from cvapp import fonts
+from cvapp.document import build_document
+from cvapp.pdf import create_pdf_bytes
+
+LATIN = {'personal_info': {'name': "Jérôme Müller"}, 'professional_summary': "Développeur « Python » – 5 ans, 100 €."}
+CYRILLIC = {'personal_info': {'name': "Дмитрий Иванов"}, 'professional_summary': "Разработчик Python."}
+
+
+@pytest.fixture
+def auto_mode(monkeypatch):
+    monkeypatch.delenv('CVAPP_PDF_FONT', raising=False)
+
+
+@pytest.fixture
+def no_fonts(monkeypatch, auto_mode):
+    """Aucune famille TrueType installée"""
+    monkeypatch.setattr(fonts, '_font_files', {})
+    monkeypatch.setattr(fonts, '_fallback_logged', False)
+
+
+def test_latin_text_fits_base_fonts():
+    assert fonts.fits_base_fonts("Jérôme « Müller » – 100 €")
+    assert not fonts.fits_base_fonts("Дмитрий")
+    assert not fonts.fits_base_fonts("Ελένη")
+
+
+def test_latin_cv_does_not_embed_fonts(auto_mode):
+    assert fonts.family_for(build_document(LATIN, 'fr')) is None
+    pdf = create_pdf_bytes(LATIN, 'classic', 'fr')
+    assert b'/Helvetica' in pdf
+    assert b'/FontFile2' not in pdf
+
+
+def test_cyrillic_cv_embeds_a_font_subset(auto_mode):
+    if not fonts.available_families():
+        pytest.skip("aucune police TrueType installée")
+    family = fonts.family_for(build_document(CYRILLIC, 'fr'))
+    assert family is not None and family.name == fonts.available_families()[0]
+    pdf = create_pdf_bytes(CYRILLIC, 'classic', 'fr')
+    assert b'/FontFile2' in pdf
+    assert family.name.encode() in pdf
+    # Sous-ensemble : bien moins que la police entière (plus de 100 Ko pour DejaVu Sans ou Noto Sans)
+    assert len(pdf) < 60_000
+
+
+def test_missing_font_is_reported_once(no_fonts, caplog):
+    cyrillic = build_document(CYRILLIC, 'fr')
+    assert fonts.lacks_font(cyrillic)
+    assert not fonts.lacks_font(build_document(LATIN, 'fr'))
+
+    with caplog.at_level(logging.WARNING, logger='cvapp.fonts'):
+        assert fonts.family_for(cyrillic) is None
+        assert fonts.family_for(cyrillic) is None
+    assert len(caplog.records) == 1
+    assert 'CVAPP_PDF_FONT_DIR' in caplog.records[0].getMessage()
+    # Le rendu aboutit quand même, avec les polices de base
+    assert create_pdf_bytes(CYRILLIC, 'classic', 'fr').startswith(b'%PDF-')
+
+
+def test_base_mode_is_a_deliberate_choice(no_fonts, monkeypatch, caplog):
+    monkeypatch.setenv('CVAPP_PDF_FONT', 'base')
+    cyrillic = build_document(CYRILLIC, 'fr')
+    assert not fonts.lacks_font(cyrillic)
+    with caplog.at_level(logging.WARNING, logger='cvapp.fonts'):
+        assert fonts.family_for(cyrillic) is None
+    assert not caplog.records
+
+
+def test_unknown_mode_is_rejected(monkeypatch):
+    monkeypatch.setenv('CVAPP_PDF_FONT', 'Comic')
+    with pytest.raises(ValueError):
+        fonts.mode()
@@ -0,0 +1,129 @@
+import os
+import signal
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from cvapp import jobs as jobs_module
+from cvapp.artifacts import ArtifactStore
+from cvapp.jobs import CANCELLED, DONE, FAILED, PENDING, QueueFull, RenderQueue
+
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGKILL'), reason="SIGKILL indisponible")
+def test_dead_worker_process_does_not_leave_a_pending_job(cv_named, wait):
+    queue = RenderQueue(max_workers=1, max_pending=2, use_processes=True, artifacts=ArtifactStore())
+    try:
+        assert wait(queue.submit('alice', cv_named('Alice'), 'classic', 'fr')).status == DONE
+        for pid in list(queue._executor._processes):
+            os.kill(pid, signal.SIGKILL)
+        deadline = time.monotonic() + 10
+        while not queue._executor._broken and time.monotonic() < deadline:
+            time.sleep(0.02)
+
+        job = wait(queue.submit('bob', cv_named('Bob'), 'classic', 'fr'))
+        assert job.status == DONE
+        assert queue.stats()['restarts'] == 1
+    finally:
+        queue.shutdown()
+
+
+class BrokenPool:
+    def submit(self, *args):
+        raise BrokenProcessPool("un processus du pool est mort")
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+def test_pool_that_cannot_be_replaced_fails_the_job(cv_named):
+    queue = RenderQueue(max_workers=1, max_pending=2, artifacts=ArtifactStore())
+    queue._executor_class = lambda max_workers: BrokenPool()
+    queue._executor.shutdown()
+    queue._executor = BrokenPool()
+
+    for name in ('Alice', 'Bob', 'Carole'):
+        job = queue.submit(name, cv_named(name), 'classic', 'fr')
+        assert job.status == FAILED
+        assert 'BrokenProcessPool' in job.error
+    # Aucun rendu n'est resté en attente : max_pending n'est pas atteint
+    stats = queue.stats()
+    assert stats[PENDING] == 0
+    assert stats[FAILED] == 3
+
+
+def test_done_job_is_rendered_again_once_its_pdf_is_gone(cv_named, wait):
+    artifacts = ArtifactStore()
+    queue = RenderQueue(max_workers=1, artifacts=artifacts)
+    try:
+        first = wait(queue.submit('alice', cv_named('Alice'), 'classic', 'fr'))
+        assert first.status == DONE
+        assert queue.submit('alice', cv_named('Alice'), 'classic', 'fr') is first
+
+        artifacts.clear()
+        assert queue.artifact(first) is None
+        again = wait(queue.submit('alice', cv_named('Alice'), 'classic', 'fr'))
+        assert again is not first
+        assert again.status == DONE
+        assert queue.artifact(again).read().startswith(b'%PDF-')
+    finally:
+        queue.shutdown()
+
+
+@pytest.fixture
+def slow_render(monkeypatch):
+    """Rendu factice qui attend qu'on le libère"""
+    release = threading.Event()
+
+    def render(cv_data, template, language):
+        release.wait(10)
+        return b'%PDF-' + cv_data['personal_info']['name'].encode()
+
+    monkeypatch.setattr(jobs_module, '_render_bytes', render)
+    yield release
+    release.set()
+
+
+def test_cancelled_running_job_still_counts_until_it_ends(slow_render, cv_named, wait, wait_for):
+    queue = RenderQueue(max_workers=1, max_pending=2, artifacts=ArtifactStore())
+    try:
+        first = queue.submit('alice', cv_named('Alice'), 'classic', 'fr')
+        wait_for(lambda: first.future.running())
+        second = queue.submit('alice', cv_named('Alice Martin'), 'classic', 'fr')
+        assert first.status == CANCELLED
+        # Le premier rendu occupe encore le processus : la file est pleine
+        with pytest.raises(QueueFull):
+            queue.submit('bob', cv_named('Bob'), 'classic', 'fr')
+
+        slow_render.set()
+        assert wait(second).status == DONE
+        assert first.status == CANCELLED
+        assert wait(queue.submit('bob', cv_named('Bob'), 'classic', 'fr')).status == DONE
+    finally:
+        queue.shutdown()
+
+
+class SlowArtifacts(ArtifactStore):
+    """Magasin dont l'écriture est lente, comme un débordement sur un disque chargé"""
+
+    def put(self, key, data, mime='application/pdf'):
+        time.sleep(0.5)
+        return super().put(key, data, mime)
+
+
+def test_storing_a_pdf_does_not_block_the_queue(cv_named, wait, wait_for):
+    queue = RenderQueue(max_workers=2, artifacts=SlowArtifacts())
+    try:
+        job = queue.submit('alice', cv_named('Alice'), 'classic', 'fr')
+        wait_for(lambda: job.future.done(), timeout=30)
+        start = time.monotonic()
+        other = queue.submit('bob', cv_named('Bob'), 'classic', 'fr')
+        queue.get(job.id)
+        queue.stats()
+        assert time.monotonic() - start < 0.2
+        assert wait(job).status == DONE
+        assert queue.artifact(job).read().startswith(b'%PDF-')
+        wait(other)
+    finally:
+        queue.shutdown()
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from cvapp.model import CV, SCHEMA_VERSION, ValidationError, as_cv_data
+
+
+def full_cv_data():
+    return {
+        'personal_info': {'name': 'Alice Martin', 'email': 'alice@example.com', 'phone': '+33 6 00 00 00 00',
+                          'address': '1 rue de la Paix\nParis', 'linkedin': 'alice', 'github': 'alice'},
+        'professional_summary': "Développeuse **Python**.",
+        'experiences': [{'job_title': 'Développeuse', 'company': 'ACME', 'start_date': '2020-01',
+                         'end_date': '', 'description': "- API\n- Tests"}],
+        'education': [{'degree': 'Master', 'institution': 'Université', 'year': '2019'}],
+        'skills': [{'name': 'Python', 'level': 'Expert'}],
+        'languages': [{'name': 'Anglais', 'level': 'C1'}],
+        'interests': "Vélo",
+    }
+
+
+def test_dict_and_json_round_trip():
+    cv_data = full_cv_data()
+    cv = CV.from_dict(cv_data)
+    assert cv.skills[0].level == 'Expert'
+    assert cv.to_dict() == cv_data
+    assert CV.from_json(cv.to_json()).to_dict() == cv_data
+    assert CV.from_json(cv.to_json(indent=2).encode('utf-8')) == cv
+
+    versioned = json.loads(cv.to_json())
+    assert versioned['schema_version'] == SCHEMA_VERSION
+    assert CV.from_dict(versioned) == cv
+
+
+def test_missing_fields_get_defaults():
+    cv = CV.from_dict({'personal_info': {'name': 'Bob'}, 'skills': [{'name': 'Go'}], 'languages': [{}]})
+    cv_data = cv.to_dict()
+    assert cv_data['personal_info']['email'] == ''
+    assert cv_data['skills'] == [{'name': 'Go', 'level': 'Débutant'}]
+    assert cv_data['languages'] == [{'name': '', 'level': 'A1'}]
+    assert cv_data['experiences'] == [] and cv_data['interests'] == ''
+    assert as_cv_data(cv) == cv_data
+    assert as_cv_data(cv_data) is cv_data
+
+
+def test_numbers_are_accepted_as_text():
+    cv = CV.from_dict({'education': [{'degree': 'Licence', 'year': 2015}],
+                       'experiences': [{'start_date': 2016, 'end_date': None}]})
+    assert cv.education[0].year == '2015'
+    assert (cv.experiences[0].start_date, cv.experiences[0].end_date) == ('2016', '')
+
+
+def test_all_errors_are_reported_at_once():
+    with pytest.raises(ValidationError) as error:
+        CV.from_dict({
+            'personal_info': {'name': ['Alice']},
+            'experiences': [{'job_title': 'Dev', 'start_date': {'année': 2020}, 'end_date': True}],
+            'skills': [{'name': 'Python', 'level': 'Dieu'}],
+            'languages': [{'name': 'Anglais', 'level': 'C3'}],
+            'education': 'Master',
+        })
+    assert error.value.errors == [
+        "personal_info.name: texte attendu, list reçu",
+        "experiences[0].start_date: texte attendu, dict reçu",
+        "experiences[0].end_date: texte attendu, bool reçu",
+        "education: liste attendue, str reçu",
+        "skills[0].level: niveau inconnu 'Dieu' (attendu : Débutant, Intermédiaire, Avancé, Expert)",
+        "languages[0].level: niveau inconnu 'C3' (attendu : A1, A2, B1, B2, C1, C2, Natif)",
+    ]
+
+
+@pytest.mark.parametrize('text', ['{pas du json', '[1, 2]', '{"schema_version": 2, "cv": {}}'])
+def test_invalid_documents_are_rejected(text):
+    with pytest.raises(ValidationError):
+        CV.from_json(text)
+
+
+def test_levels_share_one_string():
+    first = CV.from_dict({'skills': [{'level': ''.join(['Exp', 'ert'])}]})
+    second = CV.from_dict({'skills': [{'level': ''.join(['Ex', 'pert'])}]})
+    assert first.skills[0].level is second.skills[0].level
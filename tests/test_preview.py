@@ -0,0 +1,24 @@
+from cvapp.preview import DocumentMemo
+from cvapp.schema import empty_cv_data
+from cvapp.store import serialize
+
+
+def test_document_memo_rebuilds_only_on_change():
+    cv_data = empty_cv_data()
+    cv_data['personal_info']['name'] = 'Alice'
+    memo = DocumentMemo(cv_data)
+    document = memo.document('fr')
+    html = memo.export('html', 'fr')
+
+    assert not memo.update(cv_data)
+    assert memo.document('fr') is document
+    assert memo.export('html', 'fr') is html
+    assert memo.serialized == serialize(cv_data)
+
+    cv_data['personal_info']['name'] = 'Alice Martin'
+    # Le mémo garde sa propre copie : le document reste celui de la dernière mise à jour
+    assert memo.document('fr').name == 'Alice'
+    assert memo.update(cv_data)
+    assert memo.document('fr').name == 'Alice Martin'
+    assert 'Alice Martin' in memo.export('html', 'fr')
+    assert memo.render_key('classic', 'fr') != memo.render_key('modern', 'fr')
@@ -0,0 +1,83 @@
+from io import BytesIO
+
+import pytest
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph
+
+from cvapp.pdf import build_pdf, create_pdf_bytes, rich_text
+from cvapp.richtext import MAX_BLOCK_CHARS, Run, parse_blocks, parse_runs, to_html, to_markdown, to_reportlab
+
+UNSAFE = "Salaires < 50k & primes > 10% <b>gras</b> <para> **ouvert *sans fin"
+
+
+def test_bold_and_italic_runs():
+    assert parse_runs("Développeur **Python** et *Django*") == (
+        Run("Développeur "), Run("Python", bold=True), Run(" et "), Run("Django", italic=True),
+    )
+    assert parse_runs("**gras *et italique***") == (
+        Run("gras ", bold=True), Run("et italique", bold=True, italic=True),
+    )
+
+
+@pytest.mark.parametrize('text', ["5 * 3 = 15", "**ouvert", "*ouvert", "** espaces **", "***"])
+def test_unbalanced_markers_stay_text(text):
+    assert ''.join(run.text for run in parse_runs(text)) == text
+    assert not any(run.bold or run.italic for run in parse_runs(text))
+
+
+def test_blocks_bullets_and_paragraph_spacing():
+    blocks = parse_blocks("Intro\n- un\n* deux\n• trois\n\nFin\x07")
+    assert [(block.text, block.bullet, block.tight) for block in blocks] == [
+        ("Intro", False, True),
+        ("un", True, True),
+        ("deux", True, True),
+        ("trois", True, False),
+        ("Fin", False, False),
+    ]
+
+
+def test_markup_is_escaped_for_every_format():
+    runs = parse_blocks(UNSAFE)[0].runs
+    assert to_reportlab(runs).startswith("Salaires &lt; 50k &amp; primes &gt; 10% &lt;b&gt;gras&lt;/b&gt;")
+    assert '<b>' not in to_html(runs)
+    assert '&lt;para&gt;' in to_html(runs)
+    assert to_markdown("# Titre <b>") == r"\# Titre \<b\>"
+
+
+def test_long_paragraph_is_cut_between_sentences():
+    sentence = "Conception et maintenance d'une application de gestion. "
+    text = sentence * 100
+    blocks = parse_blocks(text)
+    assert len(blocks) > 1
+    assert all(len(block.text) <= MAX_BLOCK_CHARS for block in blocks)
+    assert all(block.text.endswith('.') for block in blocks)
+    assert ' '.join(block.text for block in blocks) == text.strip()
+    # Une seule phrase démesurée reste entière plutôt que d'être coupée au milieu d'un mot
+    assert len(parse_blocks('a' * (MAX_BLOCK_CHARS * 2))) == 1
+
+
+def test_rich_text_never_fails_on_user_markup():
+    style = getSampleStyleSheet()['Normal']
+    flowables = rich_text(UNSAFE + "\n- <i>puce & co\n\x00", style)
+    assert len(flowables) == 2
+    assert all(isinstance(flowable, Paragraph) for flowable in flowables)
+    assert flowables[1].bulletText == '•'
+    assert "<para>" in flowables[0].getPlainText()
+
+
+def test_long_text_renders_over_several_pages():
+    style = getSampleStyleSheet()['Normal']
+    text = "Une phrase assez longue pour remplir la page & <balises>. " * 2000
+    doc = build_pdf(rich_text(text, style), 'classic', BytesIO())
+    assert doc.page > 5
+
+
+def test_cv_with_unsafe_text_renders():
+    cv_data = {
+        'personal_info': {'name': "Jean <Dupont> & co", 'email': 'a&b@example.com'},
+        'professional_summary': UNSAFE + "\n" + "Phrase. " * 3000,
+        'experiences': [{'job_title': "R&D <lead>", 'company': "**ACME", 'description': "- <script>\n- &amp;"}],
+        'interests': "<<<>>> & *",
+    }
+    for template in ('classic', 'modern', 'creative'):
+        assert create_pdf_bytes(cv_data, template, 'fr').startswith(b'%PDF-')
@@ -0,0 +1,121 @@
+import pytest
+
+from cvapp.search import Query, SearchIndex, parse_level, parse_query
+from cvapp.schema import SKILL_LEVELS
+from cvapp.store import CVStore, new_cv_id, new_owner_token
+
+
+def cv(name, skills=(), languages=(), experiences=(), summary=''):
+    return {
+        'personal_info': {'name': name},
+        'professional_summary': summary,
+        'skills': [{'name': skill, 'level': level} for skill, level in skills],
+        'languages': [{'name': language, 'level': level} for language, level in languages],
+        'experiences': [{'job_title': title, 'company': company} for title, company in experiences],
+    }
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex()
+    index.add('alice', cv('Alice', skills=[('Python', 'Expert'), ('Machine Learning', 'Intermédiaire')],
+                          languages=[('Néerlandais', 'C1'), ('Anglais', 'B2')],
+                          experiences=[('Développeuse Python', 'ACME Corp')],
+                          summary="Données, Python et apprentissage automatique."))
+    index.add('bob', cv('Bob', skills=[('Python', 'Débutant'), ('Java', 'Expert')],
+                        languages=[('Dutch', 'Natif')],
+                        experiences=[('Développeur Java', 'Globex')],
+                        summary="Applications Java pour la banque. Java, Java et encore Java."))
+    index.add('carole', cv('Carole', skills=[('python', 'Avancé')],
+                           languages=[('nl', 'B1')],
+                           experiences=[('Analyste', 'ACME')],
+                           summary="Analyse de données."))
+    return index
+
+
+def ids(hits):
+    return [hit.cv_id for hit in hits]
+
+
+def test_parse_query():
+    query = parse_query('skill:python>=avancé lang:nl>=C1 title:développeur company:acme skill:"machine learning" django')
+    assert query == Query(
+        skills=(('python', 'Avancé'), ('machine learning', '')),
+        languages=(('nl', 'C1'),),
+        titles=('développeur',),
+        companies=('acme',),
+        text='django',
+    )
+    # Libellés des niveaux dans toutes les langues de l'interface
+    assert parse_level('advanced', SKILL_LEVELS) == parse_level('Gevorderd', SKILL_LEVELS) == 'Avancé'
+    with pytest.raises(ValueError):
+        parse_query('skill:python>=dieu')
+
+
+def test_skill_level_filters(index):
+    assert set(ids(index.search('skill:python'))) == {'alice', 'bob', 'carole'}
+    assert set(ids(index.search('skill:python>=avancé'))) == {'alice', 'carole'}
+    assert ids(index.search('skill:python>=expert')) == ['alice']
+    # Le niveau le plus élevé passe devant
+    assert ids(index.search('skill:python>=avancé')) == ['alice', 'carole']
+    assert ids(index.search('skill:"machine learning"')) == ['alice']
+    assert ids(index.search('skill:learning')) == ['alice']
+
+
+def test_language_filters_accept_names_in_any_language(index):
+    assert ids(index.search('lang:nl>=C1')) == ['bob', 'alice']
+    assert set(ids(index.search('lang:dutch'))) == {'alice', 'bob', 'carole'}
+    assert ids(index.search('lang:anglais>=C1')) == []
+
+
+def test_filters_are_intersected(index):
+    assert ids(index.search('skill:python>=avancé lang:néerlandais>=C1')) == ['alice']
+    assert ids(index.search('title:python company:acme')) == ['alice']
+    assert ids(index.search('title:développeur')) == ['bob']
+    assert ids(index.search('company:acme analyse')) == ['carole']
+    assert ids(index.search('skill:python', among={'bob', 'inconnu'})) == ['bob']
+    assert index.search('skill:cobol') == []
+    assert index.search('') == []
+
+
+def test_free_text_is_ranked_by_bm25(index):
+    hits = index.search('java')
+    assert ids(hits) == ['bob']
+    # Les deux termes dans le plus court des documents, puis les deux termes, puis un seul
+    hits = index.search('données python')
+    assert ids(hits) == ['carole', 'alice', 'bob']
+    assert hits[0].score > hits[1].score > hits[2].score > 0
+    assert ids(index.search('données python', top=1)) == ['carole']
+
+
+def test_reindexing_replaces_the_previous_version(index):
+    index.add('bob', cv('Bob', skills=[('Python', 'Expert')]))
+    assert set(ids(index.search('skill:python>=expert'))) == {'alice', 'bob'}
+    assert index.search('java') == []
+    assert set(ids(index.search('lang:nl'))) == {'alice', 'carole'}
+    index.remove('alice')
+    index.remove('alice')
+    assert ids(index.search('skill:python>=expert')) == ['bob']
+    assert index.stats()['cvs'] == 2
+
+
+def test_index_follows_the_store(tmp_path):
+    store = CVStore(tmp_path / 'cvs.sqlite3')
+    try:
+        owner = new_owner_token()
+        first, second = new_cv_id(), new_cv_id()
+        store.save(first, cv('Alice', skills=[('Python', 'Expert')]), owner=owner)
+        index = SearchIndex.from_store(store)
+        assert ids(index.search('skill:python')) == [first]
+
+        store.save(second, cv('Bob', skills=[('Rust', 'Avancé')]), owner=owner)
+        assert ids(index.search('skill:rust')) == [second]
+        store.save(first, cv('Alice', skills=[('Go', 'Expert')]), owner=owner)
+        assert index.search('skill:python') == []
+        assert ids(index.search('skill:go')) == [first]
+
+        store.delete(second, owner=owner)
+        assert index.search('skill:rust') == []
+        assert len(index) == 1
+    finally:
+        store.close()
@@ -0,0 +1,204 @@
+import json
+import os
+import signal
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from cvapp import service as service_module
+from cvapp.artifacts import ArtifactStore
+from cvapp.cache import RenderCache
+from cvapp.jobs import DONE, RenderQueue
+from cvapp.service import RenderClient, RenderRejected, RenderService, ServiceUnavailable, start_server
+
+
+@pytest.fixture
+def fake_render(monkeypatch):
+    """Rendu factice et lent, compté : le pool de threads l'appelle à la place de ReportLab"""
+    calls = []
+
+    def render(cv_data, template, language):
+        calls.append(cv_data['personal_info']['name'])
+        time.sleep(0.2)
+        if cv_data['personal_info']['name'] == 'Plantage':
+            raise RuntimeError("rendu impossible")
+        return b'%PDF-' + cv_data['personal_info']['name'].encode('utf-8')
+
+    monkeypatch.setattr(service_module, '_render_bytes', render)
+    return calls
+
+
+def running(service):
+    server = start_server(service, port=0, idle_timeout=1.0)
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+@pytest.fixture
+def threaded(fake_render):
+    service = RenderService(workers=4, use_processes=False, cache=RenderCache())
+    server, url = running(service)
+    client = RenderClient(url, retry_after=30.0)
+    yield service, client, url
+    client.close()
+    server.shutdown()
+    server.server_close()
+    service.shutdown()
+
+
+def http_status(url):
+    try:
+        with urllib.request.urlopen(url) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_identical_requests_share_one_render(threaded, fake_render, cv_named):
+    service, client, _ = threaded
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda _: client.render(cv_named('Alice'), 'classic', 'fr'), range(8)))
+    assert set(results) == {b'%PDF-Alice'}
+    assert fake_render == ['Alice']
+    stats = service.stats()
+    assert stats['rendered'] == 1
+    assert stats['shared'] + stats['cached'] == 7
+
+
+def test_repeated_request_is_served_from_cache(threaded, fake_render, cv_named):
+    service, client, _ = threaded
+    client.render(cv_named('Alice'), 'classic', 'fr')
+    start = time.perf_counter()
+    assert client.render(cv_named('Alice'), 'classic', 'fr') == b'%PDF-Alice'
+    assert time.perf_counter() - start < 0.2
+    assert fake_render == ['Alice']
+    assert service.stats()['cached'] == 1
+
+
+def test_invalid_request_is_rejected_with_400(threaded, cv_named):
+    service, client, url = threaded
+    with pytest.raises(RenderRejected):
+        client.render(cv_named('Alice'), 'inconnu', 'fr')
+    with pytest.raises(RenderRejected):
+        client.render({'skills': [{'name': 'Python', 'level': 'Dieu'}]}, 'classic', 'fr')
+    request = urllib.request.Request(url + '/render', data=b'{pas du json', method='POST')
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(request)
+    assert error.value.code == 400
+    # Le JSON illégal est refusé avant d'atteindre le service
+    assert service.stats()['rejected'] == 2
+
+
+def test_failed_render_is_rejected_with_422(threaded, cv_named):
+    _, client, url = threaded
+    with pytest.raises(RenderRejected, match="rendu impossible"):
+        client.render(cv_named('Plantage'), 'classic', 'fr')
+    body = json.dumps({'cv_data': cv_named('Plantage')}).encode('utf-8')
+    request = urllib.request.Request(url + '/render', data=body, method='POST')
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(request)
+    assert error.value.code == 422
+    # Le service reste disponible : l'échec tient au CV, pas au service
+    assert client.stats()['unavailable'] == 0
+
+
+def test_saturated_service_answers_503_busy(fake_render, cv_named):
+    service = RenderService(workers=1, use_processes=False, max_pending=1)
+    server, url = running(service)
+    client = RenderClient(url, retry_after=30.0)
+    try:
+        slow = threading.Thread(target=client.render, args=(cv_named('Alice'), 'classic', 'fr'))
+        slow.start()
+        time.sleep(0.05)
+        with pytest.raises(ServiceUnavailable, match="saturé"):
+            client.render(cv_named('Bob'), 'classic', 'fr')
+        slow.join()
+        # Saturation passagère : le client ne met pas le service de côté
+        assert client.render(cv_named('Bob'), 'classic', 'fr') == b'%PDF-Bob'
+        assert service.stats()['busy'] == 1
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+        service.shutdown()
+
+
+def test_render_interrupted_by_a_broken_pool_is_retried(threaded, monkeypatch, cv_named):
+    service, client, _ = threaded
+    calls = []
+
+    def render(cv_data, template, language):
+        calls.append(len(calls))
+        if len(calls) == 1:
+            raise BrokenProcessPool("un processus du pool est mort")
+        return b'%PDF-retry'
+
+    monkeypatch.setattr(service_module, '_render_bytes', render)
+    assert client.render(cv_named('Alice'), 'classic', 'fr') == b'%PDF-retry'
+    assert len(calls) == 2
+    assert service.stats()['restarts'] == 1
+
+
+def test_broken_pool_is_reported_and_client_backs_off(threaded, cv_named):
+    service, client, url = threaded
+
+    def cannot_start(max_workers):
+        raise OSError("Too many open files")
+
+    with service._lock:
+        service._executor_class = cannot_start
+        service.broken = "BrokenProcessPool: un processus du pool est mort"
+    status, health = http_status(url + '/health')
+    assert status == 503
+    assert health['status'] == 'broken'
+
+    with pytest.raises(ServiceUnavailable, match="hors d'usage"):
+        client.render(cv_named('Alice'), 'classic', 'fr')
+    # Hors d'usage, et non saturé : le client ne sollicite plus le service pendant retry_after
+    requests = service.stats()['failed']
+    with pytest.raises(ServiceUnavailable, match="plus tard"):
+        client.render(cv_named('Alice'), 'classic', 'fr')
+    assert service.stats()['failed'] == requests
+
+
+def test_client_falls_back_to_local_render_when_service_is_down(cv_named):
+    client = RenderClient('http://127.0.0.1:9', timeout=1.0, retry_after=30.0)
+    queue = RenderQueue(max_workers=1, artifacts=ArtifactStore(), client=client)
+    try:
+        job = queue.submit('session', cv_named('Alice'), 'classic', 'fr')
+        job.future.result(timeout=30)
+        assert job.status == DONE
+        assert queue.artifact(job).read().startswith(b'%PDF-')
+        assert queue.stats()['service']['unavailable'] == 1
+    finally:
+        queue.shutdown()
+
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGKILL'), reason="SIGKILL indisponible")
+def test_dead_worker_process_is_replaced(cv_named):
+    service = RenderService(workers=1, use_processes=True)
+    server, url = running(service)
+    client = RenderClient(url)
+    try:
+        assert client.render(cv_named('Alice'), 'classic', 'fr').startswith(b'%PDF-')
+        # Un processus du pool tué (mémoire épuisée, plantage) casse tout le pool
+        for pid in list(service._executor._processes):
+            os.kill(pid, signal.SIGKILL)
+        deadline = time.monotonic() + 10
+        while not getattr(service._executor, '_broken', False) and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        assert client.render(cv_named('Bob'), 'classic', 'fr').startswith(b'%PDF-')
+        assert service.stats()['restarts'] == 1
+        status, health = http_status(url + '/health')
+        assert status == 200
+        assert health['status'] == 'ok'
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+        service.shutdown()
@@ -0,0 +1,153 @@
+import sqlite3
+import threading
+
+import pytest
+
+from cvapp.schema import empty_cv_data
+from cvapp.store import AutoSaver, CVStore, new_cv_id, new_owner_token
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CVStore(tmp_path / 'cvs.sqlite3')
+    yield store
+    store.close()
+
+
+def test_cvs_are_only_visible_to_their_owner(store, cv_named):
+    alice, bob = new_owner_token(), new_owner_token()
+    cv_id = new_cv_id()
+    store.save(cv_id, cv_named('Alice'), owner=alice)
+    store.save(cv_id, cv_named('Alice Martin'), owner=alice)
+
+    assert [cv['id'] for cv in store.list_cvs(owner=alice)] == [cv_id]
+    assert store.exists(cv_id, owner=alice)
+    assert len(store.history(cv_id, owner=alice)) == 2
+    assert store.load(cv_id, owner=alice).personal_info.name == 'Alice Martin'
+
+    assert store.list_cvs(owner=bob) == []
+    assert not store.exists(cv_id, owner=bob)
+    assert store.history(cv_id, owner=bob) == []
+    with pytest.raises(KeyError):
+        store.load(cv_id, owner=bob)
+    with pytest.raises(KeyError):
+        store.load(cv_id, version=1, owner=bob)
+    with pytest.raises(PermissionError):
+        store.save(cv_id, cv_named('Bob'), owner=bob)
+    assert store.load(cv_id, owner=alice).personal_info.name == 'Alice Martin'
+
+
+def test_cvs_without_owner_are_hidden_after_migration(tmp_path):
+    path = tmp_path / 'cvs.sqlite3'
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE cvs (id TEXT PRIMARY KEY, name TEXT NOT NULL, created_at REAL NOT NULL,
+                          updated_at REAL NOT NULL, version INTEGER NOT NULL, content_hash TEXT NOT NULL);
+        INSERT INTO cvs VALUES ('ancien', 'Ancien', 0, 0, 1, 'x');
+    """)
+    conn.close()
+    store = CVStore(path)
+    try:
+        assert store.list_cvs(owner=new_owner_token()) == []
+        assert [cv['id'] for cv in store.list_cvs()] == ['ancien']
+    finally:
+        store.close()
+
+
+def test_connections_stay_bounded_across_threads(store, cv_named):
+    store.save(new_cv_id(), cv_named('Alice'), owner=new_owner_token())
+
+    # Une relance de Streamlit = un nouveau thread qui lit la liste et l'historique
+    def rerun():
+        store.list_cvs(owner='personne')
+        store.history('inconnu')
+
+    for _ in range(200):
+        thread = threading.Thread(target=rerun)
+        thread.start()
+        thread.join()
+    assert store.stats()['connections'] <= 4
+
+    threads = [threading.Thread(target=rerun) for _ in range(50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert store.stats()['connections'] <= 4
+
+
+def test_autosave_skips_unchanged_content(store, cv_named, wait_for):
+    saver = AutoSaver(store, delay=0.05, max_delay=1.0)
+    try:
+        cv_id, owner = new_cv_id(), new_owner_token()
+        saver.remember(cv_id, empty_cv_data())
+        assert not saver.schedule(cv_id, empty_cv_data(), owner=owner)
+        assert saver.schedule(cv_id, cv_named('Alice'), owner=owner)
+        # Même contenu, autre objet : même empreinte, rien de plus à écrire
+        assert not saver.schedule(cv_id, cv_named('Alice'), owner=owner)
+        wait_for(lambda: saver.stats()['writes'] == 1)
+        assert not saver.schedule(cv_id, cv_named('Alice'), owner=owner)
+        assert saver.stats()['unchanged'] == 3
+        assert [entry['version'] for entry in store.history(cv_id, owner=owner)] == [1]
+    finally:
+        saver.close()
+
+
+def test_autosave_coalesces_quick_edits(store, cv_named, wait_for):
+    saver = AutoSaver(store, delay=0.2, max_delay=5.0)
+    try:
+        cv_id, owner = new_cv_id(), new_owner_token()
+        for name in ('A', 'Al', 'Ali', 'Alic', 'Alice'):
+            assert saver.schedule(cv_id, cv_named(name), owner=owner)
+        assert saver.pending(cv_id)
+        wait_for(lambda: saver.stats()['writes'] == 1)
+        assert saver.stats()['coalesced'] == 4
+        assert len(store.history(cv_id, owner=owner)) == 1
+        assert store.load(cv_id, owner=owner).personal_info.name == 'Alice'
+    finally:
+        saver.close()
+
+
+def test_autosave_flushes_on_close(store, cv_named):
+    saver = AutoSaver(store, delay=60.0, max_delay=60.0)
+    cv_id, owner = new_cv_id(), new_owner_token()
+    saver.schedule(cv_id, cv_named('Alice'), owner=owner)
+    saver.close()
+    assert store.load(cv_id, owner=owner).personal_info.name == 'Alice'
+
+
+def test_autosave_forgets_deleted_cvs(store, cv_named):
+    saver = AutoSaver(store, delay=60.0, max_delay=60.0)
+    owner = new_owner_token()
+    saved, edited = new_cv_id(), new_cv_id()
+    try:
+        store.save(saved, cv_named('Alice'), owner=owner)
+        saver.remember(saved, cv_named('Alice'))
+        store.save(edited, cv_named('Bob'), owner=owner)
+        saver.schedule(edited, cv_named('Bob Martin'), owner=owner)
+        assert saver.stats()['known'] == 2
+
+        store.delete(saved, owner=owner)
+        assert saver.stats()['known'] == 1
+        store.delete(edited, owner=owner)
+        assert saver.stats()['known'] == 0
+        # La modification en attente d'un CV supprimé n'est plus écrite
+        assert not saver.pending(edited)
+    finally:
+        saver.close()
+    assert not store.exists(edited)
+
+
+def test_autosave_bounds_known_digests(store, cv_named):
+    saver = AutoSaver(store, delay=60.0, max_delay=60.0, max_known=3)
+    try:
+        ids = [new_cv_id() for _ in range(5)]
+        for cv_id in ids:
+            saver.remember(cv_id, cv_named(cv_id))
+        assert saver.stats()['known'] == 3
+        # Les plus récents sont gardés ; un CV oublié est simplement reprogrammé
+        assert not saver.schedule(ids[-1], cv_named(ids[-1]))
+        assert saver.schedule(ids[0], cv_named(ids[0]))
+        assert saver.stats()['known'] == 3
+    finally:
+        saver.close()
@@ -0,0 +1,21 @@
+import json
+
+from cvapp import translations
+from cvapp.translations import available_locales, locale_names
+
+
+def test_locale_names_do_not_load_catalogs(monkeypatch):
+    monkeypatch.setattr(translations, '_compiled', {})
+    monkeypatch.setattr(translations, '_names', None)
+    names = locale_names()
+    assert list(names)[0] == 'fr'
+    assert set(names) == set(available_locales())
+    assert translations._compiled == {}
+
+
+def test_every_locale_has_a_name_and_every_key():
+    with open(translations.NAMES_FILE, encoding='utf-8') as f:
+        names = json.load(f)
+    assert set(names) == set(available_locales())
+    for locale in available_locales():
+        assert translations._load_file(locale).keys() == translations._load_file('fr').keys()